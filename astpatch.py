@@ -0,0 +1,434 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Patches between two XML outputs of parse.py: the classes and methods that were added,
+# removed, changed or moved, identified by fingerprints of their elements, and their application.
+import sys
+import os
+import re
+import gzip
+import bisect
+import hashlib
+import argparse
+import tempfile
+import xml.dom.minidom
+import xml.etree.ElementTree as ET
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+
+# @brief Format name and version stored in the `patch` root element.
+PATCH_FORMAT = "sol25-patch"
+PATCH_VERSION = 1
+
+# @brief Tags with raw tabs and line breaks, which the pretty-printed XML of parse.py writes unescaped
+# in attribute values and an XML parser would turn into spaces.
+RAW_WHITESPACE_TAG = re.compile(rb"<[^>]*[\t\n\r][^>]*>")
+
+# @brief Character references keeping the raw whitespace of attribute values exact when read back.
+WHITESPACE_REFERENCES = {b"\t": b"&#9;", b"\n": b"&#10;", b"\r": b"&#13;"}
+
+# @brief Errors of reading a possibly compressed XML document.
+READ_ERRORS = (OSError, EOFError, ET.ParseError) + ((lzma.LZMAError,) if lzma is not None else ())
+
+
+class PatchError(Exception):
+    # @brief Raised for a document or patch that cannot be read, compared or applied.
+    pass
+
+
+def read_document(path):
+    """
+    @brief Reads an XML output of parse.py or a patch.
+
+    @param path Path of the document; a `.gz` or `.xz` extension is decompressed.
+    @return The root element, without the indentation text of pretty-printed XML.
+
+    @details
+    Tabs and line breaks inside tags can only be in attribute values, since parse.py separates
+    attributes by single spaces and escapes `>`. They are replaced by character references
+    before parsing, so the values are read exactly as they were written.
+
+    @throws PatchError if the file cannot be read.
+    """
+    if path.endswith(".gz"):
+        opener = gzip.open
+    elif path.endswith(".xz") and lzma is not None:
+        opener = lzma.open
+    else:
+        opener = open
+    try:
+        with opener(path, "rb") as stream:
+            data = stream.read()
+        data = RAW_WHITESPACE_TAG.sub(lambda tag: re.sub(rb"[\t\n\r]", lambda c: WHITESPACE_REFERENCES[c.group()], tag.group()), data)
+        root = ET.fromstring(data)
+    except READ_ERRORS as e:
+        raise PatchError(f"Cannot read '{path}': {e}.")
+    for elem in root.iter():
+        if elem.text is not None and not elem.text.strip():
+            elem.text = None
+        if elem.tail is not None and not elem.tail.strip():
+            elem.tail = None
+    return root
+
+
+def format_document(root, compact=False):
+    """
+    @brief Serializes a document as parse.py prints it with `--format xml` or `xml-compact`.
+
+    @param root The root element.
+    @param compact True for XML without indentation.
+    @return The XML string, without the final newline.
+    """
+    if compact:
+        return '<?xml version="1.0" encoding="UTF-8"?>' + ET.tostring(root, encoding="unicode")
+    formatted = xml.dom.minidom.parseString(ET.tostring(root, encoding="utf-8")).toprettyxml(indent="  ")
+    return formatted.replace('<?xml version="1.0" ?>', '<?xml version="1.0" encoding="UTF-8"?>')
+
+
+def fingerprint(elem):
+    """
+    @brief Computes the fingerprint of an element and its subtree.
+
+    @param elem The element.
+    @return The hexadecimal SHA-256.
+
+    @details
+    - Hashes the tags, the number of children and the attributes sorted by name, in pre-order.
+      Text is not part of it, because the AST keeps everything in attributes.
+    - Attribute values are hashed exactly; `read_document()` keeps their tabs and line breaks.
+    """
+    parts = []
+    for node in elem.iter():
+        parts.append(f"{node.tag}\0{len(node)}\0{len(node.attrib)}")
+        for name, value in sorted(node.attrib.items()):
+            parts.append(name)
+            parts.append(value)
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def document_fingerprint(root, class_fingerprints):
+    """
+    @brief Computes the fingerprint of a whole document from those of its classes.
+
+    @param root The `program` element.
+    @param class_fingerprints Fingerprints of its classes, in document order.
+    @return The hexadecimal SHA-256.
+    """
+    header = fingerprint(ET.Element(root.tag, root.attrib))
+    return hashlib.sha256(" ".join([header, *class_fingerprints]).encode("ascii")).hexdigest()
+
+
+def check_program(root):
+    """
+    @brief Checks that a document is an AST written by parse.py.
+
+    @param root The root element.
+
+    @throws PatchError for another document.
+    """
+    if root.tag != "program" or root.get("language") != "SOL25":
+        raise PatchError("The document is not a SOL25 AST.")
+
+
+def keyed(parent, key):
+    """
+    @brief Indexes the children of an element by one of their attributes.
+
+    @param parent The `program` or `class` element.
+    @param key The attribute naming the children: `name` of classes, `selector` of methods.
+    @return A dictionary from the attribute to the child, in document order.
+
+    @throws PatchError if two children have the same name.
+    """
+    children = {child.get(key): child for child in parent}
+    if len(children) != len(parent):
+        raise PatchError(f"Two children of '{parent.tag}' have the same {key}.")
+    return children
+
+
+def moved_keys(old_keys, new_keys):
+    """
+    @brief Chooses the children that have to move to turn one order into another.
+
+    @param old_keys Keys in the old order.
+    @param new_keys Keys in the new order.
+    @return The set of keys present in both orders that do not stay in place.
+
+    @details
+    The longest run of common keys whose old positions increase in the new order stays,
+    found in O(n log n) with patience sorting; every other common key is moved.
+    """
+    old_index = {key: index for index, key in enumerate(old_keys)}
+    common = [key for key in new_keys if key in old_index]
+    tails = []
+    tail_keys = []
+    previous = {}
+    for key in common:
+        position = bisect.bisect_left(tails, old_index[key])
+        previous[key] = tail_keys[position - 1] if position else None
+        if position == len(tails):
+            tails.append(old_index[key])
+            tail_keys.append(key)
+        else:
+            tails[position] = old_index[key]
+            tail_keys[position] = key
+    staying = set()
+    key = tail_keys[-1] if tail_keys else None
+    while key is not None:
+        staying.add(key)
+        key = previous[key]
+    return set(common) - staying
+
+
+def diff_children(patch, old_children, new_children, kind, key, changed):
+    """
+    @brief Lists the operations turning the children of an old element into the new ones.
+
+    @param patch The element receiving the operations.
+    @param old_children Keyed children of the old element, from `keyed()`.
+    @param new_children Keyed children of the new element.
+    @param kind `class` or `method`, the suffix of the operation tags.
+    @param key The attribute naming the children.
+    @param changed Function of an old and a new child returning the operation for a
+                   changed child, or None for an unchanged one.
+
+    @details
+    Removals come first, then the other operations in new document order. Added and moved
+    children name the child they follow in `after`, which is absent for the first child.
+    """
+    moved = moved_keys(list(old_children), list(new_children))
+    for name in old_children:
+        if name not in new_children:
+            ET.SubElement(patch, f"remove-{kind}", {key: name})
+    after = None
+    for name, child in new_children.items():
+        position = {"after": after} if after is not None else {}
+        if name not in old_children:
+            ET.SubElement(patch, f"add-{kind}", position).append(child)
+        else:
+            if name in moved:
+                ET.SubElement(patch, f"move-{kind}", {key: name, **position})
+            operation = changed(old_children[name], child)
+            if operation is not None:
+                patch.append(operation)
+        after = name
+
+
+def diff_documents(old_root, new_root):
+    """
+    @brief Computes the patch from one XML output of parse.py to another.
+
+    @param old_root The `program` element of the previous output.
+    @param new_root The `program` element of the new output.
+    @return The `patch` element.
+
+    @details
+    - `base` and `target` are the document fingerprints before and after the patch.
+    - `program` carries new program attributes, `remove-class`, `add-class` and `move-class`
+      change the class list, and `update-class` carries the new class attributes and the
+      `remove-method`, `add-method`, `move-method` and `replace-method` operations of a class.
+    - Added, changed and replaced elements are shared with `new_root`, not copied.
+
+    @throws PatchError if a document is not an AST or has two classes or methods of the same name.
+    """
+    check_program(old_root)
+    check_program(new_root)
+    old_classes = keyed(old_root, "name")
+    new_classes = keyed(new_root, "name")
+    old_prints = {name: fingerprint(cls) for name, cls in old_classes.items()}
+    new_prints = {name: fingerprint(cls) for name, cls in new_classes.items()}
+    patch = ET.Element("patch", format=PATCH_FORMAT, version=str(PATCH_VERSION),
+                       base=document_fingerprint(old_root, old_prints.values()),
+                       target=document_fingerprint(new_root, new_prints.values()))
+    if old_root.attrib != new_root.attrib:
+        ET.SubElement(patch, "program", new_root.attrib)
+
+    def changed_method(old, new):
+        if fingerprint(old) == fingerprint(new):
+            return None
+        operation = ET.Element("replace-method")
+        operation.append(new)
+        return operation
+
+    def changed_class(old, new):
+        name = new.get("name")
+        if old_prints[name] == new_prints[name]:
+            return None
+        operation = ET.Element("update-class", new.attrib)
+        diff_children(operation, keyed(old, "selector"), keyed(new, "selector"), "method", "selector", changed_method)
+        return operation
+
+    diff_children(patch, old_classes, new_classes, "class", "name", changed_class)
+    return patch
+
+
+def apply_children(parent, operations, kind, key, update):
+    """
+    @brief Applies the operations of `diff_children()` to an element.
+
+    @param parent The `program` or `class` element; its children are replaced.
+    @param operations The operation elements.
+    @param kind `class` or `method`.
+    @param key The attribute naming the children.
+    @param update Function of the keyed children and an operation of another tag that applies it.
+    @return The set of names of the added and updated children.
+
+    @throws PatchError for an operation that does not fit the element.
+    """
+    children = keyed(parent, key)
+    order = list(children)
+    taken = set()
+    inserted = {}
+    touched = set()
+    for operation in operations:
+        if operation.tag in (f"remove-{kind}", f"move-{kind}"):
+            name = operation.get(key)
+            if name not in children or name in taken:
+                raise PatchError(f"Cannot {operation.tag.split('-')[0]} missing {kind} '{name}'.")
+            taken.add(name)
+            if operation.tag.startswith("remove"):
+                del children[name]
+            else:
+                inserted[operation.get("after")] = name
+        elif operation.tag == f"add-{kind}" and len(operation) == 1:
+            name = operation[0].get(key)
+            children[name] = operation[0]
+            inserted[operation.get("after")] = name
+            touched.add(name)
+        else:
+            touched.add(update(children, operation))
+
+    result = []
+
+    def follow(anchor):
+        while anchor in inserted:
+            anchor = inserted.pop(anchor)
+            result.append(anchor)
+
+    follow(None)
+    for name in order:
+        if name not in taken:
+            result.append(name)
+            follow(name)
+    if inserted:
+        raise PatchError(f"Cannot place {kind} '{next(iter(inserted.values()))}'.")
+    parent[:] = [children[name] for name in result]
+    return touched
+
+
+def apply_patch(root, patch):
+    """
+    @brief Turns a previous output of parse.py into the new one.
+
+    @param root The `program` element of the previous output; it is modified in place.
+    @param patch The `patch` element from `diff_documents()`.
+    @return The `program` element of the new output.
+
+    @details
+    The document must have the `base` fingerprint of the patch and has the `target`
+    fingerprint afterwards; only the classes the patch touches are fingerprinted again.
+
+    @throws PatchError if the patch is malformed, made for another document, or does not
+            reproduce its target.
+    """
+    if patch.tag != "patch" or patch.get("format") != PATCH_FORMAT or patch.get("version") != str(PATCH_VERSION):
+        raise PatchError(f"Not a {PATCH_FORMAT} document of version {PATCH_VERSION}.")
+    check_program(root)
+    prints = {name: fingerprint(cls) for name, cls in keyed(root, "name").items()}
+    if document_fingerprint(root, prints.values()) != patch.get("base"):
+        raise PatchError("The patch was made for another document.")
+
+    def replace_method(methods, operation):
+        if operation.tag != "replace-method" or len(operation) != 1 or operation[0].get("selector") not in methods:
+            raise PatchError(f"Unexpected '{operation.tag}' operation.")
+        methods[operation[0].get("selector")] = operation[0]
+        return operation[0].get("selector")
+
+    def update_class(classes, operation):
+        name = operation.get("name")
+        if operation.tag != "update-class" or name not in classes:
+            raise PatchError(f"Unexpected '{operation.tag}' operation.")
+        cls = classes[name]
+        cls.attrib.clear()
+        cls.attrib.update(operation.attrib)
+        apply_children(cls, list(operation), "method", "selector", replace_method)
+        return name
+
+    for operation in patch.findall("program"):
+        root.attrib.clear()
+        root.attrib.update(operation.attrib)
+    touched = apply_children(root, [operation for operation in patch if operation.tag != "program"], "class", "name", update_class)
+    class_prints = [fingerprint(cls) if cls.get("name") in touched else prints[cls.get("name")] for cls in root]
+    if document_fingerprint(root, class_prints) != patch.get("target"):
+        raise PatchError("The patched document does not match the target of the patch.")
+    return root
+
+
+def write_text(text, path):
+    """
+    @brief Writes a document with a final newline, like parse.py prints it.
+
+    @param text The document.
+    @param path Output file, replaced only once it is complete, or None for standard output.
+
+    @throws OSError if the file cannot be written.
+    """
+    if path is None:
+        print(text)
+        return
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".astpatch-")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8", newline="\n") as stream:
+            stream.write(text + "\n")
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def main():
+    """
+    @brief Entry point: `diff` writes the patch between two outputs, `apply` applies one.
+
+    @details
+    - `diff OLD NEW` is what `parse.py --diff-against OLD` prints for the program of NEW.
+    - `apply OLD PATCH` prints the new document, byte-identical to the output of parse.py
+      in the same format.
+    - An unreadable input or a patch that does not fit ends with exit code 11, an output
+      that cannot be written with exit code 12.
+    """
+    parser = argparse.ArgumentParser(description="Patches between XML outputs of parse.py.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    diff = commands.add_parser("diff", help="Write the patch from one output to another")
+    diff.add_argument("old", help="Previous output")
+    diff.add_argument("new", help="New output")
+    apply = commands.add_parser("apply", help="Apply a patch to the previous output")
+    apply.add_argument("old", help="Previous output")
+    apply.add_argument("patch", help="Patch from `diff` or `parse.py --diff-against`")
+    for command in (diff, apply):
+        command.add_argument("--format", default="xml", choices=("xml", "xml-compact"), help="Output format (default: xml)")
+        command.add_argument("--output", help="Write to a file instead of stdout")
+    args = parser.parse_args()
+
+    try:
+        old = read_document(args.old)
+        if args.command == "diff":
+            result = diff_documents(old, read_document(args.new))
+        else:
+            result = apply_patch(old, read_document(args.patch))
+    except PatchError as e:
+        sys.stderr.write(f"Error: {e}\n")
+        sys.exit(11)
+    try:
+        write_text(format_document(result, args.format == "xml-compact"), args.output)
+    except OSError as e:
+        sys.stderr.write(f"Error: Cannot write '{args.output}': {e}.\n")
+        sys.exit(12)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
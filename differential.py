@@ -0,0 +1,445 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Differential equivalence harness: runs generated SOL25 programs through the
+# reference pipeline and the alternative engines of parse.py and compares the results.
+import sys
+import re
+import random
+import argparse
+import collections
+import xml.etree.ElementTree as ET
+
+import parse
+
+
+# @brief Selectors used by generated message sends; `read` is left out on purpose,
+# because its check depends on the last class literal visited.
+UNARY_SELECTORS = ("value", "new", "asString", "foo", "isNil")
+KEYWORD_SELECTORS = ("with:", "and:", "plus:", "value:", "from:", "ifTrue:")
+
+# @brief Variable names of generated statements.
+VARIABLES = ("a", "b", "x", "tmp", "res", "val", "cnt")
+
+# @brief Literals accepted wherever an expression base is expected.
+LITERALS = ("0", "42", "-7", "+3", "'text'", "'it\\'s'", "'a\\nb'", "''", "nil", "true", "false", "self", "super")
+
+# @brief Built-in classes usable as parents and class literals.
+BUILTIN_CLASSES = ("Object", "Integer", "String", "Nil", "True", "False", "Block")
+
+# @brief Exit codes the mutations aim at, in reporting order; 0 stands for an unchanged valid program.
+TARGET_CODES = (0, 21, 22, 31, 32, 33, 34, 35)
+
+# @brief Splits a program into lexeme-like chunks for shrinking.
+CHUNK_REGEX = re.compile(r"""\s+|"[^"]*"?|'(?:[^'\\\n]|\\.)*'?|[+-]?\d+|[A-Za-z_][A-Za-z0-9_]*(?::(?!=))?|:[a-z_][A-Za-z0-9_]*|:=|.""", re.S)
+
+
+# @brief Pipelines known to the harness; the first one is the reference.
+PIPELINES = {
+    "lark": parse.Analyzer("lark").analyze,
+    "rd": parse.Analyzer("rd").analyze,
+}
+
+
+def outcome(pipeline, code):
+    """
+    @brief Runs one pipeline and reduces its result to a comparable value.
+
+    @param pipeline A function from PIPELINES returning a `parse.Result`.
+    @param code The source code as a string.
+    @return A tuple of the exit code and the canonical XML (None on error).
+
+    @details
+    - The XML is canonicalized (C14N 2.0, whitespace-only text dropped), so indentation and
+      attribute quoting do not count as differences.
+    - An uncaught exception is reported as a `crash` with its type instead of an exit code.
+    """
+    try:
+        result = pipeline(code)
+    except Exception as e:
+        return "crash", type(e).__name__
+    if result.exit_code:
+        return result.exit_code, None
+    return 0, ET.canonicalize(result.xml, strip_text=True)
+
+
+class ProgramGenerator:
+    # @brief Generates random valid SOL25 programs and mutations of them aimed at a given exit code.
+
+    def __init__(self, rng):
+        """
+        @brief Initializes the generator.
+
+        @param rng The random.Random instance driving all choices.
+        """
+        self.rng = rng
+
+    def program(self):
+        """
+        @brief Generates a semantically valid program model.
+
+        @return A list of classes `[name, parent, methods]`, where each method is
+                `[selector, params, statements]` and each statement `[variable, expression]`.
+
+        @details
+        Classes only inherit from built-ins or earlier classes, method names and parameters
+        are unique, and no statement assigns to a parameter, so the model exits with 0.
+        """
+        rng = self.rng
+        names = ["Main"] + [f"C{index}" for index in range(1, rng.randint(1, 5))]
+        classes = []
+        for index, name in enumerate(names):
+            parent = rng.choice(BUILTIN_CLASSES + tuple(names[:index])) if index else "Object"
+            selectors = rng.sample(UNARY_SELECTORS + ("run", "compute:", "with:and:", "at:put:"), rng.randint(0, 4))
+            if name == "Main" and "run" not in selectors:
+                selectors.append("run")
+            methods = []
+            for selector in selectors:
+                params = rng.sample(("p", "q", "r", "s"), selector.count(":"))
+                methods.append([selector, params, self.statements(params, 0, names[:index + 1])])
+            classes.append([name, parent, methods])
+        return classes
+
+    def statements(self, params, depth, classes):
+        """
+        @brief Generates the statements of a method or block.
+
+        @param params Parameter names in scope; they are read but never assigned.
+        @param depth Current nesting depth of expressions.
+        @param classes User classes that may be used as class literals.
+        @return A list of `[variable, expression]` pairs.
+        """
+        return [[self.rng.choice(VARIABLES), self.expr(params, depth, classes)]
+                for _ in range(self.rng.randint(0, 3))]
+
+    def expr(self, params, depth, classes):
+        """
+        @brief Generates an expression: a base with an optional unary or keyword message.
+
+        @param params Parameter names in scope.
+        @param depth Current nesting depth.
+        @param classes User classes that may be used as class literals.
+        @return The expression source.
+        """
+        base = self.base(params, depth, classes)
+        choice = self.rng.random()
+        if depth > 2 or choice < 0.4:
+            return base
+        if choice < 0.7:
+            return f"{base} {self.rng.choice(UNARY_SELECTORS)}"
+        parts = self.rng.sample(KEYWORD_SELECTORS, self.rng.randint(1, 3))
+        return base + "".join(f" {part} {self.base(params, depth + 1, classes)}" for part in parts)
+
+    def base(self, params, depth, classes):
+        """
+        @brief Generates an expression base: a literal, variable, class, parenthesized expression or block.
+
+        @param params Parameter names in scope.
+        @param depth Current nesting depth.
+        @param classes User classes that may be used as class literals.
+        @return The expression source.
+        """
+        rng = self.rng
+        choice = rng.random()
+        if depth > 2 or choice < 0.5:
+            return rng.choice(LITERALS + VARIABLES + BUILTIN_CLASSES + tuple(classes) + tuple(params))
+        if choice < 0.75:
+            return f"({self.expr(params, depth + 1, classes)})"
+        block_params = rng.sample(("i", "j", "k"), rng.randint(0, 2))
+        body = self.statements(params + block_params, depth + 1, classes)
+        return "[" + "".join(f":{name} " for name in block_params) + "| " + self.render_statements(body) + "]"
+
+    def render_statements(self, statements):
+        """
+        @brief Renders statements as source code, sometimes with comments between them.
+
+        @param statements A list of `[variable, expression]` pairs.
+        @return The source of the statements.
+        """
+        parts = []
+        for variable, expression in statements:
+            if self.rng.random() < 0.1:
+                parts.append('"note"')
+            parts.append(f"{variable} := {expression}.")
+        return " ".join(parts) + " "
+
+    def render(self, classes):
+        """
+        @brief Renders a program model as SOL25 source code.
+
+        @param classes The program model from `program()`.
+        @return The source code, starting with a description comment.
+        """
+        lines = [f'"Generated program {self.rng.randint(0, 9999)}"']
+        for name, parent, methods in classes:
+            lines.append(f"class {name} : {parent} {{")
+            for selector, params, statements in methods:
+                lines.append(f"  {selector} [" + "".join(f":{param} " for param in params)
+                             + "| " + self.render_statements(statements) + "]")
+            lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def case(self, target):
+        """
+        @brief Generates one program aimed at an exit code.
+
+        @param target One of TARGET_CODES.
+        @return The source code.
+
+        @details
+        A valid program is generated and then receives a single mutation of the requested category:
+        - 21: an invalid character, an unterminated string or comment, or a bad escape sequence.
+        - 22: a deleted `.`, `]`, `}` or `:=`, a stray delimiter, or a keyword used as a name.
+        - 31: `Main` or its `run` method renamed.
+        - 32: an undefined parent class or class literal.
+        - 33: a parameter added to `Main.run`.
+        - 34: an assignment to a parameter.
+        - 35: a duplicate class, method or parameter, or cyclic inheritance.
+        """
+        rng = self.rng
+        classes = self.program()
+        main_methods = classes[0][2]
+
+        if target == 31:
+            if rng.random() < 0.5:
+                return re.sub(r"\bMain\b", "Mainly", self.render(classes))
+            for method in main_methods:
+                if method[0] == "run":
+                    method[0] = "runner"
+        elif target == 32:
+            if rng.random() < 0.5 or len(classes) == 1:
+                method = rng.choice(main_methods)
+                method[2].append(["x", rng.choice(["Undefined", "Undefined new", "(Undefined value: 1)"])])
+            else:
+                rng.choice(classes[1:])[1] = "Missing"
+        elif target == 33:
+            for method in main_methods:
+                if method[0] == "run":
+                    method[1] = ["arg"]
+        elif target == 34:
+            selector = rng.choice(("assign:", "assign:to:"))
+            params = ["p", "q"][:selector.count(":")]
+            rng.choice(classes)[2].append([selector, params, [[rng.choice(params), "1"]]])
+        elif target == 35:
+            choice = rng.random()
+            owner = rng.choice(classes)
+            if choice < 0.25:
+                classes.append(list(owner))
+            elif choice < 0.5:
+                duplicate = list(owner[2][0]) if owner[2] else ["value", [], []]
+                owner[2].append(duplicate)
+                if len(owner[2]) == 1:
+                    owner[2].append(list(duplicate))
+            elif choice < 0.75:
+                owner[2].append(["assign:to:", ["p", "p"], []])
+            else:
+                classes.append(["Cycle1", "Cycle2", []])
+                classes.append(["Cycle2", "Cycle1", []])
+
+        source = self.render(classes)
+        if target in (21, 22):
+            source = self.mutate_text(source, target)
+        return source
+
+    def mutate_text(self, source, target):
+        """
+        @brief Applies a lexical or syntactic mutation to the source text.
+
+        @param source A valid program.
+        @param target 21 or 22.
+        @return The mutated source.
+        """
+        rng = self.rng
+        body = source.index("\n") + 1
+        if target == 21:
+            spaces = [match.start() for match in re.finditer(r"\s", source[body:])]
+            pos = body + rng.choice(spaces)
+            damage = rng.choice(["#", "@", "$", "~", "'open", "'bad \\q'", '"unclosed', "é", "="])
+            return source[:pos] + " " + damage + " " + source[pos:]
+
+        choice = rng.random()
+        if choice < 0.6:
+            matches = list(re.finditer(r":=|[.\]}]", source[body:]))
+            match = rng.choice(matches)
+            return source[:body + match.start()] + " " + source[body + match.end():]
+        if choice < 0.85:
+            spaces = [match.start() for match in re.finditer(r"\s", source[body:])]
+            pos = body + rng.choice(spaces)
+            return source[:pos] + " " + rng.choice([")", "(", "|", "{", ":=", ".", "]"]) + " " + source[pos:]
+        return source[:body] + re.sub(r"\b(a|res|x) :=", lambda match: rng.choice(["self", "nil", "class"]) + " :=",
+                                      source[body:], count=1)
+
+
+def differs(reference, alternative, code):
+    """
+    @brief Checks whether two pipelines disagree on a program.
+
+    @param reference Reference pipeline function.
+    @param alternative Alternative pipeline function.
+    @param code The source code.
+    @return A tuple of both outcomes if they differ, otherwise None.
+    """
+    expected = outcome(reference, code)
+    actual = outcome(alternative, code)
+    return (expected, actual) if expected != actual else None
+
+
+def reproduces(reference, alternative, exit_codes):
+    """
+    @brief Builds the shrinking predicate for one difference.
+
+    @param reference Reference pipeline function.
+    @param alternative Alternative pipeline function.
+    @param exit_codes The exit codes of both pipelines on the original program.
+    @return A predicate that is true while the pipelines still disagree with the same exit codes.
+
+    @note Keeping the exit codes stops shrinking from drifting to an unrelated difference.
+    """
+    def still_fails(code):
+        result = differs(reference, alternative, code)
+        return result is not None and (result[0][0], result[1][0]) == exit_codes
+    return still_fails
+
+
+def structural_candidates(chunks):
+    """
+    @brief Proposes removals of whole syntactic units, which plain chunk deletion rarely keeps valid.
+
+    @param chunks The program split into chunks.
+    @return A generator of candidate chunk lists.
+
+    @details
+    - Every bracketed group `(...)`, `[...]` and `{...}` is removed, also together with up to
+      eight chunks before it (a class header or a method selector), and parentheses are unwrapped.
+    - Every statement `name := ... .` is removed.
+    """
+    openers = {"(": ")", "[": "]", "{": "}"}
+    stack = []
+    for index, chunk in enumerate(chunks):
+        if chunk in openers:
+            stack.append(index)
+        elif chunk in openers.values() and stack:
+            start = stack.pop()
+            for back in range(0, 9):
+                if start - back >= 0:
+                    yield chunks[:start - back] + chunks[index + 1:]
+            if chunks[start] == "(":
+                yield chunks[:start] + chunks[start + 1:index] + chunks[index + 1:]
+        elif chunk == ".":
+            depth = 0
+            for start in range(index - 1, -1, -1):
+                if chunks[start] in openers.values():
+                    depth += 1
+                elif chunks[start] in openers:
+                    depth -= 1
+                    if depth < 0:
+                        break
+                elif chunks[start] == ":=" and depth == 0:
+                    while start > 0 and (chunks[start] == ":=" or chunks[start].isspace()):
+                        start -= 1
+                    yield chunks[:start] + chunks[index + 1:]
+                    break
+
+
+def shrink(code, still_fails):
+    """
+    @brief Reduces a failing program to a minimal reproducer.
+
+    @param code The failing source code.
+    @param still_fails Predicate telling whether a candidate still shows the difference.
+    @return The smallest failing source found.
+
+    @details
+    - The program is first re-spaced to single spaces between lexemes, if that keeps the failure.
+    - Whole syntactic units from `structural_candidates()` are removed while the failure stays.
+    - Delta debugging then removes runs of chunks, halving the run length down to single chunks.
+    - Both steps repeat until neither removes anything.
+    """
+    chunks = CHUNK_REGEX.findall(code)
+    separator = ""
+    words = [chunk for chunk in chunks if not chunk.isspace()]
+    if still_fails(" ".join(words)):
+        chunks, separator = words, " "
+
+    changed = True
+    while changed:
+        changed = False
+        progress = True
+        while progress:
+            progress = False
+            for candidate in structural_candidates(chunks):
+                if candidate and still_fails(separator.join(candidate)):
+                    chunks = candidate
+                    progress = changed = True
+                    break
+
+        size = max(len(chunks) // 2, 1)
+        while True:
+            index = 0
+            removed = False
+            while index < len(chunks):
+                candidate = chunks[:index] + chunks[index + size:]
+                if candidate and still_fails(separator.join(candidate)):
+                    chunks = candidate
+                    removed = changed = True
+                else:
+                    index += size
+            if size == 1 and not removed:
+                break
+            size = max(size // 2, 1)
+    return separator.join(chunks)
+
+
+def main():
+    """
+    @brief Entry point: generates the cases, compares the pipelines and prints the report.
+
+    @details
+    - For every case, each alternative pipeline is compared with the reference.
+    - A difference is shrunk to a minimal program on which the two pipelines disagree the same way.
+    - The summary lists, per targeted exit code, how many cases the reference actually ended with it.
+    - Exits with 1 if any difference was found, otherwise 0.
+    """
+    names = list(PIPELINES)
+    parser = argparse.ArgumentParser(description="Differential test of the SOL25 parser engines.")
+    parser.add_argument("--cases", type=int, default=1000, help="Number of generated programs (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--engine", action="append", choices=names[1:],
+                        help="Alternative pipeline to check, repeatable (default: all)")
+    parser.add_argument("--no-shrink", action="store_true", help="Report failing programs without shrinking them")
+    args = parser.parse_args()
+
+    reference = PIPELINES[names[0]]
+    alternatives = args.engine or names[1:]
+    generator = ProgramGenerator(random.Random(args.seed))
+    hits = collections.Counter()
+    totals = collections.Counter()
+    failures = 0
+
+    for case in range(args.cases):
+        target = TARGET_CODES[case % len(TARGET_CODES)]
+        code = generator.case(target)
+        expected = outcome(reference, code)
+        totals[target] += 1
+        hits[target] += expected[0] == target
+
+        for name in alternatives:
+            actual = outcome(PIPELINES[name], code)
+            if actual == expected:
+                continue
+            failures += 1
+            print(f"DIFF case {case} (target {target}): {names[0]} exit {expected[0]}, {name} exit {actual[0]}")
+            shrunk = code
+            if not args.no_shrink:
+                shrunk = shrink(code, reproduces(reference, PIPELINES[name], (expected[0], actual[0])))
+                shrunk_expected, shrunk_actual = differs(reference, PIPELINES[name], shrunk)
+                print(f"  shrunk: {names[0]} exit {shrunk_expected[0]}, {name} exit {shrunk_actual[0]}")
+            print("  program: " + repr(shrunk))
+
+    print(f"{args.cases} cases, seed {args.seed}, engines {', '.join(alternatives)}: {failures} difference(s)")
+    for target in TARGET_CODES:
+        print(f"  target {target}: {totals[target]} cases, reference exit matched {hits[target]}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
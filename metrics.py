@@ -0,0 +1,111 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Code metrics of a corpus of SOL25 programs: measured by the semantic checks of parse.py into
+# binary column tables, which are merged and summarized with percentiles and histograms.
+import sys
+import argparse
+import gzip
+
+import parse
+from xref import collect_sources
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+
+def collect_metrics(paths, analyzer, log=sys.stderr):
+    """
+    @brief Measures a set of source files.
+
+    @param paths Files and directories; directories are searched for source files like by `xref.py index`.
+    @param analyzer A `parse.Analyzer` with the Metrics receiving the files.
+    @param log Stream receiving one line per file that fails to analyze.
+    @return A tuple of the numbers of measured and failed files.
+
+    @details
+    The XML is not built, so the Lark engine only parses and checks each file. A file that
+    fails the analysis adds no rows.
+    """
+    files, _ = collect_sources(paths)
+    measured = failed = 0
+    for path in files:
+        try:
+            with open(path, "rb") as file:
+                buffer = file.read()
+        except OSError as e:
+            log.write(f"{path}: {e.strerror}\n")
+            failed += 1
+            continue
+        result = analyzer.analyze(buffer, build_ast=False)
+        if result.exit_code:
+            exit_code, message = result.errors[0]
+            log.write(f"{path}: exit {exit_code}: {message}\n")
+            failed += 1
+        else:
+            measured += 1
+    return measured, failed
+
+
+def load_metrics(paths):
+    """
+    @brief Reads and merges binary metric tables.
+
+    @param paths Files written by `collect` or `parse.py --metrics`; `.gz` and `.xz` are decompressed.
+    @return The merged `parse.Metrics`.
+
+    @throws parse.SOL25Error (exit code 11) if a file cannot be read or is not a metric table.
+    """
+    metrics = parse.Metrics()
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else lzma.open if path.endswith(".xz") and lzma is not None else open
+        try:
+            with opener(path, "rb") as file:
+                metrics.merge(parse.decode_metrics(file.read()))
+        except (OSError, EOFError, ValueError) + ((lzma.LZMAError,) if lzma is not None else ()) as e:
+            raise parse.SOL25Error(11, f"Cannot read metrics '{path}': {e}")
+    return metrics
+
+
+def main():
+    """
+    @brief Entry point: `collect` measures source files, `summary` aggregates the tables.
+
+    @details
+    - `collect OUT PATH...` writes the binary columns of all measured files to OUT, or their
+      summary table for a `.csv` path, and prints the numbers of measured and failed files.
+      Files are checked as libraries, so class libraries without `Main` are measured too.
+    - `summary TABLE...` merges tables, for example of a corpus collected in several parts,
+      and prints percentiles, or with `--csv` also the histograms, of every metric.
+    """
+    parser = argparse.ArgumentParser(description="Code metrics of SOL25 programs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    collect = commands.add_parser("collect", help="Measure source files into a metric table")
+    collect.add_argument("output", help="Output file: binary columns, or the summary table for a .csv path")
+    collect.add_argument("paths", nargs="+", help="Source files and directories")
+    collect.add_argument("--interface", action="append", default=[], help="Library interface known to every file; repeatable")
+    collect.add_argument("--engine", default="lark", choices=parse.PARSER_ENGINES, help="Parser engine (default: lark)")
+    summary = commands.add_parser("summary", help="Aggregate metric tables")
+    summary.add_argument("tables", nargs="+", help="Binary metric tables")
+    summary.add_argument("--csv", action="store_true", help="Print the summary as CSV with the histograms")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "collect":
+            library = [entry for path in args.interface for entry in parse.load_interface(path)]
+            metrics = parse.Metrics()
+            analyzer = parse.Analyzer(args.engine, library=library, require_main=False, metrics=metrics)
+            measured, failed = collect_metrics(args.paths, analyzer)
+            parse.write_metrics(metrics, args.output)
+            print(f"{measured} measured, {failed} failed")
+        else:
+            print(parse.format_metrics(parse.summarize_metrics(load_metrics(args.tables)), "csv" if args.csv else "text"),
+                  end="\n" if not args.csv else "")
+    except parse.SOL25Error as e:
+        e.report()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,35 @@
 # IPP 2024 1.part
 import sys
 import re
+import gc
+import threading
+import contextvars
+import contextlib
+import mmap
 import argparse
+import bisect
+import collections
+import itertools
+import os
+import tempfile
+import gzip
+import hashlib
+import concurrent.futures
+import io
+import array
+import json
+import sqlite3
+import time
 import xml.etree.ElementTree as ET
-from lark import Lark, Transformer, Tree, UnexpectedInput, UnexpectedCharacters, UnexpectedToken, LexError, Token , Visitor
+from lark import Lark, Transformer, Tree, UnexpectedInput, UnexpectedCharacters, UnexpectedToken, LexError, Token , Visitor, v_args
+from lark.lexer import BasicLexer, ContextualLexer
 import xml.dom.minidom
 
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
 
 
 TOKEN_TYPES = [
@@ -35,7 +59,7 @@ TOKEN_TYPES = [
 
     # @brief Literals.
     (r"[+-]?\d+", "INTEGER"),  
-    (r"'(?:\\['n\\]|[^'\\\n])*'", "STRING"),  
+    (r"'(?:\\['n\\]|[^'\\\n\r])*'", "STRING"),  
 
     # @brief Operators and delimiters.
     (r":=", "ASSIGN"),
@@ -54,6 +78,19 @@ TOKEN_TYPES = [
     (r"\".*?\"", None)
 ]
 
+# @brief Single compiled bytes regex equivalent to trying TOKEN_TYPES in order.
+# Groups are named T<index>; TOKEN_GROUPS maps a group name back to its token type.
+# Comments and whitespace are tried first: no other pattern can start with their
+# first character, so moving them ahead does not change which pattern wins.
+# The leading word boundary is dropped, because the original lexer matched on a
+# fresh slice where it always held, while here the previous byte stays visible.
+TOKEN_REGEX = re.compile(rb'(?P<COMMENT>"[^"]*")|(?P<WHITESPACE>\s+)|' + b"|".join(
+    b"(?P<T%d>%s)" % (index, pattern.removeprefix(r"\b").encode())
+    for index, (pattern, token_type) in enumerate(TOKEN_TYPES)
+))
+TOKEN_GROUPS = {f"T{index}": token_type for index, (pattern, token_type) in enumerate(TOKEN_TYPES)}
+TOKEN_GROUPS.update(COMMENT=None, WHITESPACE=None)
+
 # @brief Lark grammar based on SOL25 language.
 GRAMMAR = r'''
 program: class_def*
@@ -80,7 +117,6 @@ expr_sel: ID_COLON expr_base expr_sel*
 
 expr_base: SIGNED_INT
          | STR
-         | EXP_KEYWORD    
          | ID             
          | CID            
          | "(" expr ")"   
@@ -89,13 +125,9 @@ expr_base: SIGNED_INT
 block: "[" param_list "|" blockstat "]"
 
 
-EXP_KEYWORD : "self" | "super" | "nil" | "true" | "false"
-
-
-KEYWORD: "class" | "self" | "super" | "nil" | "true" | "false"
-
-
-VALID_ID: /(?!(class|self|super|nil|true|false)\b)[a-z_][a-zA-Z0-9_]*/
+// The contextual lexer never offers VALID_ID and ID in the same parser state,
+// so the keyword lookahead only runs where a declared name or unary selector is expected.
+VALID_ID: /(?!(?:class|self|super|nil|true|false)\b)[a-z_][a-zA-Z0-9_]*/
 
 
 CID: /[A-Z][a-zA-Z0-9_]*/
@@ -109,16 +141,207 @@ ID_COLON.2: /[a-z_][a-zA-Z0-9_]*:/
 //METHOD_COLON: /[a-z_][a-zA-Z0-9_]*:/
 
 
-COLON_ID: /:(?!(class|self|super|nil|true|false)\b)[a-z_][a-zA-Z0-9_]*/
+COLON_ID: /:(?!(?:class|self|super|nil|true|false)\b)[a-z_][a-zA-Z0-9_]*/
 
 STR: /'([^'\\]|\\.)*'/
 %import common.SIGNED_INT
 
+COMMENT: /"[^"]*"/
+
 %ignore /[ \t\n\f\r]+/
-%ignore /"[^"]*"/
+%ignore COMMENT
 '''
+# @brief Trivia channel: the comment list of the parse running in the current thread or context.
+# The parser and its lexer callbacks are shared, so each parse points the callback at its own list.
+comment_sink = contextvars.ContextVar("comment_sink", default=None)
+
+def collect_comment(token):
+    """
+    @brief Lexer callback storing a skipped comment token in the list of the running parse.
+
+    @param token The COMMENT token.
+    """
+    comments = comment_sink.get()
+    if comments is not None:
+        comments.append(token)
+
+# @brief Limits of the parse running in the current thread or context, set by `parse_code()`.
+parse_limits = contextvars.ContextVar("parse_limits", default=None)
+
+def check_deadline(token):
+    """
+    @brief Lexer callback counting the statement ends of the running parse against its time limit.
+
+    @param token The DOT token.
+    @return The token unchanged.
+    """
+    limits = parse_limits.get()
+    if limits is not None:
+        limits.tick()
+    return token
+
+# @brief Lexer callbacks shared by all parser variants.
+LEXER_CALLBACKS = {"COMMENT": collect_comment, "DOT": check_deadline}
+
+# @brief Whitespace skipped in front of a token by the state lexers, the `%ignore` regex of the grammar.
+SKIPPED_WHITESPACE = r"[ \t\n\f\r]*"
+
+
+class WhitespaceSkippingLexer(BasicLexer):
+    # @brief Lark state lexer that skips the whitespace before a token with a regex prefix.
+
+    def _build_scanner(self):
+        """
+        @brief Builds the Lark scanner and, from its patterns, the ones with the whitespace prefix.
+
+        @return The Lark scanner.
+        """
+        scanner = super()._build_scanner()
+        self.skipping_patterns = [self.re.compile(SKIPPED_WHITESPACE + "(?:" + pattern.pattern + ")", self.g_regex_flags)
+                                  for pattern in scanner._mres]
+        return scanner
+
+    def next_token(self, lex_state, parser_state=None):
+        """
+        @brief Returns the next token of the input.
+
+        @param lex_state The Lark lexer state with the text and the line counter.
+        @param parser_state The LALR parser state, for error reports.
+        @return The token.
+
+        @throws EOFError at the end of the input, UnexpectedCharacters from `BasicLexer.next_token()`.
+
+        @details
+        The basic lexer matches the whitespace in front of most tokens as an ignored token of
+        its own, a second pass through the scanner and the line counter. Here one match covers
+        both; the whitespace only moves the line counter. Comments are still ignored tokens,
+        because their callback collects them. If nothing matches after the whitespace, the
+        basic lexer takes over and raises the same error at the same position.
+        """
+        if self._scanner is None:
+            # @brief Builds the scanner and the prefixed patterns on first use, like the basic lexer.
+            self.scanner
+        line_ctr = lex_state.line_ctr
+        text = lex_state.text.text
+        end = lex_state.text.end
+        while line_ctr.char_pos < end:
+            for pattern in self.skipping_patterns:
+                match = pattern.match(text, line_ctr.char_pos, end)
+                if match:
+                    break
+            else:
+                return BasicLexer.next_token(self, lex_state, parser_state)
+            type_ = match.lastgroup
+            start = match.start(type_)
+            if start != line_ctr.char_pos:
+                line_ctr.feed(text[line_ctr.char_pos:start])
+            value = match.group(type_)
+
+            ignored = type_ in self.ignore_types
+            token = None
+            if not ignored or type_ in self.callback:
+                token = Token(type_, value, line_ctr.char_pos, line_ctr.line, line_ctr.column)
+            line_ctr.feed(value, type_ in self.newline_types)
+            if token is not None:
+                token.end_line = line_ctr.line
+                token.end_column = line_ctr.column
+                token.end_pos = line_ctr.char_pos
+                if token.type in self.callback:
+                    token = self.callback[token.type](token)
+                if not ignored:
+                    if not isinstance(token, Token):
+                        raise LexError(f"Callbacks must return a token (returned {token!r})")
+                    lex_state.last_token = token
+                    return token
+        raise EOFError(self)
+
+
+class WhitespaceSkippingContextualLexer(ContextualLexer):
+    # @brief Lark contextual lexer whose per-state lexers skip whitespace with a regex prefix.
+    BasicLexer = WhitespaceSkippingLexer
+
+# @brief Lark plugins of all parser variants: the contextual lexer with whitespace prefixes.
+LEXER_PLUGINS = {"ContextualLexer": WhitespaceSkippingContextualLexer}
+
 # @brief Create a Lark parser for the SOL25 language.
-parser = Lark(GRAMMAR,start = 'program',parser="lalr")
+parser = Lark(GRAMMAR,start = 'program',parser="lalr", lexer="contextual", lexer_callbacks=LEXER_CALLBACKS,
+              _plugins=LEXER_PLUGINS)
+
+# @brief Compiled patterns of the grammar terminals, used to retype tokens during error recovery.
+TERMINAL_PATTERNS = {terminal.name: re.compile(terminal.pattern.to_regexp()) for terminal in parser.terminals}
+
+# @brief Parser that also records line/column spans of rules; built on first use by `--positions`.
+positions_parser = None
+
+# @brief Guards the lazy creation of `positions_parser` when analyses run in several threads.
+parser_lock = threading.Lock()
+
+
+class SOL25Error(Exception):
+    # @brief Error that ends an analysis; `main()` prints it and exits with its code.
+
+    def __init__(self, exit_code, message, output=""):
+        """
+        @brief Initializes the error.
+
+        @param exit_code Exit code of the error category.
+        @param message The message printed after "Error: " on standard error.
+        @param output Diagnostic text that the command line prints on standard error first.
+        """
+        super().__init__(message)
+        self.exit_code = exit_code
+        self.message = message
+        self.output = output
+
+    def report(self):
+        """
+        @brief Prints the error the way the command line reports it and terminates execution.
+        """
+        if self.output:
+            sys.stderr.write(self.output)
+        sys.stderr.write(f"Error: {self.message}\n")
+        sys.exit(self.exit_code)
+
+
+def prepare_lexers(lark_parser):
+    """
+    @brief Compiles the scanners of a Lark parser in advance.
+
+    @param lark_parser A parser using the contextual lexer.
+    @return The same parser.
+
+    @details
+    Lark builds the scanner of each lexer state on first use and installs the lexer
+    callbacks at that moment. Doing it up front means parses running in several
+    threads only ever read the shared parser.
+    """
+    lexer = lark_parser.parser.lexer
+    for state_lexer in (*lexer.lexers.values(), lexer.root_lexer):
+        state_lexer.scanner
+    return lark_parser
+
+prepare_lexers(parser)
+
+def get_parser(positions=False):
+    """
+    @brief Returns the Lark parser for the requested mode.
+
+    @param positions True if tree nodes must carry line/column spans.
+    @return The plain LALR parser, or the one with `propagate_positions` enabled.
+
+    @details
+    Position propagation slows down tree building, so it is only enabled for `--positions`
+    and the parser that uses it is created lazily.
+    """
+    global positions_parser
+    if not positions:
+        return parser
+    with parser_lock:
+        if positions_parser is None:
+            positions_parser = prepare_lexers(Lark(GRAMMAR, start='program', parser="lalr", lexer="contextual",
+                                                   propagate_positions=True, lexer_callbacks=LEXER_CALLBACKS,
+                                                   _plugins=LEXER_PLUGINS))
+    return positions_parser
 
 def print_help():
     print("""Code Analyzer in SOL25 (parse.py)
@@ -130,98 +353,575 @@ def tokenize(code):
     """
     @brief Tokenizes the given SOL25 source code.
     
-    @param code The source code as a string.
+    @param code The source code as a string or a bytes-like buffer (bytes, mmap).
     @return A list of tuples, where each tuple contains a token type and its corresponding lexeme.
 
     @details
-    This function scans the input code and breaks it into tokens based on predefined patterns.
+    Collects everything produced by `iter_tokens()` into a list.
+    """
+    if isinstance(code, str):
+        code = code.encode("utf-8")
+    return list(iter_tokens(code))
+
+
+def iter_tokens(buffer, diagnostics=None):
+    """
+    @brief Lazily tokenizes SOL25 source code held in a bytes-like buffer.
+
+    @param buffer The UTF-8 encoded source code (bytes or a memory-mapped file).
+    @param diagnostics Optional Diagnostics collecting errors instead of terminating (`--all-errors`).
+    @return A generator of tuples, where each tuple contains a token type and its corresponding lexeme.
+
+    @details
+    This function scans the buffer in place and breaks it into tokens based on predefined patterns.
     It follows these steps:
-    1. Skips over comments enclosed in double quotes.
-    2. Matches the code against predefined token patterns from TOKEN_TYPES.
-    3. Adds recognized tokens to the token list.
-    4. Handles invalid tokens by reporting an error and terminating execution.
-    """
-    tokens = []
-    while code:
-        match = None
-
-        # @brief Skip comments enclosed in double quotes.
-        if code.startswith('"'):
-            end_index = code.find('"', 1)
-            if end_index == -1:
-                sys.stderr.write("Error: Unclosed comment in source code.\n")
-                sys.exit(21)
-            code = code[end_index + 1:]
-            continue  
-
-        # @brief Iterate through predefined token patterns.
-        for pattern, token_type in TOKEN_TYPES:
-            regex = re.compile(pattern)
-            match = regex.match(code)
-
-            if match:
-                lexeme = match.group(0)
-           
-                # @brief Store the token only if it has a valid type.
-                if token_type:  
-                   tokens.append((token_type, lexeme))
+    1. Scans the buffer with the combined TOKEN_REGEX, which also skips comments and whitespace.
+    2. Decodes and yields only lexemes of tokens that have a valid type.
+    3. Handles invalid tokens and unclosed comments by raising SOL25Error (exit code 21),
+       or by recording it and continuing with the next token when `diagnostics` is given.
+    """
+    pos = 0
+    recent_tokens = collections.deque(maxlen=5)
+
+    for match in TOKEN_REGEX.finditer(buffer):
+        # @brief A gap before the next match means the text at `pos` is not a token.
+        if match.start() != pos:
+            invalid_token(buffer, pos, recent_tokens, diagnostics)
+            if buffer[pos] == 0x22:
+                return
+
+        # @brief Store the token only if it has a valid type.
+        token_type = TOKEN_GROUPS[match.lastgroup]
+        pos = match.end()
+        if token_type:
+            token = (token_type, match.group().decode("utf-8"))
+            recent_tokens.append(token)
+            yield token
+
+    if pos != len(buffer):
+        invalid_token(buffer, pos, recent_tokens, diagnostics)
+
+
+def invalid_token(buffer, pos, recent_tokens, diagnostics=None):
+    """
+    @brief Reports an unrecognized token or an unclosed comment.
+
+    @param buffer The UTF-8 encoded source code.
+    @param pos Offset of the first byte that no token pattern matches.
+    @param recent_tokens The last tokens extracted before the error.
+    @param diagnostics Optional Diagnostics; the error is recorded there and execution continues.
+
+    @throws SOL25Error (exit code 21) without `diagnostics`; the recent tokens go to its `output`.
+    """
+    # @brief Decode before cutting, so a multi-byte character is never split; 20 characters
+    # take at most 80 bytes of UTF-8.
+    remaining = bytes(buffer[pos:pos + 80]).decode("utf-8", errors="replace")[:20]
+    if diagnostics is not None:
+        line_start = buffer.rfind(b"\n", 0, pos) + 1
+        line = bytes(buffer[:line_start]).count(b"\n") + 1
+        message = "Unclosed comment in source code." if buffer[pos] == 0x22 else f"Invalid token near '{remaining}'"
+        diagnostics.add(21, message, (line, pos - line_start + 1), lexical=True)
+        return
+
+    if buffer[pos] == 0x22:
+        raise SOL25Error(21, "Unclosed comment in source code.")
+
+    output = (f"\n Error: Invalid token detected!\n"
+              f"   Remaining code: {remaining}\n"
+              f"   Last extracted tokens: {list(recent_tokens)}\n")
+    raise SOL25Error(21, f"Invalid token near '{remaining}'", output)
+
+
+def read_source(path, max_bytes=None):
+    """
+    @brief Reads the raw SOL25 source from a file or standard input.
+
+    @param path Path to the source file, or None for standard input.
+    @param max_bytes Optional size limit; standard input is read only one byte past it,
+                     so `Limits.check_size()` can reject it without buffering all of it.
+    @return A bytes-like buffer; regular files are memory-mapped instead of copied.
+
+    @throws SOL25Error (exit code 11) if the file cannot be opened.
+    """
+    if path is None:
+        return sys.stdin.buffer.read(-1 if max_bytes is None else max_bytes + 1)
+
+    try:
+        with open(path, "rb") as file:
+            try:
+                return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # @brief Empty files and non-regular files (pipes) cannot be mapped.
+                return file.read(-1 if max_bytes is None else max_bytes + 1)
+    except FileNotFoundError:
+        raise SOL25Error(11, f"File '{path}' not found.")
+    except PermissionError:
+        raise SOL25Error(11, f"No permission to read file '{path}'.")
+
+
+def decode_source(buffer):
+    """
+    @brief Decodes the raw source buffer into text for the Lark parser.
+
+    @param buffer The UTF-8 encoded source code.
+    @return The decoded source with universal newlines, as text-mode reading would give.
+
+    @throws SOL25Error (exit code 21) if the buffer is not valid UTF-8.
+    """
+    try:
+        text = str(buffer, "utf-8")
+    except UnicodeDecodeError as e:
+        raise SOL25Error(21, f"Invalid UTF-8 sequence at byte {e.start}.")
+
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def node_position(node):
+    """
+    @brief Finds the source position of a tree node, token or parser error.
+
+    @param node A Lark Tree, Token or UnexpectedInput, or None.
+    @return A tuple (line, column), or None if the position is unknown.
+
+    @details
+    Trees without propagated positions fall back to their first token,
+    which always carries its position.
+    """
+    if isinstance(node, Token):
+        line, column = node.line, node.column
+    elif isinstance(node, Tree) and not node.meta.empty:
+        line, column = node.meta.line, node.meta.column
+    elif isinstance(node, Tree):
+        token = next(node.scan_values(lambda value: isinstance(value, Token)), None)
+        return node_position(token)
+    elif isinstance(node, UnexpectedInput):
+        line, column = node.line, node.column
+    else:
+        return None
+
+    if line is None or line < 1:
+        return None
+    return line, column
+
+
+def format_position(node):
+    """
+    @brief Formats the source position of a tree node or token for error messages.
+
+    @param node A Lark Tree, Token or UnexpectedInput, or None.
+    @return A string such as " (line 3, column 7)", or an empty string if the position is unknown.
+    """
+    position = node_position(node)
+    return f" (line {position[0]}, column {position[1]})" if position else ""
+
+
+class Diagnostics:
+    # @brief Collects errors in `--all-errors` mode instead of terminating on the first one.
+
+    def __init__(self):
+    # @brief Initializes an empty list of (exit code, message) errors.
+
+        self.errors = []
+        self.lexical_positions = set()
+
+    def add(self, exit_code, message, position=None, lexical=False):
+        """
+        @brief Records an error.
+
+        @param exit_code Exit code of the error category.
+        @param message The error message.
+        @param position Optional tuple (line, column) appended to the message.
+        @param lexical True for lexical errors; a second one at the same position is dropped,
+               because the regex lexer and the Lark lexer both see the same invalid character.
+        """
+        if lexical:
+            if position in self.lexical_positions:
+                return
+            self.lexical_positions.add(position)
+        if position:
+            message = f"{message} (line {position[0]}, column {position[1]})"
+        self.errors.append((exit_code, message))
+
+    def report(self):
+        """
+        @brief Prints all recorded errors and terminates with the exit code of the first one.
+        """
+        for exit_code, message in self.errors:
+            sys.stderr.write(f"Error: {message} [{exit_code}]\n")
+        sys.exit(self.errors[0][0])
+
+
+class Limits:
+    # @brief Resource limits of an analysis; exceeding one ends it with exit code 13.
+
+    # @brief Number of steps between two reads of the clock. A step can be short, so the clock is
+    # also read at the end of every phase of the analysis (`check_time()`).
+    CLOCK_INTERVAL = 1024
+
+    def __init__(self, max_bytes=None, max_tokens=None, max_depth=None, max_classes=None, time_limit=None):
+        """
+        @brief Stores the limits; None leaves a resource unlimited.
+
+        @param max_bytes Maximum size of the source in bytes, all files together.
+        @param max_tokens Maximum number of tokens, all files together.
+        @param max_depth Maximum nesting of parentheses and blocks.
+        @param max_classes Maximum number of classes.
+        @param time_limit Maximum wall-clock time of the analysis in seconds.
+        """
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self.max_depth = max_depth
+        self.max_classes = max_classes
+        self.time_limit = time_limit
+        self.deadline = None
+        self.tokens = 0
+        self.classes = 0
+        self.steps = 0
+
+    def start(self):
+        """
+        @brief Starts the budget of one analysis.
+
+        @return A new Limits with the same limits, empty counters and the deadline set,
+                so a shared Analyzer can govern concurrent analyses separately.
+        """
+        budget = Limits(self.max_bytes, self.max_tokens, self.max_depth, self.max_classes, self.time_limit)
+        if self.time_limit is not None:
+            budget.deadline = time.monotonic() + self.time_limit
+        return budget
+
+    def check_size(self, size):
+        """
+        @brief Checks the size of the source.
+
+        @param size Number of bytes of all source files.
+
+        @throws SOL25Error (exit code 13) if the size exceeds `max_bytes`.
+        """
+        if self.max_bytes is not None and size > self.max_bytes:
+            raise SOL25Error(13, f"Source exceeds the limit of {self.max_bytes} bytes.")
+
+    def tokens_of(self, tokens):
+        """
+        @brief Passes the tokens of the pre-pass through, counting them, their nesting and the classes.
+
+        @param tokens Tokens of `iter_tokens()`.
+        @return A generator of the same tokens.
+
+        @throws SOL25Error (exit code 13) as soon as a token exceeds a limit, before the parser
+                or the recursive passes over the tree see the input, or at the end if the
+                time limit has passed, e.g. while matching one huge token.
+        """
+        max_tokens = self.max_tokens if self.max_tokens is not None else float("inf")
+        max_depth = self.max_depth if self.max_depth is not None else float("inf")
+        max_classes = self.max_classes if self.max_classes is not None else float("inf")
+        depth = 0
+        for token in tokens:
+            self.tokens += 1
+            if self.tokens > max_tokens:
+                raise SOL25Error(13, f"Source exceeds the limit of {self.max_tokens} tokens.")
+            token_type = token[0]
+            if token_type == "L_ROUND" or token_type == "L_BRACKET":
+                depth += 1
+                if depth > max_depth:
+                    raise SOL25Error(13, f"Nesting depth exceeds the limit of {self.max_depth}.")
+            elif token_type == "R_ROUND" or token_type == "R_BRACKET":
+                depth -= 1
+            elif token_type == "KEY_CLASS":
+                self.classes += 1
+                if self.classes > max_classes:
+                    raise SOL25Error(13, f"Program exceeds the limit of {self.max_classes} classes.")
+            if not self.tokens % self.CLOCK_INTERVAL:
+                self.check_time()
+            yield token
+        self.check_time()
+
+    def tick(self):
+        """
+        @brief Counts one step of a parser or tree pass and checks the deadline every CLOCK_INTERVAL steps.
+
+        @throws SOL25Error (exit code 13) if the time limit has passed.
+        """
+        self.steps += 1
+        if not self.steps % self.CLOCK_INTERVAL:
+            self.check_time()
+
+    def check_time(self):
+        """
+        @brief Checks the deadline.
+
+        @throws SOL25Error (exit code 13) if the time limit has passed.
+        """
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise SOL25Error(13, f"Analysis exceeds the time limit of {self.time_limit:g} s.")
+
+
+class ErrorRecovery:
+    # @brief Lark `on_error` handler that resynchronizes the LALR parser at `.`, `]` and `}`.
+
+    SYNC_TERMINALS = ("DOT", "RSQB", "RBRACE")
+
+    def __init__(self, diagnostics):
+        """
+        @brief Initializes the handler.
+
+        @param diagnostics Diagnostics receiving every lexical and syntax error.
+        """
+        self.diagnostics = diagnostics
+        self.last_error = None
+
+    def __call__(self, error):
+        """
+        @brief Records a parser error and repairs the parser state so parsing can resume.
+
+        @param error The UnexpectedInput raised by Lark.
+        @return True to resume parsing, False to give up.
+
+        @details
+        - Lexical errors are recorded and Lark skips the offending character.
+        - After a syntax error, input is discarded up to the next `.`, `]` or `}`.
+        - Starting with that token, the parser stack is popped until some enclosing state
+          accepts the token; tokens no state accepts are discarded as well.
+        - A `.` that cannot end the broken statement drops it, so parsing resumes at the
+          start of the next statement.
+        - At the end of input, missing `.`, `]` and `}` are inserted so the tree is complete.
+        """
+        self.last_error = error
+        if isinstance(error, UnexpectedCharacters):
+            self.diagnostics.add(21, "Lexical error.", node_position(error), lexical=True)
+            return True
+
+        parser_state = error.interactive_parser.parser_state
+        lexer_thread = error.interactive_parser.lexer_thread
+        token = error.token
+        if token.type == "$END":
+            self.diagnostics.add(22, "Syntax error.", node_position(error))
+            return self.close_input(parser_state, token)
+
+        self.diagnostics.add(22, "Syntax error.", node_position(error))
+        while token is not None and token.type not in self.SYNC_TERMINALS:
+            token = self.next_token(lexer_thread)
+
+        if token is not None and token.type == "DOT":
+            if self.resume(parser_state, token):
+                return True
+            self.drop_statement(parser_state)
+            token = self.next_token(lexer_thread)
+
+        while token is not None:
+            if self.resume(parser_state, token):
+                return True
+            token = self.next_token(lexer_thread)
+
+        return self.close_input(parser_state, error.token)
+
+    def next_token(self, lexer_thread):
+        """
+        @brief Reads the next token with the state-independent root lexer.
+
+        @param lexer_thread The Lark lexer thread of the failed parse.
+        @return The next token, or None at the end of input.
+        """
+        lexer = getattr(lexer_thread.lexer, "root_lexer", lexer_thread.lexer)
+        lexer_state = lexer_thread.state
+        while True:
+            try:
+                return lexer.next_token(lexer_state)
+            except EOFError:
+                return None
+            except UnexpectedCharacters as e:
+                self.diagnostics.add(21, "Lexical error.", node_position(e), lexical=True)
+                pos = lexer_state.line_ctr.char_pos
+                lexer_state.line_ctr.feed(lexer_state.text.text[pos:pos + 1])
+
+    def retype(self, token, actions):
+        """
+        @brief Adapts a token to the terminals a parser state accepts.
+
+        @param token The token read by the root lexer.
+        @param actions The LALR action table of the state.
+        @return The token, a copy retyped to an accepted terminal matching its text, or None.
+        """
+        if token.type in actions:
+            return token
+        for name in sorted(actions):
+            pattern = TERMINAL_PATTERNS.get(name)
+            if pattern is not None and pattern.fullmatch(token.value):
+                return Token.new_borrow_pos(name, token.value, token)
+        return None
+
+    def feed(self, parser_state, depth, token):
+        """
+        @brief Feeds a token to the parser after cutting its stack to the given depth.
+
+        @param parser_state The Lark parser state, changed only on success.
+        @param depth Number of parser states to keep.
+        @param token The token to feed.
+        @return True if the parser accepted the token.
+        """
+        trial = parser_state.copy(deepcopy_values=False)
+        del trial.state_stack[depth:]
+        del trial.value_stack[depth - 1:]
+        try:
+            trial.feed_token(token)
+        except UnexpectedToken:
+            return False
+        parser_state.state_stack[:] = trial.state_stack
+        parser_state.value_stack[:] = trial.value_stack
+        return True
+
+    def resume(self, parser_state, token):
+        """
+        @brief Finds the innermost enclosing parser state that accepts the token and feeds it there.
+
+        @param parser_state The Lark parser state.
+        @param token The token to resume with.
+        @return True if the token was accepted.
+        """
+        states = parser_state.parse_conf.states
+        for depth in range(len(parser_state.state_stack), 0, -1):
+            typed = self.retype(token, states[parser_state.state_stack[depth - 1]])
+            if typed is not None and self.feed(parser_state, depth, typed):
+                return True
+        return False
+
+    def close_input(self, parser_state, token):
+        """
+        @brief Inserts missing closing tokens until the parser can accept the end of input.
+
+        @param parser_state The Lark parser state.
+        @param token A token whose position is borrowed by the inserted tokens.
+        @return True if the end of input can now be accepted.
+        """
+        states = parser_state.parse_conf.states
+        closing = {"DOT": ".", "RSQB": "]", "RBRACE": "}"}
+        for _ in range(4 * len(parser_state.state_stack) + 4):
+            actions = states[parser_state.state_stack[-1]]
+            if "$END" in actions:
+                return True
+            for name in self.SYNC_TERMINALS:
+                if name in actions and self.feed(parser_state, len(parser_state.state_stack),
+                                                 Token.new_borrow_pos(name, closing[name], token)):
+                    break
+            else:
+                if len(parser_state.state_stack) == 1:
+                    return False
+                self.feed_pop(parser_state)
+        return False
+
+    @staticmethod
+    def drop_statement(parser_state):
+        """
+        @brief Pops the parser stack back to the innermost statement list.
 
-                # @brief Move the cursor forward in the input code.
-                code = code[match.end():]
-                break  
+        @param parser_state The Lark parser state.
 
-        # @brief Handle unrecognized tokens.
-        if not match:
-            print("\n Error: Invalid token detected!")
-            print(f"   Remaining code: {code[:20]}")  
-            print(f"   Last extracted tokens: {tokens[-5:]}")  
-            sys.stderr.write(f"Error: Invalid token near '{code[:20]}'\n")
-            sys.exit(21)
+        @details
+        A statement list is a state that accepts both a new assignment and the closing `]`.
+        """
+        states = parser_state.parse_conf.states
+        state_stack = parser_state.state_stack
+        for depth in range(len(state_stack), 0, -1):
+            actions = states[state_stack[depth - 1]]
+            if "VALID_ID" in actions and "RSQB" in actions:
+                del state_stack[depth:]
+                del parser_state.value_stack[depth - 1:]
+                return
+
+    @staticmethod
+    def feed_pop(parser_state):
+        """
+        @brief Drops the innermost parser state and its value.
 
-    return tokens
+        @param parser_state The Lark parser state.
+        """
+        parser_state.state_stack.pop()
+        parser_state.value_stack.pop()
 
 
-def parse_code(code):
+def parse_code(code, positions=False, diagnostics=None, comments=None, limits=None):
     
     """
     @brief Parses the given SOL25 source code.
 
     @param code The source code as a string.
-    @return A parse tree representation of the code.
+    @param positions True to record line/column spans in the tree and in error messages.
+    @param diagnostics Optional Diagnostics; errors are recorded and parsing recovers (`--all-errors`).
+    @param comments Optional list that receives the comment tokens skipped by the lexer, in source order.
+    @param limits Optional started Limits whose deadline the lexer checks at statement ends.
+    @return A parse tree representation of the code, or None if recovery was not possible.
 
     @details
     This function attempts to parse the input code using the Lark parser.
     If parsing is successful, it returns the corresponding parse tree.
-    Otherwise, it handles syntax and lexical errors by printing an error message
-    and terminating the program with an appropriate exit code.
+    Otherwise, it handles syntax and lexical errors by raising SOL25Error
+    with the appropriate exit code.
     
-    @throws SyntaxError (exit code 22) if the code contains a syntax error.
-    @throws LexicalError (exit code 21) if the code contains an invalid token.
+    @throws SOL25Error (exit code 22) if the code contains a syntax error.
+    @throws SOL25Error (exit code 21) if the code contains an invalid token.
     """
+    sink = comment_sink.set(comments)
+    governor = parse_limits.set(limits)
     try:
-        
-        tree = parser.parse(code)
-        return tree
-    except UnexpectedToken as e:
-        sys.stderr.write("Error: Syntax error.\n")
-        sys.exit(22)
-    except UnexpectedCharacters:
-        sys.stderr.write("Error: Lexical error.\n")
-        sys.exit(21)
-    except UnexpectedInput as e:
-        sys.stderr.write("Error: Syntax error.\n")
-        sys.exit(22)
-    except LexError:
-        sys.stderr.write("Error: Lexical error.\n")
-        sys.exit(21)
+        if diagnostics is not None:
+            recovery = ErrorRecovery(diagnostics)
+            try:
+                return get_parser(positions).parse(code, on_error=recovery)
+            except UnexpectedInput as e:
+                if e is not recovery.last_error:
+                    diagnostics.add(21 if isinstance(e, UnexpectedCharacters) else 22,
+                                    "Lexical error." if isinstance(e, UnexpectedCharacters) else "Syntax error.",
+                                    node_position(e))
+                return None
+            except LexError:
+                diagnostics.add(21, "Lexical error.")
+                return None
+
+        try:
+            tree = get_parser(positions).parse(code)
+            return tree
+        except UnexpectedToken as e:
+            raise SOL25Error(22, f"Syntax error.{format_position(e) if positions else ''}")
+        except UnexpectedCharacters as e:
+            raise SOL25Error(21, f"Lexical error.{format_position(e) if positions else ''}")
+        except UnexpectedInput as e:
+            raise SOL25Error(22, f"Syntax error.{format_position(e) if positions else ''}")
+        except LexError:
+            raise SOL25Error(21, "Lexical error.")
+    finally:
+        comment_sink.reset(sink)
+        parse_limits.reset(governor)
         
         
+# @brief Placeholder `last_CID` after classes that this checker did not visit: skipped by
+# `visit_classes()`, or checked by another worker.
+UNKNOWN_CID = "?"
+
+
+class StateDependency(Exception):
+    # @brief Raised when a check needs the `last_CID` left behind by classes that were not visited.
+    pass
+
+
 class SOL25Semantic(Visitor):
     # @brief Performs semantic analysis of the parsed SOL25 source code.
     
-    def __init__(self):
+    def __init__(self, positions=False, diagnostics=None, library=(), limits=None, memo=None, metrics=None):
     # @brief Initializes data structures for semantic analysis.
+    # @param positions True to append source positions to error messages.
+    # @param diagnostics Optional Diagnostics collecting all errors instead of terminating on the first.
+    # @param library Classes known from interfaces, as (name, parent, {selector: arity}) entries.
+    # @param limits Optional started Limits whose deadline is checked while visiting expressions.
+    # @param memo Optional MemoSession whose verdicts replace the walks of known method bodies.
+    # @param metrics Optional Metrics receiving a row for every checked class and method.
     
+        self.positions = positions
+        self.diagnostics = diagnostics
+        self.limits = limits
+        self.memo = memo
+        self.metrics = metrics
         self.found_main = False   
         self.has_run_method = False  
         self.class_names = set()  
@@ -231,13 +931,37 @@ class SOL25Semantic(Visitor):
         self.builtin_classes = {"Object", "Nil", "Integer", "String", "Block", "True", "False"}
         self.class_variables = set()
         self.last_CID = None
+        self.cid_changes = 0
         self.class_parents = {}
         self.method_params = {}
         self.method_param_names = {}
+        for class_name, parent_class, methods in library:
+            self.class_names.add(class_name)
+            self.class_parents[class_name] = parent_class
+            self.methods[class_name] = dict(methods)
         
 
   
 
+    def error(self, message, exit_code, node=None):
+        """
+        @brief Reports a semantic error and stops the analysis.
+
+        @param message The error message.
+        @param exit_code Exit code of the error category.
+        @param node Tree or Token the error refers to, used for its position in `--positions` mode.
+
+        @note With `diagnostics`, the error is recorded with its position and the analysis continues.
+
+        @throws SOL25Error with the given exit code, unless `diagnostics` is set.
+        """
+        if self.diagnostics is not None:
+            self.diagnostics.add(exit_code, message, node_position(node))
+            return
+
+        position = format_position(node) if self.positions else ""
+        raise SOL25Error(exit_code, f"{message}{position}")
+
     def collect_classes(self, tree):
         """
         @brief Collects class definitions and validates uniqueness.
@@ -257,8 +981,7 @@ class SOL25Semantic(Visitor):
 
                 
                 if class_name in self.class_names:
-                    sys.stderr.write(f"Error: Class {class_name} was declared twice.\n")
-                    sys.exit(35)
+                    self.error(f"Class {class_name} was declared twice.", 35, class_tree)
 
                 self.class_names.add(class_name)  
                 self.class_parents[class_name] = parent_class  
@@ -281,8 +1004,8 @@ class SOL25Semantic(Visitor):
         - Uses depth-first search (DFS) to detect inheritance cycles.
         """
         if class_name in stack:  
-            sys.stderr.write(f"Error: Cyclic inheritance detected involving class {class_name}.\n")
-            sys.exit(35)
+            self.error(f"Cyclic inheritance detected involving class {class_name}.", 35)
+            return
 
         if class_name not in self.class_parents or class_name in visited:
             return  
@@ -323,8 +1046,7 @@ class SOL25Semantic(Visitor):
 
                         
                         if method_name in self.methods[class_name]:
-                            sys.stderr.write(f"Error: Method '{method_name}' is redefined in class '{class_name}'.\n")
-                            sys.exit(35)  
+                            self.error(f"Method '{method_name}' is redefined in class '{class_name}'.", 35, method_tree)
 
                         
                         param_list = next((child for child in method_tree.children if child.data == "param_list"), None)
@@ -333,8 +1055,7 @@ class SOL25Semantic(Visitor):
 
                         
                         if len(param_names) != len(set(param_names)):
-                            sys.stderr.write(f"Error: Duplicate parameter names in method '{method_name}' of class '{class_name}'.\n")
-                            sys.exit(35) 
+                            self.error(f"Duplicate parameter names in method '{method_name}' of class '{class_name}'.", 35, method_tree)
 
                         self.methods[class_name][method_name] = param_count
                         self.method_params[class_name][method_name] = param_count
@@ -356,6 +1077,7 @@ class SOL25Semantic(Visitor):
         - Ensures that a class does not inherit from itself.
         - Validates that the parent class is either defined or a built-in class.
         - If the class is `Main`, marks it as found.
+        - With `metrics`, records its inheritance depth and number of methods.
         """
         class_name = tree.children[0].value  
         parent_class = tree.children[1].value
@@ -363,16 +1085,17 @@ class SOL25Semantic(Visitor):
         self.current_class = class_name
 
         if class_name == parent_class:
-            sys.stderr.write(f"Error: Class {class_name} cannot inherit itself.\n")
-            sys.exit(32)
+            self.error(f"Class {class_name} cannot inherit itself.", 32, tree)
 
         if parent_class not in self.class_names and parent_class not in self.builtin_classes:
-            sys.stderr.write(f"Error: Class {class_name} extends undefined class {parent_class}.\n")
-            sys.exit(32)
+            self.error(f"Class {class_name} extends undefined class {parent_class}.", 32, tree.children[1])
 
         if class_name == "Main":
             self.found_main = True
 
+        if self.metrics is not None:
+            self.metrics.add_class(self.inheritance_depth(class_name), len(tree.children) - 2)
+
     def method_def(self, tree):
         """
         @brief Processes a method definition.
@@ -384,6 +1107,7 @@ class SOL25Semantic(Visitor):
         - Clears previously stored variables for the new method scope.
         - Validates that the method is defined within its class.
         - Ensures the `run` method in `Main` has no parameters.
+        - With `metrics`, records the measures of the method (`method_metrics()`).
         """
         method_name = self.extract_method_name(tree.children[0])  
         self.current_method = method_name
@@ -393,15 +1117,16 @@ class SOL25Semantic(Visitor):
 
         
         if method_name not in self.methods[self.current_class]:
-            sys.stderr.write(f"Error: Method '{method_name}' is not defined in class '{self.current_class}'.\n")
-            sys.exit(32)
+            self.error(f"Method '{method_name}' is not defined in class '{self.current_class}'.", 32, tree)
         
        
         if self.current_class == "Main" and method_name == "run":
             self.has_run_method = True
             if param_count > 0:
-                sys.stderr.write("Error: Method 'run' in class 'Main' must not have parameters.\n")
-                sys.exit(33)
+                self.error("Method 'run' in class 'Main' must not have parameters.", 33, tree)
+
+        if self.metrics is not None:
+            self.metrics.add_method(tree)
 
 
     def extract_method_name(self, method_name_tree):
@@ -422,8 +1147,7 @@ class SOL25Semantic(Visitor):
             elif isinstance(method_name_subtree, Tree) and method_name_subtree.data == "method_selector":
                 return "".join(child.value for child in method_name_subtree.children if isinstance(child, Token))
 
-        sys.stderr.write("Error: Invalid method name format.\n")
-        sys.exit(21)
+        self.error("Invalid method name format.", 21, method_name_tree)
 
 
             
@@ -438,8 +1162,12 @@ class SOL25Semantic(Visitor):
         - Accepts integer (`SIGNED_INT`) and string (`STR`) literals.
         - Validates if a class identifier (`CID`) exists in defined or built-in classes.
         - If the base is another expression (`expr`), recursively processes it.
+          Every level visits its nested expression again, so the work doubles with each
+          parenthesis; with `limits`, the deadline is checked here.
         """
-        
+        if self.limits is not None:
+            self.limits.tick()
+
         if isinstance(tree.children[0], Token):
             token = tree.children[0]
 
@@ -450,9 +1178,9 @@ class SOL25Semantic(Visitor):
             elif token.type == "CID":
                 class_name = token.value
                 if class_name not in self.class_names and class_name not in self.builtin_classes:
-                    sys.stderr.write(f"Error: Undefined class '{class_name}'.\n")
-                    sys.exit(32)
+                    self.error(f"Undefined class '{class_name}'.", 32, token)
                 self.last_CID = class_name
+                self.cid_changes += 1
         elif isinstance(tree.children[0], Tree):
             node = tree.children[0]
 
@@ -462,8 +1190,7 @@ class SOL25Semantic(Visitor):
             elif node.data == "block":
                 return
             else:
-                sys.stderr.write(f"Error: Unexpected expression base '{node.data}'.\n")
-                sys.exit(22)
+                self.error(f"Unexpected expression base '{node.data}'.", 22, node)
 
 
     def expr_tail(self, tree):
@@ -477,7 +1204,9 @@ class SOL25Semantic(Visitor):
         - If the first child is a token:
         - Validates `read` method for `String`-descendant classes.
         - Resets `last_CID` after validation.
-        
+
+        @throws StateDependency for `read` while `last_CID` is UNKNOWN_CID, that is, when it
+                depends on classes that were not visited (`visit_classes()`, `--jobs` batches).
         """
         if not tree.children:
             return  
@@ -488,13 +1217,15 @@ class SOL25Semantic(Visitor):
         if isinstance(first_child, Token):
             method_name = first_child.value  
 
+            if self.last_CID == UNKNOWN_CID and method_name == "read":
+                raise StateDependency()
             
             if self.last_CID and method_name == "read":
                 if not self.is_descendant_of_string(self.last_CID):
-                    sys.stderr.write(f"Error: Class '{self.last_CID}' cannot use method '{method_name}'.\n")
-                    sys.exit(32)
+                    self.error(f"Class '{self.last_CID}' cannot use method '{method_name}'.", 32, first_child)
                 else:
                     self.last_CID = None
+                    self.cid_changes += 1
                     return
                 
             
@@ -503,8 +1234,7 @@ class SOL25Semantic(Visitor):
             if first_child.data == "expr_sel":
                 return  
             else:
-                sys.stderr.write(f"Error: Unexpected structure in expr_tail: {first_child.data}\n")
-                sys.exit(22)
+                self.error(f"Unexpected structure in expr_tail: {first_child.data}", 22, first_child)
                 
     def is_descendant_of_string(self, class_name):
         """
@@ -524,6 +1254,23 @@ class SOL25Semantic(Visitor):
             class_name = self.class_parents.get(class_name, None) 
         return False  
 
+    def inheritance_depth(self, class_name):
+        """
+        @brief Counts the superclass links from a class up to a built-in class.
+
+        @param class_name The name of the class.
+        @return 0 for a built-in class, 1 for a direct subclass of one, and so on.
+
+        @details
+        The count stops after as many links as there are classes, so a cycle
+        that is reported with `--all-errors` does not loop forever.
+        """
+        depth = 0
+        while class_name in self.class_parents and depth <= len(self.class_parents):
+            class_name = self.class_parents[class_name]
+            depth += 1
+        return depth
+
     def assign(self, tree):
         """
         @brief Handles variable assignment in the parsed syntax tree.
@@ -544,11 +1291,74 @@ class SOL25Semantic(Visitor):
             param_names = [param.lstrip(":") for param in self.method_param_names[self.current_class][self.current_method]]  
             
             if var_name in param_names:
-                sys.stderr.write(f"Error: Variable '{var_name}' in method '{self.current_method}' of class '{self.current_class}' conflicts with a method parameter.\n")
-                sys.exit(34)  
+                self.error(f"Variable '{var_name}' in method '{self.current_method}' of class '{self.current_class}' conflicts with a method parameter.", 34, tree)
 
         self.class_variables.add(var_name)
 
+    def visit_class(self, class_tree):
+        """
+        @brief Runs the checks of `visit_topdown()` on one class.
+
+        @param class_tree The `class_def` tree.
+
+        @details
+        With `memo`, the class is checked first and then every method, either from a stored
+        verdict of an identical method body or by walking it, which stores a new verdict.
+        """
+        if self.memo is None:
+            self.visit_topdown(class_tree)
+            return
+        self.class_def(class_tree)
+        for method_tree in class_tree.children[2:]:
+            self.memo.check_method(self, method_tree)
+
+    def visit_classes(self, tree, selected):
+        """
+        @brief Runs the checks of `visit_topdown()` on the selected classes only.
+
+        @param tree Parsed syntax tree of the program.
+        @param selected Set of names of the classes to check.
+
+        @details
+        - `last_CID` carries over from class to class, so it is UNKNOWN_CID after a skipped class.
+        - A selected class that sends `read` before its own first class literal needs the real
+          value: the classes before it are walked with their errors discarded, continuing
+          the previous replay, and the class is checked again.
+        - `Main` and its `run` method count for `check_final()` even if `Main` is not selected.
+        - The replayed classes add no `metrics`, and the rows of the interrupted class are dropped.
+        """
+        replayed = 0
+        replay_cid = None
+        skipped = False
+        for index, class_tree in enumerate(tree.children):
+            if class_tree.children[0].value not in selected:
+                skipped = True
+                continue
+            if skipped:
+                self.last_CID = UNKNOWN_CID
+                skipped = False
+            reported = len(self.diagnostics.errors) if self.diagnostics is not None else 0
+            mark = self.metrics.mark() if self.metrics is not None else None
+            try:
+                self.visit_class(class_tree)
+            except StateDependency:
+                diagnostics, metrics = self.diagnostics, self.metrics
+                if diagnostics is not None:
+                    del diagnostics.errors[reported:]
+                if metrics is not None:
+                    metrics.rollback(mark)
+                self.diagnostics, self.metrics = Diagnostics(), None
+                self.last_CID = replay_cid
+                for replay_tree in tree.children[replayed:index]:
+                    self.visit_class(replay_tree)
+                replayed, replay_cid = index, self.last_CID
+                self.diagnostics, self.metrics = diagnostics, metrics
+                self.visit_class(class_tree)
+
+        if any(class_tree.children[0].value == "Main" for class_tree in tree.children):
+            self.found_main = True
+            self.has_run_method = self.has_run_method or "run" in self.methods["Main"]
+
     def check_final(self):
         """
         @brief Performs final validation checks before parsing completes.
@@ -559,19 +1369,27 @@ class SOL25Semantic(Visitor):
         - Exits with an error if any of these conditions are not met.
         """
         if not self.found_main:
-            sys.stderr.write("Error: Class 'Main' is missing!\n")
-            sys.exit(31)
+            self.error("Class 'Main' is missing!", 31)
 
         if not self.has_run_method:
-            sys.stderr.write("Error: Class 'Main' does not have a method 'run'!\n")
-            sys.exit(31)
+            self.error("Class 'Main' does not have a method 'run'!", 31)
 
 
-def check_semantics(parse_tree):
+def check_semantics(parse_tree, positions=False, diagnostics=None, library=(), require_main=True, limits=None, classes=None,
+                    memo=None, metrics=None):
     """
     @brief Performs semantic analysis on the parsed syntax tree.
 
     @param parse_tree The root of the parsed syntax tree.
+    @param positions True to report source positions in error messages.
+    @param diagnostics Optional Diagnostics collecting all errors (`--all-errors`).
+    @param library Classes loaded from interfaces by `load_interface()`.
+    @param require_main False to check a class library, which has no `Main` class.
+    @param limits Optional started Limits enforcing the time limit.
+    @param classes Optional set of class names; the per-method checks then visit only
+                   these classes, while the class and method tables cover the whole program.
+    @param memo Optional MemoSession of the program, reusing the verdicts of identical methods.
+    @param metrics Optional Metrics receiving the rows of the checked classes and methods, closed as one file.
 
     @details
     - Initializes an instance of `SOL25Semantic` to check for semantic errors.
@@ -581,47 +1399,817 @@ def check_semantics(parse_tree):
     - Runs a final validation to ensure the presence of a valid `Main` class with a `run` method.
     
     """
-    semantic_check = SOL25Semantic()
+    semantic_check = SOL25Semantic(positions, diagnostics, library, limits, memo, metrics)
     semantic_check.collect_classes(parse_tree)
     semantic_check.collect_methods(parse_tree)
-    semantic_check.visit_topdown(parse_tree)
-    semantic_check.check_final()
-    
-    
-class SOL25Transformer(Transformer):
-    #  @brief Transforms the parsed syntax tree into an XML representation.
+    if classes is None:
+        for class_tree in parse_tree.children:
+            semantic_check.visit_class(class_tree)
+    else:
+        semantic_check.visit_classes(parse_tree, classes)
+    if require_main:
+        semantic_check.check_final()
+    if metrics is not None:
+        metrics.end_file()
 
-    def __init__(self):
-        """
-        @brief Initializes the XML root element and extracts the program description.
 
-        @note The description is retrieved from the first comment in the source code.
-        """
-        global input_data
-        super().__init__()
-        self.root = ET.Element("program", language="SOL25")
-        comment_text = extract_first_comment(input_data)
-        if comment_text:
-            self.root.set("description", comment_text)
+def method_digest(method_tree):
+    """
+    @brief Computes the canonical structural hash of a `method_def` subtree.
 
-    def program(self, classes):
-        """
-        @brief Constructs the XML representation of a program.
+    @param method_tree The `method_def` tree.
+    @return A tuple (hexadecimal SHA-256, sorted tuple of the class names used as literals).
 
-        @param classes List of class elements.
+    @details
+    - Serializes the rule names and the type and value of every token in pre-order,
+      with every subtree bracketed and every value length-prefixed, so two methods hash
+      alike exactly when their selector, parameters and body are the same tree.
+    - Positions, comments and the enclosing class are not part of the hash, and both
+      engines build the same trees, so the hash does not depend on the engine either.
+    """
+    parts = []
+    classes = set()
+    stack = [method_tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Tree):
+            parts.append(f"({node.data}")
+            stack.append(")")
+            stack.extend(reversed(node.children))
+        elif isinstance(node, Token):
+            parts.append(f"{node.type} {len(node.value)} {node.value}")
+            if node.type == "CID":
+                classes.add(node.value)
+        else:
+            parts.append(node)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest(), tuple(sorted(classes))
 
-        @return The root XML element representing the program.
 
-        @details
-        - Iterates over the parsed classes and appends them to the root XML element.
-        """
-        for cls in classes:
-            self.root.append(cls)
-        return self.root
+# @brief Version of the memo tables; a memo file of another version is cleared when it is opened.
+MEMO_VERSION = 1
 
-    def class_def(self, args):
-        """
-        @brief Transforms a class definition into an XML element.
+# @brief `PRAGMA application_id` of memo files ("SOLM"), which tells them from other SQLite files.
+MEMO_APPLICATION_ID = 0x534F4C4D
+
+
+class Memo:
+    # @brief Per-method semantic verdicts and XML fragments keyed by structural hashes, shared by analyses.
+
+    def __init__(self, path=None):
+        """
+        @brief Creates an empty memo, or opens a memo file kept across runs.
+
+        @param path Optional path of an SQLite database; None keeps the memo in memory only.
+
+        @note A memo is safe to share by threads.
+
+        @throws SOL25Error (exit code 11) if the file cannot be opened, or is a SQLite database
+                other than a memo. Only a new or empty file becomes a memo, and only the
+                tables of a memo of another version are dropped.
+        """
+        self.path = path
+        self.verdicts = {}
+        self.fragments = {}
+        self.new_verdicts = {}
+        self.new_fragments = {}
+        self.lock = threading.Lock()
+        self.connection = None
+        if path is None:
+            return
+        try:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            application_id = self.connection.execute("PRAGMA application_id").fetchone()[0]
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if application_id != MEMO_APPLICATION_ID and not (
+                    (application_id, version) == (0, 0)
+                    and self.connection.execute("SELECT count(*) FROM sqlite_master").fetchone()[0] == 0):
+                self.connection.close()
+                self.connection = None
+                raise SOL25Error(11, f"Cannot open memo '{path}': not a memo file.")
+            if application_id != MEMO_APPLICATION_ID or version != MEMO_VERSION:
+                self.connection.executescript(f"""
+                    DROP TABLE IF EXISTS verdicts;
+                    DROP TABLE IF EXISTS fragments;
+                    CREATE TABLE verdicts (key TEXT PRIMARY KEY, exit TEXT NOT NULL) WITHOUT ROWID;
+                    CREATE TABLE fragments (digest TEXT PRIMARY KEY, xml TEXT NOT NULL) WITHOUT ROWID;
+                    PRAGMA application_id = {MEMO_APPLICATION_ID};
+                    PRAGMA user_version = {MEMO_VERSION};
+                """)
+        except sqlite3.Error as e:
+            raise SOL25Error(11, f"Cannot open memo '{path}': {e}.")
+
+    def read(self, query, key):
+        """
+        @brief Reads one entry from the memo file.
+
+        @param query SELECT statement of the stored text for a key.
+        @param key The key.
+        @return The stored text, or None if there is none or no memo file.
+
+        @throws SOL25Error (exit code 11) if the memo file cannot be read.
+        """
+        if self.connection is None:
+            return None
+        try:
+            with self.lock:
+                row = self.connection.execute(query, (key,)).fetchone()
+        except sqlite3.Error as e:
+            raise SOL25Error(11, f"Cannot read memo '{self.path}': {e}.")
+        return row[0] if row is not None else None
+
+    def verdict(self, key):
+        """
+        @brief Looks up the verdict of a method body.
+
+        @param key The key built by `MemoSession.check_method()`.
+        @return The encoded `last_CID` after the body, or None if the body was not checked yet.
+        """
+        exit_state = self.verdicts.get(key)
+        if exit_state is None:
+            exit_state = self.read("SELECT exit FROM verdicts WHERE key = ?", key)
+            if exit_state is not None:
+                self.verdicts[key] = exit_state
+        return exit_state
+
+    def store_verdict(self, key, exit_state):
+        """
+        @brief Records that a method body passed the checks.
+
+        @param key The key built by `MemoSession.check_method()`.
+        @param exit_state The encoded `last_CID` after the body.
+        """
+        self.verdicts[key] = exit_state
+        if self.connection is not None:
+            with self.lock:
+                self.new_verdicts[key] = exit_state
+
+    def fragment(self, digest):
+        """
+        @brief Looks up the XML element of a method.
+
+        @param digest The structural hash of the method.
+        @return A new `method` element parsed from the stored XML, or None.
+
+        @note Fragments are kept as text, so the memo holds one object per method instead of
+              whole element trees, which the garbage collector would scan again and again,
+              and every AST gets elements of its own.
+        """
+        text = self.fragments.get(digest)
+        if text is None:
+            text = self.read("SELECT xml FROM fragments WHERE digest = ?", digest)
+            if text is None:
+                return None
+            self.fragments[digest] = text
+        try:
+            return ET.fromstring(text)
+        except ET.ParseError:
+            # @brief Characters XML cannot represent; the method is transformed again.
+            return None
+
+    def store_fragment(self, digest, elem):
+        """
+        @brief Records the XML element of a method.
+
+        @param digest The structural hash of the method.
+        @param elem The `method` element.
+        """
+        text = ET.tostring(elem, encoding="unicode")
+        self.fragments[digest] = text
+        if self.connection is not None:
+            with self.lock:
+                self.new_fragments[digest] = text
+
+    def save(self):
+        """
+        @brief Writes the entries added since the last save to the memo file.
+
+        @throws SOL25Error (exit code 12) if the memo file cannot be written.
+        """
+        if self.connection is None:
+            return
+        with self.lock:
+            verdicts, self.new_verdicts = self.new_verdicts, {}
+            fragments, self.new_fragments = self.new_fragments, {}
+            try:
+                self.connection.executemany("INSERT OR REPLACE INTO verdicts VALUES (?, ?)", verdicts.items())
+                self.connection.executemany("INSERT OR REPLACE INTO fragments VALUES (?, ?)", fragments.items())
+                self.connection.commit()
+            except sqlite3.Error as e:
+                raise SOL25Error(12, f"Cannot write memo '{self.path}': {e}.")
+
+
+class MemoSession:
+    # @brief Structural hashes of one program, and its use of a Memo.
+
+    def __init__(self, memo, tree):
+        """
+        @brief Hashes every method and class of a program.
+
+        @param memo The Memo shared by the analyses.
+        @param tree The `program` tree.
+
+        @details
+        A class hashes its parent and the hashes of its methods in order, but not its name.
+        """
+        self.memo = memo
+        self.methods = {}
+        self.method_groups = collections.defaultdict(list)
+        self.class_groups = collections.defaultdict(list)
+        self.verdict_hits = self.verdict_misses = 0
+        self.fragment_hits = self.fragment_misses = 0
+        for class_tree in tree.children:
+            class_name = class_tree.children[0].value
+            digests = [class_tree.children[1].value]
+            for method_tree in class_tree.children[2:]:
+                digest, classes = method_digest(method_tree)
+                self.methods[id(method_tree)] = (digest, classes)
+                selector = "".join(method_tree.children[0].scan_values(lambda value: isinstance(value, Token)))
+                self.method_groups[digest].append(f"{class_name}>>{selector}")
+                digests.append(digest)
+            self.class_groups[hashlib.sha256(" ".join(digests).encode("utf-8")).hexdigest()].append(class_name)
+
+    def check_method(self, checker, method_tree):
+        """
+        @brief Checks a method, reusing the verdict of an identical body checked in the same state.
+
+        @param checker The SOL25Semantic visiting the method's class.
+        @param method_tree The `method_def` tree.
+
+        @details
+        - The body depends on the checker through `last_CID` before it (unknown, none, or
+          whether it descends from `String`), through whether each class literal of the body
+          is defined and descends from `String`, and through the parameters registered for
+          the selector. These form the key, together with the structural hash.
+        - `method_def()` itself always runs. A stored verdict then sets the `last_CID` the
+          body left behind; otherwise the method is walked and, if the walk reported no
+          error, its verdict is stored, so every error still comes from a real walk.
+        """
+        digest, classes = self.methods[id(method_tree)]
+        entry_cid = checker.last_CID
+        if entry_cid == UNKNOWN_CID:
+            entry = "?"
+        elif not entry_cid:
+            entry = "-"
+        else:
+            entry = "S" if checker.is_descendant_of_string(entry_cid) else "O"
+        method_name = checker.extract_method_name(method_tree.children[0])
+        params = checker.method_param_names.get(checker.current_class, {}).get(method_name, ())
+        environment = "".join(
+            f"{name}:{int(name in checker.class_names or name in checker.builtin_classes)}{int(checker.is_descendant_of_string(name))},"
+            for name in classes)
+        key = f"{digest} {entry} {','.join(params)} {environment}"
+
+        exit_state = self.memo.verdict(key)
+        if exit_state is not None:
+            self.verdict_hits += 1
+            checker.method_def(method_tree)
+            if exit_state != "=":
+                checker.last_CID = None if exit_state == "-" else exit_state
+            return
+
+        self.verdict_misses += 1
+        reported = len(checker.diagnostics.errors) if checker.diagnostics is not None else 0
+        changes = checker.cid_changes
+        checker.visit_topdown(method_tree)
+        if checker.diagnostics is not None and len(checker.diagnostics.errors) != reported:
+            return
+        if checker.cid_changes == changes:
+            exit_state = "="
+        else:
+            exit_state = checker.last_CID or "-"
+        self.memo.store_verdict(key, exit_state)
+
+    def transform(self, transformer, program):
+        """
+        @brief Builds the XML of a program, reusing the elements of identical methods.
+
+        @param transformer The SOL25Transformer of the analysis.
+        @param program The `program` tree of the classes to emit.
+        @return The `program` element of the transformer.
+        """
+        classes = []
+        for class_tree in program.children:
+            methods = []
+            for method_tree in class_tree.children[2:]:
+                digest = self.methods[id(method_tree)][0]
+                elem = self.memo.fragment(digest)
+                if elem is None:
+                    self.fragment_misses += 1
+                    elem = transformer.transform(method_tree)
+                    self.memo.store_fragment(digest, elem)
+                else:
+                    self.fragment_hits += 1
+                methods.append(elem)
+            classes.append(transformer.class_def([class_tree.children[0], class_tree.children[1], *methods]))
+        return transformer.program(classes)
+
+    def statistics(self):
+        """
+        @brief Summarizes the duplicate code of the program and the memo hits.
+
+        @return A dictionary with the counts of `methods`, `unique_methods`, `classes` and
+                `unique_classes`, the `verdict_hits`/`verdict_misses` and `fragment_hits`/
+                `fragment_misses`, and `method_groups`/`class_groups`: lists of the
+                `Class>>selector` and class names sharing one hash, largest first.
+        """
+        method_groups = sorted((group for group in self.method_groups.values() if len(group) > 1), key=len, reverse=True)
+        class_groups = sorted((group for group in self.class_groups.values() if len(group) > 1), key=len, reverse=True)
+        return {
+            "methods": len(self.methods),
+            "unique_methods": len(self.method_groups),
+            "classes": sum(len(group) for group in self.class_groups.values()),
+            "unique_classes": len(self.class_groups),
+            "verdict_hits": self.verdict_hits,
+            "verdict_misses": self.verdict_misses,
+            "fragment_hits": self.fragment_hits,
+            "fragment_misses": self.fragment_misses,
+            "method_groups": method_groups,
+            "class_groups": class_groups,
+        }
+
+
+def format_duplicates(statistics, groups=10):
+    """
+    @brief Formats the duplicate-code statistics printed by `--duplicates`.
+
+    @param statistics The dictionary of `MemoSession.statistics()`.
+    @param groups Number of the largest groups of identical methods and classes to list.
+    @return The report text.
+    """
+    lines = []
+    for kind in ("methods", "classes"):
+        total, unique = statistics[kind], statistics[f"unique_{kind}"]
+        share = 100 * (total - unique) / total if total else 0
+        lines.append(f"{kind.capitalize()}: {total}, {unique} unique, {total - unique} duplicates ({share:.1f} %)")
+    lines.append(f"Memo: {statistics['verdict_hits']} of {statistics['verdict_hits'] + statistics['verdict_misses']} method verdicts "
+                 f"and {statistics['fragment_hits']} of {statistics['fragment_hits'] + statistics['fragment_misses']} XML fragments reused")
+    for kind, plural in (("method", "methods"), ("class", "classes")):
+        for group in statistics[f"{kind}_groups"][:groups]:
+            names = ", ".join(group[:5]) + (", ..." if len(group) > 5 else "")
+            lines.append(f"{len(group)} identical {plural}: {names}")
+    return "\n".join(lines)
+
+
+# @brief Columns of the tables kept by Metrics: one row per analyzed file, per checked class and per checked method.
+# The rows of the classes and methods of a file follow each other, so the file table only counts them.
+METRIC_TABLES = {
+    "file": ("classes", "methods"),
+    "class": ("depth", "methods"),
+    "method": ("arity", "statements", "sends", "nesting", "blocks", "literals"),
+}
+
+# @brief Type code of the metric columns: unsigned 32-bit integers.
+METRIC_TYPECODE = "I"
+
+# @brief Names of pseudo-variables counted as literals by `method_metrics()`.
+LITERAL_NAMES = frozenset(("nil", "true", "false"))
+
+# @brief Percentiles in the summary of `summarize_metrics()`, nearest-rank.
+METRIC_PERCENTILES = (50, 90, 99)
+
+# @brief Number of power-of-two histogram buckets: 0, 1, 2-3, 4-7, ..., and the last one for all larger values.
+HISTOGRAM_BUCKETS = 12
+
+# @brief Magic number at the start of the binary metric tables.
+METRICS_MAGIC = b"S25M\x01"
+
+
+def method_metrics(method_tree):
+    """
+    @brief Measures a `method_def` subtree.
+
+    @param method_tree The `method_def` tree.
+    @return A tuple of the values of the `method` columns of METRIC_TABLES.
+
+    @details
+    - `arity` is the number of keyword parts of the selector.
+    - `statements` counts the assignments and `sends` the message sends, both including those in blocks.
+    - `nesting` is the deepest chain of expressions nested in parentheses, arguments and
+      blocks: 1 for a method of flat statements, 0 for an empty one.
+    - `literals` counts integers, strings, class names, `nil`, `true` and `false`.
+    - The subtree is walked once, iteratively; `visit_topdown()` visits nested expressions again.
+    """
+    name = method_tree.children[0]
+    if isinstance(name, Tree):
+        name = name.children[0]
+    arity = len(name.children) if isinstance(name, Tree) else 0
+    statements = sends = nesting = blocks = literals = 0
+    stack = [(child, 0) for child in method_tree.children[1:]]
+    while stack:
+        node, depth = stack.pop()
+        data = node.data
+        if data == "expr":
+            depth += 1
+            if depth > nesting:
+                nesting = depth
+        elif data == "expr_base":
+            child = node.children[0]
+            if not isinstance(child, Tree):
+                if child.type in ("SIGNED_INT", "STR", "CID") or child.value in LITERAL_NAMES:
+                    literals += 1
+                continue
+        elif data == "expr_tail":
+            if node.children:
+                sends += 1
+        elif data == "assign":
+            statements += 1
+        elif data == "block":
+            blocks += 1
+        for child in node.children:
+            if isinstance(child, Tree):
+                stack.append((child, depth))
+    return arity, statements, sends, nesting, blocks, literals
+
+
+class Metrics:
+    # @brief Code metrics of analyzed files in compact columns, one `array` per column of METRIC_TABLES.
+
+    def __init__(self):
+        """
+        @brief Creates empty tables.
+
+        @details
+        `SOL25Semantic` fills the rows of one analysis into its own Metrics, which the
+        Analyzer merges into the shared one when the analysis succeeds.
+        """
+        self.columns = {(table, column): array.array(METRIC_TYPECODE) for table, columns in METRIC_TABLES.items()
+                        for column in columns}
+        self.class_columns = [self.columns["class", column] for column in METRIC_TABLES["class"]]
+        self.method_columns = [self.columns["method", column] for column in METRIC_TABLES["method"]]
+        self.closed = (0, 0)
+        self.lock = threading.Lock()
+
+    @property
+    def files(self):
+        """
+        @brief Number of files in the tables.
+        """
+        return len(self.columns["file", "classes"])
+
+    def add_class(self, depth, methods):
+        """
+        @brief Appends a class row.
+
+        @param depth Number of superclass links up to a built-in class.
+        @param methods Number of methods defined in the class.
+        """
+        depth_column, methods_column = self.class_columns
+        depth_column.append(depth)
+        methods_column.append(methods)
+
+    def add_method(self, method_tree):
+        """
+        @brief Appends the row of a method, measured by `method_metrics()`.
+
+        @param method_tree The `method_def` tree.
+        """
+        for column, value in zip(self.method_columns, method_metrics(method_tree)):
+            column.append(value)
+
+    def end_file(self):
+        """
+        @brief Appends the file row counting the class and method rows added since the previous file.
+        """
+        classes, methods = len(self.class_columns[0]), len(self.method_columns[0])
+        self.columns["file", "classes"].append(classes - self.closed[0])
+        self.columns["file", "methods"].append(methods - self.closed[1])
+        self.closed = (classes, methods)
+
+    def mark(self):
+        """
+        @brief Marks the current end of the class and method tables.
+
+        @return A marker for `rollback()`.
+        """
+        return len(self.class_columns[0]), len(self.method_columns[0])
+
+    def rollback(self, mark):
+        """
+        @brief Drops the class and method rows added since a marker.
+
+        @param mark A marker of `mark()` taken in the current file.
+        """
+        for column in self.class_columns:
+            del column[mark[0]:]
+        for column in self.method_columns:
+            del column[mark[1]:]
+
+    def merge(self, other):
+        """
+        @brief Appends the files of other tables; safe to call from several threads.
+
+        @param other Metrics whose files were all closed by `end_file()`.
+        """
+        with self.lock:
+            for key, column in self.columns.items():
+                column.extend(other.columns[key])
+            self.closed = self.mark()
+
+
+def encode_metrics(metrics):
+    """
+    @brief Encodes metric tables into the binary column format.
+
+    @param metrics The Metrics.
+    @return The encoded bytes.
+
+    @details
+    METRICS_MAGIC is followed by the row count of each table of METRIC_TABLES as a varint,
+    then by the columns in the same order, each as little-endian 32-bit integers, so
+    `numpy.frombuffer()` can read a column without copying it.
+    """
+    out = bytearray(METRICS_MAGIC)
+    for table, columns in METRIC_TABLES.items():
+        write_varint(out, len(metrics.columns[table, columns[0]]))
+    for column in metrics.columns.values():
+        if sys.byteorder == "big":
+            column = array.array(METRIC_TYPECODE, column)
+            column.byteswap()
+        out += column.tobytes()
+    return bytes(out)
+
+
+def decode_metrics(data):
+    """
+    @brief Decodes metric tables produced by `encode_metrics()`.
+
+    @param data The encoded bytes.
+    @return The Metrics.
+
+    @throws ValueError if the data is not a complete set of metric tables.
+    """
+    if not data.startswith(METRICS_MAGIC):
+        raise ValueError("Not a SOL25 metrics table.")
+    metrics = Metrics()
+    pos = len(METRICS_MAGIC)
+    try:
+        rows = {}
+        for table in METRIC_TABLES:
+            rows[table], pos = read_varint(data, pos)
+    except IndexError:
+        raise ValueError("Truncated SOL25 metrics table.")
+    for (table, _), column in metrics.columns.items():
+        size = rows[table] * column.itemsize
+        column.frombytes(data[pos:pos + size])
+        pos += size
+        if sys.byteorder == "big":
+            column.byteswap()
+    if pos != len(data) or len(metrics.columns["file", "classes"]) != rows["file"]:
+        raise ValueError("Truncated SOL25 metrics table.")
+    if (sum(metrics.columns["file", "classes"]), sum(metrics.columns["file", "methods"])) != (rows["class"], rows["method"]):
+        raise ValueError("Inconsistent SOL25 metrics table.")
+    metrics.closed = metrics.mark()
+    return metrics
+
+
+def summarize_metrics(metrics):
+    """
+    @brief Aggregates every metric column.
+
+    @param metrics The Metrics.
+    @return A list with a dictionary for each column, in the order of METRIC_TABLES: `metric`
+            (`table.column`), `count`, `sum`, `mean`, `min`, the METRIC_PERCENTILES as `p50`...,
+            `max` (all None for an empty column) and `histogram`, the counts of the HISTOGRAM_BUCKETS.
+
+    @details
+    With NumPy, a column is sorted and bucketed as one array viewed in place. Without it,
+    the same nearest-rank percentiles and buckets are computed in Python.
+    """
+    try:
+        # @brief Imported here, so parse.py starts without loading NumPy and runs where it is missing.
+        import numpy
+    except ImportError:
+        numpy = None
+
+    summary = []
+    for (table, column), values in metrics.columns.items():
+        count = len(values)
+        row = {"metric": f"{table}.{column}", "count": count, "sum": 0, "mean": None, "min": None}
+        row.update((f"p{percentile}", None) for percentile in METRIC_PERCENTILES)
+        row["max"] = None
+        row["histogram"] = [0] * HISTOGRAM_BUCKETS
+        summary.append(row)
+        if not count:
+            continue
+        if numpy is not None:
+            ordered = numpy.sort(numpy.frombuffer(values, dtype=numpy.uintc))
+            total = int(ordered.sum(dtype=numpy.uint64))
+            # @brief The binary exponent of frexp() is the bit length of the integer, 0 for 0.
+            buckets = numpy.minimum(numpy.frexp(ordered)[1], HISTOGRAM_BUCKETS - 1)
+            row["histogram"] = numpy.bincount(buckets, minlength=HISTOGRAM_BUCKETS).tolist()
+        else:
+            ordered = sorted(values)
+            total = sum(ordered)
+            for value in ordered:
+                row["histogram"][min(value.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        row.update(sum=total, mean=total / count, min=int(ordered[0]), max=int(ordered[-1]))
+        for percentile in METRIC_PERCENTILES:
+            row[f"p{percentile}"] = int(ordered[max(0, -(-percentile * count // 100) - 1)])
+    return summary
+
+
+def histogram_labels():
+    """
+    @brief Names the HISTOGRAM_BUCKETS.
+
+    @return A list of the value ranges: `0`, `1`, `2-3`, ..., `>=N`.
+    """
+    labels = ["0", "1"]
+    labels += [f"{1 << (bucket - 1)}-{(1 << bucket) - 1}" for bucket in range(2, HISTOGRAM_BUCKETS - 1)]
+    return labels + [f">={1 << (HISTOGRAM_BUCKETS - 2)}"]
+
+
+def format_metrics(summary, style="text"):
+    """
+    @brief Formats a summary of `summarize_metrics()`.
+
+    @param summary The summary rows.
+    @param style `text` for an aligned table without the histograms, or `csv`.
+    @return The formatted table.
+    """
+    statistics = ["count", "sum", "mean", "min", *(f"p{percentile}" for percentile in METRIC_PERCENTILES), "max"]
+    if style == "csv":
+        lines = [",".join(["metric", *statistics, *histogram_labels()])]
+        for row in summary:
+            values = ["" if row[name] is None else f"{row[name]:.3f}" if name == "mean" else str(row[name]) for name in statistics]
+            lines.append(",".join([row["metric"], *values, *map(str, row["histogram"])]))
+        return "\n".join(lines) + "\n"
+
+    statistics.remove("sum")
+    rows = [["metric", *statistics]]
+    for row in summary:
+        rows.append([row["metric"], *("-" if row[name] is None else f"{row[name]:.2f}" if name == "mean" else str(row[name])
+                                      for name in statistics)])
+    widths = [max(len(row[index]) for row in rows) for index in range(len(rows[0]))]
+    return "\n".join(" ".join(value.ljust(width) if index == 0 else value.rjust(width)
+                              for index, (value, width) in enumerate(zip(row, widths))) for row in rows)
+
+
+def write_metrics(metrics, path):
+    """
+    @brief Writes metric tables to a file (`--metrics`).
+
+    @param metrics The Metrics.
+    @param path The file; a `.csv` path, optionally with `.gz` or `.xz`, gets the summary table
+                of `format_metrics()`, any other path the binary columns of `encode_metrics()`.
+
+    @throws SOL25Error (exit code 12) if the file cannot be written.
+    """
+    if path.removesuffix(".gz").removesuffix(".xz").endswith(".csv"):
+        data = format_metrics(summarize_metrics(metrics), "csv").encode("utf-8")
+    else:
+        data = encode_metrics(metrics)
+    with output_sink(path) as stream:
+        stream.write(data)
+
+
+# @brief Format name and version stored in interface files written by `--emit-interface`.
+INTERFACE_FORMAT = "sol25-interface"
+INTERFACE_VERSION = 1
+
+# @brief Class names and method selectors an interface may contain, matched with the terminals of the
+# grammar: a class identifier, and a unary selector (no keyword) or a sequence of keyword parts.
+INTERFACE_CLASS_NAME = TERMINAL_PATTERNS["CID"]
+INTERFACE_SELECTOR = re.compile(f"{TERMINAL_PATTERNS['VALID_ID'].pattern}|(?:{TERMINAL_PATTERNS['ID_COLON'].pattern})+")
+
+
+def build_interface(tree, sources, interface_path):
+    """
+    @brief Summarizes the classes of a checked library for `--emit-interface`.
+
+    @param tree The parse tree of the library.
+    @param sources List of (path, buffer) of the library source files.
+    @param interface_path Path the interface will be written to.
+    @return A JSON-serializable dictionary read back by `load_interface()`.
+
+    @details
+    - `classes` lists `[name, parent, {selector: arity}]` in source order.
+    - `sources` records the SHA-256 of every source file, with its path relative to
+      the interface, so `load_interface()` can tell when the library has changed.
+    """
+    semantic_check = SOL25Semantic()
+    semantic_check.collect_methods(tree)
+    base = os.path.dirname(os.path.abspath(interface_path))
+    return {
+        "format": INTERFACE_FORMAT,
+        "version": INTERFACE_VERSION,
+        "sources": [
+            {"path": os.path.relpath(os.path.abspath(path), base), "sha256": hashlib.sha256(buffer).hexdigest()}
+            for path, buffer in sources
+        ],
+        "classes": [
+            [class_tree.children[0].value, class_tree.children[1].value, semantic_check.methods[class_tree.children[0].value]]
+            for class_tree in tree.children
+        ],
+    }
+
+
+def load_interface(path):
+    """
+    @brief Loads the classes of an interface written by `--emit-interface`.
+
+    @param path Path to the interface file; `.gz` and `.xz` files are decompressed.
+    @return A list of (name, parent, {selector: arity}) entries for `SOL25Semantic`.
+
+    @throws SOL25Error (exit code 11) if the file cannot be read, is not an interface or has
+            malformed entries, or is stale: a recorded source file exists and its SHA-256 has changed.
+
+    @note Source files that no longer exist are not checked, so an interface can be used without its library.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".xz" and lzma is None:
+        raise SOL25Error(11, f"Cannot read interface '{path}': xz compression is not available in this Python installation.")
+    opener = gzip.open if extension == ".gz" else lzma.open if extension == ".xz" else open
+    try:
+        with opener(path, "rb") as file:
+            interface = json.loads(file.read())
+    except (OSError, EOFError) + ((lzma.LZMAError,) if lzma is not None else ()) as e:
+        raise SOL25Error(11, f"Cannot read interface '{path}': {getattr(e, 'strerror', None) or e}.")
+    except ValueError:
+        raise SOL25Error(11, f"Interface '{path}' is not valid JSON.")
+
+    if not isinstance(interface, dict) or interface.get("format") != INTERFACE_FORMAT or interface.get("version") != INTERFACE_VERSION:
+        raise SOL25Error(11, f"File '{path}' is not a SOL25 interface (version {INTERFACE_VERSION}).")
+
+    base = os.path.dirname(os.path.abspath(path))
+    try:
+        classes = []
+        for name, parent, methods in interface["classes"]:
+            # @brief `bool` is a subclass of `int`, so the arity must be exactly an int.
+            if not (isinstance(name, str) and INTERFACE_CLASS_NAME.fullmatch(name)
+                    and isinstance(parent, str) and INTERFACE_CLASS_NAME.fullmatch(parent) and isinstance(methods, dict)
+                    and all(INTERFACE_SELECTOR.fullmatch(selector) and type(arity) is int and arity >= 0
+                            for selector, arity in methods.items())):
+                raise ValueError(name)
+            classes.append((name, parent, methods))
+        for source in interface["sources"]:
+            source_path = os.path.join(base, source["path"])
+            try:
+                with open(source_path, "rb") as file:
+                    digest = hashlib.file_digest(file, "sha256").hexdigest()
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                raise SOL25Error(11, f"Cannot read source '{source_path}' of interface '{path}': {e.strerror}.")
+            if digest != source["sha256"]:
+                raise SOL25Error(11, f"Interface '{path}' is stale: '{source['path']}' has changed.")
+    except (KeyError, TypeError, ValueError):
+        raise SOL25Error(11, f"Interface '{path}' has malformed 'classes' or 'sources' entries.")
+    return classes
+
+
+def pretty_xml(root):
+    """
+    @brief Converts an XML AST to a formatted string.
+
+    @param root The `program` element.
+    @return A well-formatted XML string with proper indentation and encoding.
+    """
+    raw_xml = ET.tostring(root, encoding="utf-8")  
+    parsed_xml = xml.dom.minidom.parseString(raw_xml) 
+    formatted_xml = parsed_xml.toprettyxml(indent="  ")  
+    formatted_xml = formatted_xml.replace('<?xml version="1.0" ?>', '<?xml version="1.0" encoding="UTF-8"?>')
+
+    return formatted_xml
+
+
+class SOL25Transformer(Transformer):
+    #  @brief Transforms the parsed syntax tree into an XML representation.
+
+    def __init__(self, comments=(), limits=None):
+        """
+        @brief Initializes the XML root element and extracts the program description.
+
+        @param comments Comment tokens collected by the lexer, in source order.
+        @param limits Optional started Limits whose deadline is checked for every expression.
+
+        @note The description is retrieved from the first comment in the source code.
+        """
+        super().__init__()
+        self.limits = limits
+        self.root = ET.Element("program", language="SOL25")
+        comment_text = comments[0].value[1:-1] if comments else None
+        if comment_text:
+            self.root.set("description", comment_text)
+
+    def program(self, classes):
+        """
+        @brief Constructs the XML representation of a program.
+
+        @param classes List of class elements.
+
+        @return The root XML element representing the program.
+
+        @details
+        - Iterates over the parsed classes and appends them to the root XML element.
+        """
+        for cls in classes:
+            self.root.append(cls)
+        return self.root
+
+    def class_def(self, args):
+        """
+        @brief Transforms a class definition into an XML element.
 
         @param args A list where:
             - The first element is the class name.
@@ -799,6 +2387,8 @@ class SOL25Transformer(Transformer):
         - Converts variables, literals, and blocks into appropriate XML elements.
         - Handles method calls (`send` elements) with arguments.
         """
+        if self.limits is not None:
+            self.limits.tick()
         if len(args) == 2 and args[1] is None:
             base = args[0]
             tail = None
@@ -1021,10 +2611,6 @@ class SOL25Transformer(Transformer):
         return token  
     def COLON_ID(self, token):
         return token[1:] 
-    def EXP_KEYWORD(self, token):
-        return token
-    def KEYWORD(self, token):
-        return token
     def VALID_ID(self, token):
         return token
     def METHOD_COLON(self, token):
@@ -1037,105 +2623,1758 @@ class SOL25Transformer(Transformer):
 
         @return A well-formatted XML string with proper indentation and encoding.
         """
-        raw_xml = ET.tostring(self.root, encoding="utf-8")  
-        parsed_xml = xml.dom.minidom.parseString(raw_xml) 
-        formatted_xml = parsed_xml.toprettyxml(indent="  ")  
-        formatted_xml = formatted_xml.replace('<?xml version="1.0" ?>', '<?xml version="1.0" encoding="UTF-8"?>')
+        return pretty_xml(self.root)
+
 
-        return formatted_xml
 
 
+class SOL25PositionTransformer(SOL25Transformer):
+    # @brief Transforms the syntax tree into XML and adds source spans to classes, methods, assigns and sends.
 
+    @staticmethod
+    def set_position(elem, meta):
+        """
+        @brief Stores the line/column span of a rule as XML attributes.
 
-def extract_first_comment(code):
+        @param elem The XML element created for the rule.
+        @param meta Position metadata propagated by the Lark parser.
+        """
+        if isinstance(elem, ET.Element) and not meta.empty:
+            elem.set("line", str(meta.line))
+            elem.set("column", str(meta.column))
+            elem.set("end-line", str(meta.end_line))
+            elem.set("end-column", str(meta.end_column))
+        return elem
+
+    @v_args(meta=True)
+    def class_def(self, meta, args):
+        return self.set_position(super().class_def(args), meta)
+
+    @v_args(meta=True)
+    def method_def(self, meta, args):
+        return self.set_position(super().method_def(args), meta)
+
+    @v_args(meta=True)
+    def assign(self, meta, args):
+        return self.set_position(super().assign(args), meta)
+
+    @v_args(meta=True)
+    def expr(self, meta, args):
+        elem = super().expr(args)
+        if isinstance(elem, ET.Element) and elem.tag == "send":
+            self.set_position(elem, meta)
+        return elem
+
+
+def attach_comments(parse_tree, comments):
     """
-    @brief Extracts the first comment from the given source code.
+    @brief Attaches comments to the class or method definition that follows them.
 
-    @param code The source code as a string.
+    @param parse_tree Parsed syntax tree of the program.
+    @param comments Comment tokens collected by the lexer, in source order.
+
+    @return A dictionary mapping `class_def` and `method_def` trees to lists of comment tokens.
 
-    @return The first comment found, or None if no comment is present.
+    @details
+    - Anchors each definition at the position of its first named token.
+    - Every comment before an anchor and after the previous one belongs to that definition.
+    - Uses binary search over comment positions, so no pass over the source is needed.
     """
-    in_string = False
-    escape = False
-    comment_start = None
+    starts = [comment.start_pos for comment in comments]
+    attached = {}
+    previous = 0
 
-    for i, char in enumerate(code):
-        if char == "'" and not escape: 
-            in_string = not in_string  
-        elif char == '"' and not in_string: 
-            if comment_start is None:
-                comment_start = i + 1  
-            else:
-                return code[comment_start:i]  
+    for class_tree in parse_tree.children:
+        definitions = [class_tree] + [child for child in class_tree.children[2:] if isinstance(child, Tree)]
+        for definition in definitions:
+            anchor = next(definition.scan_values(lambda value: isinstance(value, Token)))
+            index = bisect.bisect_left(starts, anchor.start_pos, previous)
+            if index > previous:
+                attached[definition] = comments[previous:index]
+            previous = index
 
-        escape = (char == "\\" and not escape)  
+    return attached
 
-    return None  
 
-input_data = ""
-def main():
+def position_attributes(meta):
     """
-    @brief Entry point of the script, responsible for parsing arguments, reading input, 
-           performing lexical analysis, parsing, semantic analysis, and XML transformation.
+    @brief Source span attributes of a rule, as `SOL25PositionTransformer.set_position()` adds them.
+
+    @param meta Position metadata propagated by the Lark parser.
+    @return A dictionary of `line`, `column`, `end-line` and `end-column`, or an empty one.
+    """
+    if meta.empty:
+        return {}
+    return {"line": str(meta.line), "column": str(meta.column),
+            "end-line": str(meta.end_line), "end-column": str(meta.end_column)}
+
+
+def iter_events(tree, description=None, positions=False, classes=None):
+    """
+    @brief Generates the XML AST of a checked program as a stream of events, without building it.
+
+    @param tree The `program` parse tree of either engine.
+    @param description Text of the program description, or None.
+    @param positions True to add the source spans of `--positions`; the tree must carry them.
+    @param classes Optional set of class names to emit (`--class`, `--reachable-from`).
+    @return A generator of `("start", tag, attributes)` and `("end", tag, None)` tuples.
 
     @details
-    - Uses `argparse` to handle command-line arguments.
-    - Supports `--help` and `-h` for displaying usage information.
-    - Reads input from a file (if provided) or from standard input.
-    - Prints the resulting XML to standard output.
-   
+    - The events describe exactly the elements and attributes of `SOL25Transformer`, in
+      document order: `program`, `class`, `method`, `block`, `parameter`, `assign`, `var`,
+      `expr`, `send`, `arg` and `literal`. `iter_xml()` turns them back into the XML.
+    - The tree is walked with an explicit stack, so deep nesting costs no recursion and
+      only the pending siblings are held in memory.
+    - With positions, a send takes the span of the outermost parenthesized expression around
+      it, and an assignment lists its span before `order`, as the transformer sets them.
     """
-    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
-    parser.add_argument("--help", action="store_true", help="Show help message and exit")
-    parser.add_argument("-h", action="store_true", help="Show help message and exit")
-    parser.add_argument("--source", type=str, help="Path to input file (default: stdin)")
+    attributes = {"language": "SOL25"}
+    if description:
+        attributes["description"] = description
+    yield "start", "program", attributes
+
+    # @brief Work items: ("event", event), ("class", tree), ("method", tree), ("block", tree),
+    # ("assign", tree, order), ("expr", tree, span) and ("base", tree, span); `span` is the meta
+    # of the outermost expression whose value is being emitted.
+    stack = [("event", ("end", "program", None))]
+    stack.extend(("class", class_tree) for class_tree in reversed(tree.children)
+                 if classes is None or class_tree.children[0].value in classes)
+    while stack:
+        item = stack.pop()
+        kind, node = item[0], item[1]
+        if kind == "event":
+            yield node
+
+        elif kind == "class":
+            attributes = {"name": node.children[0].value, "parent": node.children[1].value}
+            if positions:
+                attributes.update(position_attributes(node.meta))
+            yield "start", "class", attributes
+            stack.append(("event", ("end", "class", None)))
+            stack.extend(("method", method_tree) for method_tree in reversed(node.children[2:]))
+
+        elif kind == "method":
+            selector_tree = node.children[0].children[0]
+            selector = "".join(selector_tree.children) if isinstance(selector_tree, Tree) else selector_tree.value
+            attributes = {"selector": selector}
+            if positions:
+                attributes.update(position_attributes(node.meta))
+            yield "start", "method", attributes
+            stack.append(("event", ("end", "method", None)))
+            stack.append(("block", node))
+
+        elif kind == "block":
+            params = next((child.children for child in node.children if child.data == "param_list"), [])
+            statements = next((child.children for child in node.children if child.data == "blockstat"), [])
+            yield "start", "block", {"arity": str(len(params))}
+            for order, param in enumerate(params, start=1):
+                yield "start", "parameter", {"name": param[1:], "order": str(order)}
+                yield "end", "parameter", None
+            stack.append(("event", ("end", "block", None)))
+            stack.extend(("assign", statements[index], index + 1) for index in range(len(statements) - 1, -1, -1))
+
+        elif kind == "assign":
+            attributes = position_attributes(node.meta) if positions else {}
+            attributes["order"] = str(item[2])
+            yield "start", "assign", attributes
+            yield "start", "var", {"name": node.children[0].value}
+            yield "end", "var", None
+            yield "start", "expr", {}
+            stack.append(("event", ("end", "assign", None)))
+            stack.append(("event", ("end", "expr", None)))
+            stack.append(("expr", node.children[1], node.children[1].meta if positions else None))
+
+        elif kind == "expr":
+            base, tail = node.children
+            if not tail.children:
+                stack.append(("base", base, item[2]))
+                continue
+            if isinstance(tail.children[0], Token):
+                selector = tail.children[0].value
+                arguments = []
+            else:
+                parts = []
+                arguments = []
+                selector_tree = tail.children[0]
+                while selector_tree is not None:
+                    parts.append(selector_tree.children[0].value)
+                    arguments.append(selector_tree.children[1])
+                    selector_tree = selector_tree.children[2] if len(selector_tree.children) > 2 else None
+                selector = "".join(parts)
+            attributes = {"selector": selector}
+            if positions:
+                attributes.update(position_attributes(item[2]))
+            yield "start", "send", attributes
+            yield "start", "expr", {}
+            stack.append(("event", ("end", "send", None)))
+            for order in range(len(arguments), 0, -1):
+                stack.append(("event", ("end", "arg", None)))
+                stack.append(("event", ("end", "expr", None)))
+                stack.append(("base", arguments[order - 1], None))
+                stack.append(("event", ("start", "expr", {})))
+                stack.append(("event", ("start", "arg", {"order": str(order)})))
+            stack.append(("event", ("end", "expr", None)))
+            stack.append(("base", base, None))
 
-    args, unknown_args = parser.parse_known_args()
-    
-    
-    if unknown_args:
-        sys.stderr.write(f"Error: Unknown parameter(s): {' '.join(unknown_args)}\n")
-        sys.exit(10) 
-        
-    
-    help_count = sys.argv.count("--help") + sys.argv.count("-h")
+        else:
+            value = node.children[0]
+            if isinstance(value, Tree):
+                if value.data == "expr":
+                    stack.append(("expr", value, item[2] if item[2] is not None or not positions else value.meta))
+                else:
+                    stack.append(("block", value))
+                continue
+            if value.type == "SIGNED_INT":
+                tag, attributes = "literal", {"class": "Integer", "value": value.value}
+            elif value.type == "STR":
+                tag, attributes = "literal", {"class": "String", "value": value.value.strip("'")}
+            elif value.type == "CID":
+                tag, attributes = "literal", {"class": "class", "value": value.value}
+            elif value.value in ("nil", "true", "false"):
+                tag, attributes = "literal", {"class": value.value.capitalize(), "value": value.value}
+            else:
+                tag, attributes = "var", {"name": value.value}
+            yield "start", tag, attributes
+            yield "end", tag, None
 
-    if help_count > 1:
-        sys.stderr.write("Error: --help cannot be combined with itself or -h\n")
-        sys.exit(10)
 
-    if args.help or args.h:
-        if args.source:
-            sys.stderr.write("Error: --help cannot be combined with other parameters\n")
-            sys.exit(10)
-        print_help()
-        sys.exit(0)
+def iter_xml(events):
+    """
+    @brief Serializes an event stream into the pretty-printed XML of `pretty_xml()`.
 
-        
-    global input_data
-    if args.source:
-        try:
-            with open(args.source, 'r', encoding='utf-8') as file:
-                input_data = file.read()
-        except FileNotFoundError:
-            sys.stderr.write(f"Error: File '{args.source}' not found.\n")
-            sys.exit(11)
-        except PermissionError:
-            sys.stderr.write(f"Error: No permission to read file '{args.source}'.\n")
-            sys.exit(11)
-    
-    else:
-        input_data = sys.stdin.read()
-        
-        
-    
-    tokens = tokenize(input_data)
-    parse_tree = parse_code(input_data)
-    check_semantics(parse_tree)
-    transformer = SOL25Transformer()
-    xml_tree = transformer.transform(parse_tree)
-    xml_output = transformer.transform_to_xml()
-    print(xml_output)
+    @param events Events of `iter_events()`.
+    @return A generator of text pieces; joined, they equal `pretty_xml()` of the same AST.
+
+    @details
+    Elements are written as they arrive: a start tag waits only for the next event, which
+    decides whether it is an empty element. Attribute values are escaped like minidom does.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    depth = 0
+    pending = None
+    for event, tag, attributes in events:
+        if event == "start":
+            if pending is not None:
+                yield pending + ">\n"
+            pending = "  " * depth + "<" + tag + "".join(
+                f' {name}="{value.replace("&", "&amp;").replace("<", "&lt;").replace(chr(34), "&quot;").replace(">", "&gt;")}"'
+                for name, value in attributes.items())
+            depth += 1
+        else:
+            depth -= 1
+            if pending is not None:
+                yield pending + "/>\n"
+                pending = None
+            else:
+                yield "  " * depth + "</" + tag + ">\n"
+
+
+# @brief Parser engines accepted by `--engine`; `lark` is the LALR parser, `rd` the hand-written one.
+PARSER_ENGINES = ("lark", "rd")
+
+# @brief Terminals accepted after each token by the Lark contextual lexer, per parser context.
+# The sets are taken from the LALR states reached by shifting that token, so the recursive-descent
+# engine splits the input exactly like the Lark engine and fails at the same position.
+RD_CONTEXTS = {
+    "top": ("CLASS",),
+    "cid": ("CID",),
+    "colon": ("COLON",),
+    "lbrace": ("LBRACE",),
+    "member": ("ID_COLON", "RBRACE", "VALID_ID"),
+    "lsqb": ("LSQB",),
+    "selector": ("ID_COLON", "LSQB"),
+    "params": ("COLON_ID", "VBAR"),
+    "statement": ("RSQB", "VALID_ID"),
+    "assign": ("__ANON_0",),
+    "base": ("CID", "ID", "LPAR", "LSQB", "SIGNED_INT", "STR"),
+    "tail": ("DOT", "ID_COLON", "RPAR", "VALID_ID"),
+    "unary": ("DOT", "RPAR"),
+    "root": tuple(terminal.name for terminal in parser.terminals),
+}
+
+def build_scanner(names):
+    """
+    @brief Compiles the lexer of one recursive-descent parser context.
+
+    @param names Terminals accepted in that context.
+    @return A compiled regex with one named group per terminal, comments included.
+
+    @details
+    - Uses the terminal definitions and the match order of the Lark lexer.
+    - Whitespace is skipped by a prefix instead of a separate token; no terminal starts with it.
+    """
+    accepted = set(names) | {"COMMENT"}
+    terminals = sorted((terminal for terminal in parser.terminals if terminal.name in accepted),
+                       key=lambda terminal: (-terminal.priority, -terminal.pattern.max_width,
+                                             -len(terminal.pattern.value), terminal.name))
+    return re.compile(r"[ \t\n\f\r]*(?:" + "|".join(
+        f"(?P<{terminal.name}>{terminal.pattern.to_regexp()})" for terminal in terminals) + ")")
+
+# @brief Compiled lexer of each recursive-descent parser context.
+RD_SCANNERS = {context: build_scanner(names) for context, names in RD_CONTEXTS.items()}
+
+# @brief Whitespace skipped between tokens by both engines.
+RD_WHITESPACE = re.compile(r"[ \t\n\f\r]*")
+
+# @brief Number of parses running with the cyclic garbage collector paused, guarded by `gc_pause_lock`.
+gc_pause_depth = 0
+gc_was_enabled = False
+gc_pause_lock = threading.Lock()
+
+@contextlib.contextmanager
+def paused_gc():
+    """
+    @brief Pauses the cyclic garbage collector while the block runs.
+
+    @details
+    The collector is process-wide, so overlapping pauses from several threads are counted:
+    the first one disables it and the last one restores the previous setting.
+    """
+    global gc_pause_depth, gc_was_enabled
+    with gc_pause_lock:
+        if gc_pause_depth == 0:
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+        gc_pause_depth += 1
+    try:
+        yield
+    finally:
+        with gc_pause_lock:
+            gc_pause_depth -= 1
+            if gc_pause_depth == 0 and gc_was_enabled:
+                gc.enable()
+
+
+class SOL25RecursiveDescent:
+    # @brief Hand-written recursive-descent parser of SOL25 (`--engine=rd`) that builds the XML AST while parsing.
+
+    # @brief Shares the pretty-printer of the Lark engine.
+    transform_to_xml = SOL25Transformer.transform_to_xml
+
+    def __init__(self, code, limits=None):
+        """
+        @brief Initializes the parser state and the XML root element.
+
+        @param code The source code as a string.
+        @param limits Optional started Limits whose deadline is checked for every expression.
+        """
+        self.code = code
+        self.limits = limits
+        self.pos = 0
+        self.description = None
+        self.root = ET.Element("program", language="SOL25")
+
+    def parse(self):
+        """
+        @brief Parses the whole program.
+
+        @return The parse tree of the program, shaped exactly like the tree of the Lark parser.
+
+        @details
+        - The XML AST is built in `root` during parsing, so no `Transformer` pass is needed.
+        - The tree is kept for `SOL25Semantic`, whose traversal order decides which error is reported first.
+        - The description is taken from the first comment, like in `SOL25Transformer`.
+        - The cyclic garbage collector is paused meanwhile: the trees and elements built here
+          hold no reference cycles, and its repeated scans of them took half of the parse time.
+
+        @throws SOL25Error (exit code 22) if the code contains a syntax error.
+        @throws SOL25Error (exit code 21) if the code contains an invalid token.
+        """
+        with paused_gc():
+            classes = []
+            while self.next_token("top")[0] == "CLASS":
+                classes.append(self.parse_class())
+        if self.description:
+            self.root.set("description", self.description)
+        return Tree("program", classes)
+
+    def next_token(self, context):
+        """
+        @brief Reads the next token accepted in the given parser context.
+
+        @param context Key of RD_CONTEXTS.
+        @return A tuple of the terminal name and the lexeme, or `("$END", None)` at the end of the input.
+
+        @details
+        Comments are skipped; the first one is kept as the program description.
+        """
+        scanner = RD_SCANNERS[context]
+        while True:
+            match = scanner.match(self.code, self.pos)
+            if match is None:
+                return self.unexpected_input()
+            self.pos = match.end()
+            kind = match.lastgroup
+            if kind != "COMMENT":
+                return kind, match.group(kind)
+            if self.description is None:
+                self.description = match.group(kind)[1:-1]
+
+    def unexpected_input(self):
+        """
+        @brief Handles input that no terminal of the current context accepts.
+
+        @return `("$END", None)` if only whitespace is left.
+
+        @details
+        Like the Lark contextual lexer, the input is tried against all terminals: a known
+        terminal in the wrong place is a syntax error, anything else a lexical error.
+        """
+        pos = RD_WHITESPACE.match(self.code, self.pos).end()
+        if pos == len(self.code):
+            return "$END", None
+        if RD_SCANNERS["root"].match(self.code, pos):
+            self.syntax_error()
+        raise SOL25Error(21, "Lexical error.")
+
+    @staticmethod
+    def syntax_error():
+        # @brief Reports an unexpected token or end of input by raising SOL25Error (exit code 22).
+        raise SOL25Error(22, "Syntax error.")
+
+    def expect(self, context):
+        """
+        @brief Reads the only terminal accepted in a context.
+
+        @param context Key of RD_CONTEXTS with a single terminal.
+        @return The lexeme of the token.
+        """
+        kind, value = self.next_token(context)
+        if kind == "$END":
+            self.syntax_error()
+        return value
+
+    def parse_class(self):
+        """
+        @brief Parses a class definition after the `class` keyword.
+
+        @return The `class_def` tree; the `class` element is appended to the root.
+        """
+        name = self.expect("cid")
+        self.expect("colon")
+        parent = self.expect("cid")
+        self.expect("lbrace")
+
+        class_elem = ET.SubElement(self.root, "class", name=name, parent=parent)
+        children = [Token("CID", name), Token("CID", parent)]
+        kind, value = self.next_token("member")
+        while kind != "RBRACE":
+            children.append(self.parse_method(kind, value, class_elem))
+            kind, value = self.next_token("member")
+        return Tree("class_def", children)
+
+    def parse_method(self, kind, value, class_elem):
+        """
+        @brief Parses a method definition.
+
+        @param kind Terminal name of the first token of the method name.
+        @param value Lexeme of that token.
+        @param class_elem The XML element of the enclosing class.
+        @return The `method_def` tree; the `method` element is appended to `class_elem`.
+        """
+        if kind == "VALID_ID":
+            name = Token("VALID_ID", value)
+            self.expect("lsqb")
+        elif kind == "ID_COLON":
+            parts = [Token("ID_COLON", value)]
+            kind, value = self.next_token("selector")
+            while kind == "ID_COLON":
+                parts.append(Token("ID_COLON", value))
+                kind, value = self.next_token("selector")
+            if kind != "LSQB":
+                self.syntax_error()
+            name = Tree("method_selector", parts)
+            value = "".join(parts)
+        else:
+            self.syntax_error()
+
+        method_elem = ET.SubElement(class_elem, "method", selector=value)
+        params, statements, block_elem = self.parse_block_body()
+        method_elem.append(block_elem)
+
+        children = [Tree("method_name", [name])]
+        if params:
+            children.append(Tree("param_list", params))
+        if statements:
+            children.append(Tree("blockstat", statements))
+        return Tree("method_def", children)
+
+    def parse_block_body(self):
+        """
+        @brief Parses the parameters and statements of a method or block after `[`.
+
+        @return A tuple of the parameter tokens, the `assign` trees and the `block` element.
+        """
+        params = []
+        kind, value = self.next_token("params")
+        while kind == "COLON_ID":
+            params.append(Token("COLON_ID", value))
+            kind, value = self.next_token("params")
+        if kind != "VBAR":
+            self.syntax_error()
+
+        block_elem = ET.Element("block", arity=str(len(params)))
+        for order, param in enumerate(params, start=1):
+            ET.SubElement(block_elem, "parameter", name=param[1:], order=str(order))
+
+        statements = []
+        kind, value = self.next_token("statement")
+        while kind == "VALID_ID":
+            self.expect("assign")
+            expr_tree, expr_elem, kind = self.parse_expr(*self.next_token("base"))
+            if kind != "DOT":
+                self.syntax_error()
+
+            assign_elem = ET.SubElement(block_elem, "assign", order=str(len(statements) + 1))
+            ET.SubElement(assign_elem, "var", name=value)
+            ET.SubElement(assign_elem, "expr").append(expr_elem)
+            statements.append(Tree("assign", [Token("VALID_ID", value), expr_tree]))
+            kind, value = self.next_token("statement")
+        if kind != "RSQB":
+            self.syntax_error()
+        return params, statements, block_elem
+
+    def parse_expr(self, kind, value):
+        """
+        @brief Parses an expression: a base followed by an optional unary or keyword message.
+
+        @param kind Terminal name of the first token.
+        @param value Lexeme of that token.
+        @return A tuple of the `expr` tree, its XML element and the terminal name of the token after it.
+        """
+        if self.limits is not None:
+            self.limits.tick()
+        base_tree, elem = self.parse_base(kind, value)
+        kind, value = self.next_token("tail")
+
+        if kind == "VALID_ID":
+            tail = [Token("VALID_ID", value)]
+            elem = self.send(value, elem, [])
+            kind, value = self.next_token("unary")
+        elif kind == "ID_COLON":
+            parts = []
+            while kind == "ID_COLON":
+                arg_tree, arg_elem = self.parse_base(*self.next_token("base"))
+                parts.append((Token("ID_COLON", value), arg_tree, arg_elem))
+                kind, value = self.next_token("tail")
+
+            selector = None
+            for part in reversed(parts):
+                selector = Tree("expr_sel", [part[0], part[1]] + ([selector] if selector is not None else []))
+            tail = [selector]
+            elem = self.send("".join(part[0] for part in parts), elem, [part[2] for part in parts])
+        else:
+            tail = []
+
+        return Tree("expr", [base_tree, Tree("expr_tail", tail)]), elem, kind
+
+    def parse_base(self, kind, value):
+        """
+        @brief Parses the base of an expression: a literal, a variable, a class, `( expr )` or a block.
+
+        @param kind Terminal name of the first token.
+        @param value Lexeme of that token.
+        @return A tuple of the `expr_base` tree and its XML element.
+        """
+        if kind == "LPAR":
+            expr_tree, elem, kind = self.parse_expr(*self.next_token("base"))
+            if kind != "RPAR":
+                self.syntax_error()
+            return Tree("expr_base", [expr_tree]), elem
+
+        if kind == "LSQB":
+            params, statements, elem = self.parse_block_body()
+            block_tree = Tree("block", [Tree("param_list", params), Tree("blockstat", statements)])
+            return Tree("expr_base", [block_tree]), elem
+
+        if kind == "SIGNED_INT":
+            elem = ET.Element("literal", attrib={"class": "Integer", "value": value})
+        elif kind == "STR":
+            elem = ET.Element("literal", attrib={"class": "String", "value": value.strip("'")})
+        elif kind == "ID":
+            if value in {"nil", "true", "false"}:
+                elem = ET.Element("literal", {"class": value.capitalize(), "value": value})
+            else:
+                elem = ET.Element("var", name=value)
+        elif kind == "CID":
+            elem = ET.Element("literal", attrib={"class": "class", "value": value})
+        else:
+            self.syntax_error()
+        return Tree("expr_base", [Token(kind, value)]), elem
+
+    @staticmethod
+    def send(selector, receiver, arguments):
+        """
+        @brief Builds the XML element of a message send.
+
+        @param selector The full selector.
+        @param receiver XML element of the receiver expression.
+        @param arguments XML elements of the arguments, in order.
+        @return The `send` element.
+        """
+        send_elem = ET.Element("send", selector=selector)
+        ET.SubElement(send_elem, "expr").append(receiver)
+        for order, argument in enumerate(arguments, start=1):
+            arg_elem = ET.SubElement(send_elem, "arg", order=str(order))
+            ET.SubElement(arg_elem, "expr").append(argument)
+        return send_elem
+
+# @brief Output formats accepted by `--format`; `xml` is the pretty-printed default.
+OUTPUT_FORMATS = ("xml", "xml-compact", "json", "jsonl", "binary")
+
+# @brief Magic header and version of the binary AST encoding.
+BINARY_MAGIC = b"S25B\x01"
+
+
+def element_to_dict(elem):
+    """
+    @brief Converts an XML AST element into a JSON-compatible dictionary.
+
+    @param elem The XML element to convert.
+    @return A dictionary with the `tag`, the element attributes, and optional `text` and `children`.
+    """
+    node = {"tag": elem.tag}
+    node.update(elem.attrib)
+    if elem.text:
+        node["text"] = elem.text
+    if len(elem):
+        node["children"] = [element_to_dict(child) for child in elem]
+    return node
+
+
+def dict_to_element(node):
+    """
+    @brief Converts a dictionary produced by `element_to_dict()` back into an XML element.
+
+    @param node The dictionary to convert.
+    @return The corresponding XML element.
+    """
+    attrib = {key: value for key, value in node.items() if key not in ("tag", "text", "children")}
+    elem = ET.Element(node["tag"], attrib)
+    elem.text = node.get("text")
+    for child in node.get("children", ()):
+        elem.append(dict_to_element(child))
+    return elem
+
+
+def write_varint(out, value):
+    """
+    @brief Appends an unsigned integer in LEB128 (7 bits per byte) encoding.
+
+    @param out The bytearray being written.
+    @param value The non-negative integer to encode.
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    """
+    @brief Reads an unsigned LEB128 integer.
+
+    @param data The encoded buffer.
+    @param pos Offset of the first byte of the integer.
+    @return A tuple of the decoded value and the offset after it.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_binary(root):
+    """
+    @brief Encodes an XML AST into the compact length-prefixed binary format.
+
+    @param root The `program` XML element.
+    @return The encoded bytes.
+
+    @details
+    The buffer starts with BINARY_MAGIC followed by the root node. Each node is written as
+    its tag, the attribute count, key/value pairs, the text, the child count and the children.
+    Counts are varints. Every string is interned: its first occurrence is written as
+    varint 0, its UTF-8 length and bytes; later occurrences as varint (index + 1) into the
+    table of strings seen so far, so repeated tags, selectors and names cost one or two bytes.
+    """
+    out = bytearray(BINARY_MAGIC)
+    strings = {}
+
+    def write_string(value):
+        index = strings.get(value)
+        if index is not None:
+            write_varint(out, index + 1)
+            return
+        strings[value] = len(strings)
+        data = value.encode("utf-8")
+        out.append(0)
+        write_varint(out, len(data))
+        out.extend(data)
+
+    def write_node(elem):
+        write_string(elem.tag)
+        write_varint(out, len(elem.attrib))
+        for key, value in elem.attrib.items():
+            write_string(key)
+            write_string(value)
+        write_string(elem.text or "")
+        write_varint(out, len(elem))
+        for child in elem:
+            write_node(child)
+
+    write_node(root)
+    return bytes(out)
+
+
+def decode_binary(data):
+    """
+    @brief Decodes the binary AST format produced by `encode_binary()`.
+
+    @param data The encoded bytes.
+    @return The `program` XML element.
+
+    @throws ValueError if the data does not start with BINARY_MAGIC.
+    """
+    if not data.startswith(BINARY_MAGIC):
+        raise ValueError("Not a SOL25 binary AST.")
+
+    strings = []
+    pos = len(BINARY_MAGIC)
+
+    def read_string():
+        nonlocal pos
+        index, pos = read_varint(data, pos)
+        if index:
+            return strings[index - 1]
+        length, pos = read_varint(data, pos)
+        value = data[pos:pos + length].decode("utf-8")
+        pos += length
+        strings.append(value)
+        return value
+
+    def read_node():
+        nonlocal pos
+        tag = read_string()
+        attr_count, pos = read_varint(data, pos)
+        elem = ET.Element(tag)
+        for _ in range(attr_count):
+            key = read_string()
+            elem.set(key, read_string())
+        elem.text = read_string() or None
+        child_count, pos = read_varint(data, pos)
+        for _ in range(child_count):
+            elem.append(read_node())
+        return elem
+
+    return read_node()
+
+
+def format_output(root, output_format):
+    """
+    @brief Serializes the XML AST in the requested output format.
+
+    @param root The `program` element built by SOL25Transformer or SOL25RecursiveDescent.
+    @param output_format One of OUTPUT_FORMATS.
+    @return A string for the text formats, or bytes for `binary`.
+
+    @details
+    - `xml`: the pretty-printed document from `pretty_xml()`.
+    - `xml-compact`: the same document without indentation.
+    - `json`: the whole AST as one nested JSON object.
+    - `jsonl`: the program attributes on the first line, then one JSON object per class.
+    - `binary`: the interned length-prefixed encoding read back by `decode_binary()`.
+    """
+    if output_format == "xml":
+        return pretty_xml(root)
+    if output_format == "xml-compact":
+        return '<?xml version="1.0" encoding="UTF-8"?>' + ET.tostring(root, encoding="unicode")
+    if output_format == "json":
+        return json.dumps(element_to_dict(root), ensure_ascii=False, separators=(",", ":"))
+    if output_format == "jsonl":
+        header = {"tag": root.tag}
+        header.update(root.attrib)
+        lines = [json.dumps(header, ensure_ascii=False, separators=(",", ":"))]
+        lines.extend(json.dumps(element_to_dict(cls), ensure_ascii=False, separators=(",", ":")) for cls in root)
+        return "\n".join(lines)
+    return encode_binary(root)
+
+
+# @brief Block size of the buffers between the serializer, the compressor and the `--output` file.
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def open_compressor(path, raw):
+    """
+    @brief Opens the compressing stream selected by the extension of an output path.
+
+    @param path The `--output` path.
+    @param raw The binary file the compressed data is written to.
+    @return A binary stream for `.gz` and `.xz` paths, otherwise None.
+
+    @throws SOL25Error (exit code 10) for `.xz` when Python was built without `lzma`.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".gz":
+        return gzip.GzipFile(os.path.basename(path)[:-3], "wb", 6, raw, mtime=0)
+    if extension == ".xz":
+        if lzma is None:
+            raise SOL25Error(10, "xz compression is not available in this Python installation.")
+        return lzma.LZMAFile(raw, "wb")
+    return None
+
+
+@contextlib.contextmanager
+def output_sink(path):
+    """
+    @brief Opens a buffered binary stream whose contents replace `path` atomically.
+
+    @param path The `--output` path; `.gz` and `.xz` extensions compress the data on the fly.
+    @return A context manager yielding the binary stream.
+
+    @throws SOL25Error (exit code 12) if the file cannot be created or written.
+
+    @details
+    - The data goes to a temporary file in the directory of `path`, which is synced and
+      renamed over `path` only after everything was written. Readers of `path` see either
+      the old file or the complete new one, never a partial output.
+    - If writing fails or is interrupted, the temporary file is removed and `path` is left untouched.
+    - A symbolic link is followed: the file it points to is replaced and the link stays.
+    - The new file gets the permission bits of the file it replaces, or those of a newly
+      created file (0666 without the umask).
+    """
+    target = os.path.realpath(path)
+    directory = os.path.dirname(target)
+    try:
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(target)}.", suffix=".tmp", dir=directory)
+    except OSError as e:
+        raise SOL25Error(12, f"Cannot write output file '{path}': {e.strerror}.")
+    try:
+        with open(fd, "wb", buffering=OUTPUT_BUFFER_SIZE) as raw:
+            compressor = open_compressor(path, raw)
+            if compressor is None:
+                yield raw
+            else:
+                with compressor, io.BufferedWriter(compressor, OUTPUT_BUFFER_SIZE) as stream:
+                    yield stream
+            raw.flush()
+            os.fsync(raw.fileno())
+        try:
+            mode = os.stat(target).st_mode & 0o7777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, target)
+    except OSError as e:
+        remove_file(temp_path)
+        raise SOL25Error(12, f"Cannot write output file '{path}': {e.strerror}.")
+    except BaseException:
+        remove_file(temp_path)
+        raise
+
+
+def remove_file(path):
+    """
+    @brief Removes a file, ignoring a file that is already gone.
+
+    @param path Path of the file.
+    """
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def write_output(output, output_format, stream):
+    """
+    @brief Streams the output to a binary file, with the same bytes the command line prints.
+
+    @param output The `program` element, or an output already built by `format_output()`.
+    @param output_format One of OUTPUT_FORMATS.
+    @param stream The binary stream from `output_sink()`.
+
+    @details
+    - The text formats are written in UTF-8 and end with the newline added by `print()`.
+    - `xml`, `xml-compact` and `jsonl` are written piece by piece, without building the
+      document string: minidom and ElementTree write the tree straight into the stream,
+      `jsonl` goes one class at a time.
+    """
+    if isinstance(output, bytes) or output_format == "binary":
+        stream.write(output if isinstance(output, bytes) else encode_binary(output))
+        return
+
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="\n")
+    if isinstance(output, str):
+        text.write(output)
+    elif output_format == "xml":
+        document = xml.dom.minidom.parseString(ET.tostring(output, encoding="utf-8"))
+        document.writexml(text, "", "  ", "\n", encoding="UTF-8")
+    elif output_format == "xml-compact":
+        text.write('<?xml version="1.0" encoding="UTF-8"?>')
+        ET.ElementTree(output).write(text, encoding="unicode")
+    elif output_format == "jsonl":
+        header = {"tag": output.tag}
+        header.update(output.attrib)
+        text.write(json.dumps(header, ensure_ascii=False, separators=(",", ":")))
+        for cls in output:
+            text.write("\n")
+            text.write(json.dumps(element_to_dict(cls), ensure_ascii=False, separators=(",", ":")))
+    else:
+        text.write(format_output(output, output_format))
+    text.write("\n")
+    text.flush()
+    text.detach()
+
+
+class Result:
+    # @brief Outcome of one analysis, returned by `Analyzer.analyze()`.
+
+    def __init__(self, ast=None, tree=None, error=None, diagnostics=None, class_counts=None, description=None,
+                 duplicates=None):
+        """
+        @brief Stores the products of an analysis.
+
+        @param ast The XML AST (`program` element), or None if the analysis failed.
+        @param tree The parse tree, or None if parsing failed.
+        @param error The SOL25Error that stopped the analysis, if any.
+        @param diagnostics The Diagnostics of an `all_errors` analysis, or None.
+        @param class_counts Number of classes of each source in `ast`, in order, or None if parsing failed.
+        @param description The program description (first comment), or None.
+        @param duplicates The `MemoSession.statistics()` of an analysis with a memo, or None.
+        """
+        self.ast = ast
+        self.tree = tree
+        self.error = error
+        self.diagnostics = diagnostics
+        self.class_counts = class_counts
+        self.description = description
+        self.duplicates = duplicates
+
+    @property
+    def errors(self):
+        """
+        @brief All reported errors.
+
+        @return A list of (exit code, message) tuples, empty for a valid program.
+        """
+        if self.error is not None:
+            return [(self.error.exit_code, self.error.message)]
+        return list(self.diagnostics.errors) if self.diagnostics is not None else []
+
+    @property
+    def exit_code(self):
+        """
+        @brief The exit code the command line would end with.
+
+        @return 0 for a valid program, otherwise the code of the first error.
+        """
+        errors = self.errors
+        return errors[0][0] if errors else 0
+
+    @property
+    def xml(self):
+        """
+        @brief The pretty-printed XML document.
+
+        @return The XML string, or None if the analysis failed.
+        """
+        return pretty_xml(self.ast) if self.ast is not None else None
+
+    def serialize(self, output_format="xml"):
+        """
+        @brief Serializes the AST in one of OUTPUT_FORMATS.
+
+        @param output_format The output format.
+        @return A string for the text formats, or bytes for `binary`.
+        """
+        return format_output(self.ast, output_format)
+
+
+class Analyzer:
+    # @brief Reentrant SOL25 analysis pipeline; one instance can serve several threads at once.
+
+    def __init__(self, engine="lark", positions=False, all_errors=False, library=(), require_main=True, limits=None,
+                 classes=(), reachable_from=(), memo=None, metrics=None):
+        """
+        @brief Configures the pipeline.
+
+        @param engine One of PARSER_ENGINES.
+        @param positions True to record source spans in the XML and in error messages.
+        @param all_errors True to collect every error instead of stopping at the first one.
+        @param library Classes known from interfaces, as returned by `load_interface()`.
+        @param require_main False to check a class library, which has no `Main` class.
+        @param limits Optional Limits; every analysis starts its own budget from them.
+        @param classes Names of classes to check and emit instead of the whole program.
+        @param reachable_from Names of classes whose reachable classes are checked and emitted.
+        @param memo Optional Memo reusing the verdicts and XML of identical methods across analyses.
+        @param metrics Optional Metrics receiving a file of rows for every successful analysis.
+
+        @throws ValueError for an unknown engine, or for `rd` combined with positions or all errors.
+        """
+        if engine not in PARSER_ENGINES:
+            raise ValueError(f"Unknown parser engine '{engine}'.")
+        if engine == "rd" and (positions or all_errors):
+            raise ValueError("--engine=rd cannot be combined with --positions or --all-errors")
+        self.engine = engine
+        self.positions = positions
+        self.all_errors = all_errors
+        self.library = list(library)
+        self.require_main = require_main
+        self.limits = limits
+        self.classes = list(classes)
+        self.reachable_from = list(reachable_from)
+        self.memo = memo
+        self.metrics = metrics
+        if engine == "lark":
+            # @brief Build the parser now, so concurrent analyses only share a finished one.
+            get_parser(positions)
+
+    def analyze(self, source, build_ast=True):
+        """
+        @brief Runs the lexical, syntactic and semantic checks and builds the XML AST.
+
+        @param source The source code as a string or its UTF-8 encoding as a bytes-like object,
+                      or a list of them for a program split into several files.
+        @param build_ast False to skip the XML transformation of the Lark engine; the Result
+                         then has no `ast`, for `events()`. The rd engine builds it while parsing.
+        @return A Result; errors are returned in it instead of terminating the process.
+
+        @details
+        - Follows the command-line pipeline: decoding, the regex pre-pass, parsing,
+          semantic analysis and the XML transformation.
+        - Several sources are parsed one by one and checked as one program, with their
+          classes in the given order; the description is the first comment of all files.
+        - Everything an analysis modifies is created for this call: the comment list,
+          the Diagnostics, the semantic checker, the transformer and the Limits budget.
+          Shared objects (parser tables, compiled regexes) are only read, so calls may run concurrently.
+        - With `limits`, the size is checked first and the token, nesting and class limits in
+          the pre-pass, before any recursive pass; the deadline is checked by the pre-pass,
+          the rd parser, the semantic checks and the transformer. Nesting too deep for the
+          recursion limit of Python is reported as exit code 13 as well.
+        - With `classes` or `reachable_from`, the whole program is parsed and its class and
+          method tables are checked, but the per-method checks, the XML transformation and
+          the output cover only the selected classes (`select_classes()`), in source order.
+        - With `memo`, every method is hashed (`MemoSession`); the semantic checks and, for
+          `lark` without positions, the XML transformation reuse the results of identical
+          methods, and the Result carries the duplicate-code statistics.
+        - With `metrics`, the semantic checks measure the checked classes and methods into
+          tables of this analysis, which are merged into `metrics` only if it succeeds.
+        """
+        sources = source if isinstance(source, (list, tuple)) else [source]
+        diagnostics = Diagnostics() if self.all_errors else None
+        budget = self.limits.start() if self.limits is not None else None
+        comments = []
+        trees = []
+        collected = Metrics() if self.metrics is not None else None
+        try:
+            buffers = [source.encode("utf-8") if isinstance(source, str) else source for source in sources]
+            if budget is not None:
+                budget.check_size(sum(len(buffer) for buffer in buffers))
+            for buffer in buffers:
+                code = decode_source(buffer)
+                # @brief Run the lexical check without keeping the token list in memory.
+                tokens = iter_tokens(buffer, diagnostics)
+                if budget is not None:
+                    tokens = budget.tokens_of(tokens)
+                collections.deque(tokens, maxlen=0)
+                if self.engine == "rd":
+                    engine = SOL25RecursiveDescent(code, budget)
+                    trees.append((engine, engine.parse()))
+                else:
+                    trees.append(parse_code(code, self.positions, diagnostics, comments, budget))
+                # @brief Each phase also ends with a read of the clock, so a short but slow input,
+                # with fewer steps than Limits.CLOCK_INTERVAL, cannot outrun the deadline.
+                if budget is not None:
+                    budget.check_time()
+
+            if self.engine == "rd":
+                root = trees[0][0].root
+                if len(trees) > 1:
+                    root = ET.Element("program", language="SOL25")
+                    description = next((engine.description for engine, _ in trees if engine.description is not None), None)
+                    if description:
+                        root.set("description", description)
+                    for engine, _ in trees:
+                        root.extend(engine.root)
+                tree = merge_trees([tree for _, tree in trees])
+                selected = self.select(tree)
+                session = MemoSession(self.memo, tree) if self.memo is not None else None
+                check_semantics(tree, library=self.library, require_main=self.require_main, limits=budget, classes=selected,
+                                memo=session, metrics=collected)
+                if budget is not None:
+                    budget.check_time()
+                if collected is not None:
+                    self.metrics.merge(collected)
+                description = root.get("description")
+                duplicates = session.statistics() if session is not None else None
+                if selected is not None:
+                    elements = [elem for elem in root if elem.get("name") in selected]
+                    root = ET.Element("program", root.attrib)
+                    root.extend(elements)
+                    return Result(root, tree, class_counts=self.count_selected([tree for _, tree in trees], selected),
+                                  description=description, duplicates=duplicates)
+                return Result(root, tree, class_counts=[len(tree.children) for _, tree in trees], description=description,
+                              duplicates=duplicates)
+            tree = None if None in trees else merge_trees(trees)
+            selected = None
+            session = None
+            if tree is not None:
+                selected = self.select(tree)
+                session = MemoSession(self.memo, tree) if self.memo is not None else None
+                check_semantics(tree, self.positions, diagnostics, self.library, self.require_main, budget, selected, session,
+                                collected)
+                if budget is not None:
+                    budget.check_time()
+            if diagnostics is not None and diagnostics.errors:
+                return Result(tree=tree, diagnostics=diagnostics)
+            description = comments[0].value[1:-1] if comments and comments[0].value[1:-1] else None
+            if selected is None:
+                program = tree
+                class_counts = [len(tree.children) for tree in trees]
+            else:
+                program = Tree("program", [class_tree for class_tree in tree.children if class_tree.children[0].value in selected])
+                class_counts = self.count_selected(trees, selected)
+            duplicates = session.statistics() if session is not None else None
+            if not build_ast:
+                if collected is not None:
+                    self.metrics.merge(collected)
+                return Result(tree=tree, diagnostics=diagnostics, class_counts=class_counts, description=description,
+                              duplicates=duplicates)
+            transformer_class = SOL25PositionTransformer if self.positions else SOL25Transformer
+            transformer = transformer_class(comments, budget)
+            if session is not None and not self.positions:
+                session.transform(transformer, program)
+                duplicates = session.statistics()
+            else:
+                transformer.transform(program)
+            if budget is not None:
+                budget.check_time()
+        except SOL25Error as e:
+            return Result(error=e, diagnostics=diagnostics)
+        except RecursionError:
+            return Result(error=SOL25Error(13, "Nesting is too deep to analyze."), diagnostics=diagnostics)
+
+        if collected is not None:
+            self.metrics.merge(collected)
+        return Result(transformer.root, tree, diagnostics=diagnostics, class_counts=class_counts, description=description,
+                      duplicates=duplicates)
+
+    def events(self, source):
+        """
+        @brief Checks a program and streams its AST as events instead of building it.
+
+        @param source The source code, as for `analyze()`.
+        @return A generator of `iter_events()`; `iter_xml()` turns it into the usual XML.
+
+        @throws SOL25Error for the first error; the checks run before this method returns.
+        """
+        result = self.analyze(source, build_ast=False)
+        if result.exit_code:
+            raise result.error if result.error is not None else SOL25Error(*result.errors[0])
+        return iter_events(result.tree, result.description, self.positions, self.select(result.tree))
+
+    def select(self, tree):
+        """
+        @brief Applies the class selection of this analyzer to a program.
+
+        @param tree The `program` tree.
+        @return The set of selected class names, or None to analyze the whole program.
+        """
+        if not self.classes and not self.reachable_from:
+            return None
+        return select_classes(tree, self.classes, self.reachable_from)
+
+    @staticmethod
+    def count_selected(trees, selected):
+        """
+        @brief Counts the selected classes of each source.
+
+        @param trees The `program` trees of the sources, in order.
+        @param selected The set of selected class names.
+        @return The number of emitted classes of each source.
+        """
+        return [sum(class_tree.children[0].value in selected for class_tree in tree.children) for tree in trees]
+
+
+def merge_trees(trees):
+    """
+    @brief Joins the parse trees of several source files into one program.
+
+    @param trees The `program` trees in file order.
+    @return The only tree itself, otherwise a new `program` tree with the classes of all trees.
+    """
+    if len(trees) == 1:
+        return trees[0]
+    return Tree("program", [class_tree for tree in trees for class_tree in tree.children])
+
+
+def select_classes(tree, names=(), roots=()):
+    """
+    @brief Chooses the classes of a selective analysis (`--class`, `--reachable-from`).
+
+    @param tree The `program` tree.
+    @param names Classes selected by name.
+    @param roots Classes whose reachable classes are selected, including themselves.
+    @return The set of selected class names.
+
+    @details
+    A class reaches its superclass and every class used as a literal in its methods.
+    Built-in classes and classes of interfaces have no tree here and are not followed.
+
+    @throws SOL25Error (exit code 10) if a given class is not defined in the sources.
+    """
+    class_trees = {class_tree.children[0].value: class_tree for class_tree in tree.children}
+    for name in (*names, *roots):
+        if name not in class_trees:
+            raise SOL25Error(10, f"Selected class '{name}' is not defined in the source.")
+
+    reached = set()
+    stack = list(roots)
+    while stack:
+        name = stack.pop()
+        if name in reached or name not in class_trees:
+            continue
+        reached.add(name)
+        stack.extend(token.value for token in class_trees[name].scan_values(
+            lambda value: isinstance(value, Token) and value.type == "CID"))
+    return reached.union(names)
+
+
+# @brief Splits the source before every `class` keyword at brace depth 0; strings and comments are skipped.
+CLASS_SPLIT_REGEX = re.compile(r'"[^"]*"|\'(?:[^\'\\]|\\.)*\'|[{}]|\bclass\b')
+
+# @brief Class name and parent of a class header; whitespace and comments may separate the tokens.
+CLASS_HEADER_REGEX = re.compile(
+    r'class(?:[ \t\n\f\r]+|"[^"]*")*([A-Z][a-zA-Z0-9_]*)(?:[ \t\n\f\r]+|"[^"]*")*:'
+    r'(?:[ \t\n\f\r]+|"[^"]*")*([A-Z][a-zA-Z0-9_]*)'
+)
+
+# @brief Number of batches given to each worker process, to even out uneven class sizes.
+BATCHES_PER_JOB = 4
+
+
+class SOL25BatchSemantic(SOL25Semantic):
+    # @brief Semantic checks of a contiguous run of classes, using class tables of the whole program.
+
+    def __init__(self, class_names, class_parents, last_cid=UNKNOWN_CID):
+        """
+        @brief Initializes the checker with the program-wide class tables.
+
+        @param class_names Set of all class names of the program.
+        @param class_parents Dictionary mapping every class to its parent.
+        @param last_cid `last_CID` left by the preceding classes, or UNKNOWN_CID if not known yet.
+        """
+        super().__init__()
+        self.class_names = class_names
+        self.class_parents = class_parents
+        self.last_CID = last_cid
+
+
+def split_classes(code):
+    """
+    @brief Splits a program into the source text of its classes.
+
+    @param code The decoded source code.
+    @return A list of (text, class name, parent) tuples in source order, or None if a class header is not recognized.
+
+    @note The first text also holds everything before the first class. The split is only
+          a guess; `analyze_parallel()` checks it against what the parser produced.
+    """
+    starts = []
+    depth = 0
+    for match in CLASS_SPLIT_REGEX.finditer(code):
+        token = match.group()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+        elif token == "class" and depth == 0:
+            starts.append(match.start())
+
+    classes = []
+    bounds = [0] + starts[1:] + [len(code)]
+    for index, start in enumerate(starts):
+        header = CLASS_HEADER_REGEX.match(code, start)
+        if header is None:
+            return None
+        classes.append((code[bounds[index]:bounds[index + 1]], header.group(1), header.group(2)))
+    return classes
+
+
+def serialize_class(class_elem, output_format):
+    """
+    @brief Serializes one `class` element as it appears inside the whole document.
+
+    @param class_elem The `class` element.
+    @param output_format One of OUTPUT_FORMATS.
+    @return The fragment joined by `assemble_output()`; the element itself for `binary`.
+    """
+    if output_format == "xml":
+        writer = io.StringIO()
+        xml.dom.minidom.parseString(ET.tostring(class_elem, encoding="utf-8")).documentElement.writexml(writer, "  ", "  ", "\n")
+        return writer.getvalue()
+    if output_format == "xml-compact":
+        return ET.tostring(class_elem, encoding="unicode")
+    if output_format in ("json", "jsonl"):
+        return json.dumps(element_to_dict(class_elem), ensure_ascii=False, separators=(",", ":"))
+    return class_elem
+
+
+def assemble_output(root, fragments, output_format):
+    """
+    @brief Joins class fragments from `serialize_class()` into the output of `format_output()`.
+
+    @param root The `program` element without classes.
+    @param fragments The class fragments in source order.
+    @param output_format One of OUTPUT_FORMATS.
+    @return The same string or bytes `format_output()` returns for the complete AST.
+
+    @details
+    - The program element is serialized with a single placeholder class, which is then
+      replaced by the fragments, so the enclosing markup comes from `format_output()` itself.
+    - The placeholder is searched from the end, as the description may contain its text.
+    """
+    if output_format == "binary" or not fragments:
+        root.extend(fragments)
+        return format_output(root, output_format)
+    if output_format == "jsonl":
+        return "\n".join([format_output(root, output_format)] + fragments)
+
+    ET.SubElement(root, "placeholder")
+    template = format_output(root, output_format)
+    marker = {"xml": "  <placeholder/>\n", "xml-compact": "<placeholder />", "json": '{"tag":"placeholder"}'}[output_format]
+    head, _, tail = template.rpartition(marker)
+    separator = "," if output_format == "json" else ""
+    return head + separator.join(fragments) + tail
+
+
+def process_classes(text, class_names, class_parents, engine, output_format, last_cid=UNKNOWN_CID):
+    """
+    @brief Parses, checks and serializes a contiguous run of classes; runs in a worker process.
+
+    @param text Source text of the classes.
+    @param class_names Set of all class names of the program.
+    @param class_parents Dictionary mapping every class to its parent.
+    @param engine One of PARSER_ENGINES.
+    @param output_format One of OUTPUT_FORMATS.
+    @param last_cid `last_CID` left by the preceding classes, or UNKNOWN_CID if not known.
+    @return None if the text does not parse, otherwise a dictionary with:
+            - `headers`: (class name, parent) of each parsed class,
+            - `comment`: text of the first comment, or None,
+            - `method_error`, `error`: (exit code, message) of the first error of the
+              method collection and of the checks, or None,
+            - `needs_state`: True if the checks stopped on a StateDependency,
+            - `found_main`, `has_run_method`, `last_cid`: semantic state after the batch,
+            - `fragments`: serialized classes, or None after an error.
+    """
+    comments = []
+    try:
+        if engine == "rd":
+            rd_parser = SOL25RecursiveDescent(text)
+            tree = rd_parser.parse()
+            comment = rd_parser.description
+        else:
+            tree = parse_code(text, comments=comments)
+            comment = comments[0].value[1:-1] if comments else None
+    except SOL25Error:
+        return None
+
+    result = {
+        "headers": [(class_tree.children[0].value, class_tree.children[1].value) for class_tree in tree.children],
+        "comment": comment,
+        "method_error": None,
+        "error": None,
+        "needs_state": False,
+        "found_main": False,
+        "has_run_method": False,
+        "last_cid": last_cid,
+        "fragments": None,
+    }
+    semantic_check = SOL25BatchSemantic(class_names, class_parents, last_cid)
+    try:
+        semantic_check.collect_methods(tree)
+    except SOL25Error as e:
+        result["method_error"] = (e.exit_code, e.message)
+        return result
+    try:
+        semantic_check.visit_topdown(tree)
+    except SOL25Error as e:
+        result["error"] = (e.exit_code, e.message)
+        return result
+    except StateDependency:
+        result["needs_state"] = True
+        return result
+
+    result["found_main"] = semantic_check.found_main
+    result["has_run_method"] = semantic_check.has_run_method
+    result["last_cid"] = semantic_check.last_CID
+    if engine == "rd":
+        elements = list(rd_parser.root)
+    else:
+        transformer = SOL25Transformer()
+        elements = [transformer.transform(class_tree) for class_tree in tree.children]
+    result["fragments"] = [serialize_class(elem, output_format) for elem in elements]
+    return result
+
+
+def index_analysis(database, paths, sources, result):
+    """
+    @brief Records the classes of an analyzed program in the cross-reference index (`--index`).
+
+    @param database Path to the SQLite database of xref.py.
+    @param paths Paths of the source files.
+    @param sources The source buffers, in the order of `paths`.
+    @param result The successful Result of the analysis.
+
+    @throws SOL25Error (exit code 11) if the database is not an index or is damaged,
+            (exit code 12) if it cannot be updated.
+    """
+    # @brief Imported here, so the analyzer only needs xref.py when --index is used.
+    import xref
+
+    classes = list(result.ast)
+    start = 0
+    try:
+        connection = xref.open_index(database)
+        for path, buffer, count in zip(paths, sources, result.class_counts):
+            path = os.path.abspath(path)
+            xref.update_file(connection, path, hashlib.sha256(buffer).hexdigest(), os.stat(path), 0, classes[start:start + count])
+            start += count
+        connection.commit()
+        connection.close()
+    except (xref.sqlite3.OperationalError, OSError) as e:
+        raise SOL25Error(12, f"Cannot update index '{database}': {e}.")
+    except xref.sqlite3.DatabaseError as e:
+        raise SOL25Error(11, f"Cannot read index '{database}': {e}.")
+    except xref.sqlite3.Error as e:
+        raise SOL25Error(12, f"Cannot update index '{database}': {e}.")
+
+
+def diff_analysis(previous_path, root):
+    """
+    @brief Compares an AST with a previous output of the program (`--diff-against`).
+
+    @param previous_path Path of the previous XML output; `.gz` and `.xz` are decompressed.
+    @param root The `program` element of the new AST.
+    @return The `patch` element of `astpatch.diff_documents()`.
+
+    @throws SOL25Error (exit code 11) if the previous output cannot be read.
+    """
+    # @brief Imported here, so the analyzer only needs astpatch.py when --diff-against is used.
+    import astpatch
+
+    try:
+        return astpatch.diff_documents(astpatch.read_document(previous_path), root)
+    except astpatch.PatchError as e:
+        raise SOL25Error(11, f"Cannot compare with '{previous_path}': {e}")
+
+
+def analyze_parallel(source, engine="lark", jobs=2, output_format="xml", library=()):
+    """
+    @brief Analyzes one program with its classes spread over worker processes.
+
+    @param source The source code as a string or its UTF-8 encoding as a bytes-like object,
+                  or a list of them for a program split into several files.
+    @param engine One of PARSER_ENGINES.
+    @param jobs Number of worker processes.
+    @param output_format One of OUTPUT_FORMATS.
+    @param library Classes known from interfaces, as returned by `load_interface()`.
+    @return The serialized output, identical to `Analyzer(engine, library=library).analyze(source).serialize(output_format)`.
+
+    @throws SOL25Error for the first error of the program, the same as the serial pipeline reports.
+
+    @details
+    - The decoding and the lexical pre-pass run on every whole source first.
+    - Each source is split at top-level `class` keywords; the class table is read from
+      the class headers and sent to the workers with contiguous batches of classes.
+      A batch never spans two files.
+    - Each worker parses its batch, collects its methods, runs the semantic checks and
+      serializes its classes. The parent then reports errors in the order of the serial
+      pipeline: class table, method collection, checks in source order, `Main`.
+    - A batch sending `read` before its first class literal is checked again once the
+      `last_CID` of the preceding batches is known.
+    - If a batch does not parse, or parses into other classes than the split expected,
+      the whole program goes through the serial pipeline, which reports the exact error.
+    """
+    sources = source if isinstance(source, (list, tuple)) else [source]
+    buffers = [source.encode("utf-8") if isinstance(source, str) else source for source in sources]
+    classes = []
+    for index, buffer in enumerate(buffers):
+        try:
+            code = decode_source(buffer)
+            collections.deque(iter_tokens(buffer), maxlen=0)
+        except SOL25Error:
+            # @brief A syntax error in an earlier file would be reported first.
+            if index == 0:
+                raise
+            return analyze_serial(buffers, engine, output_format, library)
+        file_classes = split_classes(code)
+        if not file_classes:
+            return analyze_serial(buffers, engine, output_format, library)
+        classes.extend((text, name, parent, index) for text, name, parent in file_classes)
+
+    if len(classes) < 2 or jobs < 2:
+        return analyze_serial(buffers, engine, output_format, library)
+
+    class_names = {name for name, _, _ in library}
+    class_parents = {name: parent for name, parent, _ in library}
+    for _, name, parent, _ in classes:
+        class_names.add(name)
+        class_parents[name] = parent
+
+    batch_count = min(len(classes), jobs * BATCHES_PER_JOB)
+    bounds = [len(classes) * index // batch_count for index in range(batch_count + 1)]
+    batches = []
+    for index in range(batch_count):
+        for _, batch in itertools.groupby(classes[bounds[index]:bounds[index + 1]], key=lambda entry: entry[3]):
+            batches.append(list(batch))
+    texts = ["".join(entry[0] for entry in batch) for batch in batches]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(process_classes, text, class_names, class_parents, engine, output_format) for text in texts]
+        results = [future.result() for future in futures]
+
+    for batch, result in zip(batches, results):
+        if result is None or result["headers"] != [(name, parent) for _, name, parent, _ in batch]:
+            return analyze_serial(buffers, engine, output_format, library)
+
+    semantic_check = SOL25Semantic(library=library)
+    semantic_check.collect_classes(Tree("program", [
+        Tree("class_def", [Token("CID", name), Token("CID", parent)]) for _, name, parent, _ in classes
+    ]))
+    for result in results:
+        if result["method_error"] is not None:
+            raise SOL25Error(*result["method_error"])
+
+    last_cid = None
+    for index, result in enumerate(results):
+        if result["needs_state"]:
+            result = results[index] = process_classes(texts[index], class_names, class_parents, engine, output_format, last_cid)
+        if result["error"] is not None:
+            raise SOL25Error(*result["error"])
+        if result["last_cid"] != UNKNOWN_CID:
+            last_cid = result["last_cid"]
+        semantic_check.found_main |= result["found_main"]
+        semantic_check.has_run_method |= result["has_run_method"]
+    semantic_check.check_final()
+
+    root = ET.Element("program", language="SOL25")
+    comment_text = next((result["comment"] for result in results if result["comment"] is not None), None)
+    if comment_text:
+        root.set("description", comment_text)
+    return assemble_output(root, [fragment for result in results for fragment in result["fragments"]], output_format)
+
+
+def analyze_serial(buffers, engine, output_format, library=()):
+    """
+    @brief Fallback of `analyze_parallel()`: the whole program in this process.
+
+    @param buffers The UTF-8 encoded source files.
+    @param engine One of PARSER_ENGINES.
+    @param output_format One of OUTPUT_FORMATS.
+    @param library Classes known from interfaces.
+    @return The serialized output.
+
+    @throws SOL25Error for the first error of the program.
+    """
+    result = Analyzer(engine, library=library).analyze(buffers)
+    if result.error is not None:
+        raise result.error
+    return result.serialize(output_format)
+
+
+def main():
+    """
+    @brief Entry point of the script, responsible for parsing arguments, reading input, 
+           performing lexical analysis, parsing, semantic analysis, and XML transformation.
+
+    @details
+    - Uses `argparse` to handle command-line arguments.
+    - Supports `--help` and `-h` for displaying usage information.
+    - Reads input from a file (if provided) or from standard input.
+    - Prints the resulting XML to standard output.
+   
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--help", action="store_true", help="Show help message and exit")
+    parser.add_argument("-h", action="store_true", help="Show help message and exit")
+    parser.add_argument("--source", type=str, action="append", help="Path to input file, repeatable for a program split into several files (default: stdin)")
+    parser.add_argument("--interface", type=str, action="append", default=[], help="Load the classes of a library interface instead of its sources; repeatable")
+    parser.add_argument("--emit-interface", type=str, help="Check the sources as a class library and write its interface to a file")
+    parser.add_argument("--positions", action="store_true", help="Record source line/column spans in the XML and error messages")
+    parser.add_argument("--all-errors", action="store_true", help="Report every error instead of stopping at the first one")
+    parser.add_argument("--format", default="xml", help="Output format: " + ", ".join(OUTPUT_FORMATS) + " (default: xml)")
+    parser.add_argument("--engine", default="lark", help="Parser engine: " + ", ".join(PARSER_ENGINES) + " (default: lark)")
+    parser.add_argument("--output", type=str, help="Write the output to a file instead of stdout; .gz and .xz compress it")
+    parser.add_argument("--index", type=str, help="Record the analyzed classes in the cross-reference database of xref.py")
+    parser.add_argument("--jobs", default="1", help="Number of worker processes sharing the classes of the program (default: 1)")
+    parser.add_argument("--class", dest="classes", action="append", default=[], help="Check and emit only this class; repeatable")
+    parser.add_argument("--reachable-from", action="append", default=[], help="Check and emit only the classes this class reaches through superclasses and class literals; repeatable")
+    parser.add_argument("--max-bytes", help="Reject sources larger than this many bytes (exit code 13)")
+    parser.add_argument("--max-tokens", help="Reject sources with more tokens than this (exit code 13)")
+    parser.add_argument("--max-depth", help="Reject parentheses and blocks nested deeper than this (exit code 13)")
+    parser.add_argument("--max-classes", help="Reject programs with more classes than this (exit code 13)")
+    parser.add_argument("--time-limit", help="Stop an analysis running longer than this many seconds (exit code 13)")
+    parser.add_argument("--memo", type=str, help="Reuse the checks and XML of methods identical to those in this SQLite memo file, and add the new ones")
+    parser.add_argument("--duplicates", action="store_true", help="Print duplicate-code statistics of the program to stderr")
+    parser.add_argument("--diff-against", type=str, help="Print only the changes of the classes and methods since this previous XML output, as a patch for astpatch.py")
+    parser.add_argument("--metrics", type=str, help="Write code metrics of the checked classes and methods to this file: binary columns, or a summary table for a .csv path")
+
+    args, unknown_args = parser.parse_known_args()
+    
+    
+    if unknown_args:
+        sys.stderr.write(f"Error: Unknown parameter(s): {' '.join(unknown_args)}\n")
+        sys.exit(10) 
+        
+    
+    if args.format not in OUTPUT_FORMATS:
+        sys.stderr.write(f"Error: Unknown output format '{args.format}'.\n")
+        sys.exit(10)
+
+    if args.engine not in PARSER_ENGINES:
+        sys.stderr.write(f"Error: Unknown parser engine '{args.engine}'.\n")
+        sys.exit(10)
+
+    if args.engine == "rd" and (args.positions or args.all_errors):
+        sys.stderr.write("Error: --engine=rd cannot be combined with --positions or --all-errors\n")
+        sys.exit(10)
+
+    if not args.jobs.isdigit() or int(args.jobs) < 1:
+        sys.stderr.write(f"Error: Invalid number of jobs '{args.jobs}'.\n")
+        sys.exit(10)
+
+    if int(args.jobs) > 1 and (args.positions or args.all_errors):
+        sys.stderr.write("Error: --jobs cannot be combined with --positions or --all-errors\n")
+        sys.exit(10)
+
+    if args.emit_interface is not None and (args.output is not None or int(args.jobs) > 1):
+        sys.stderr.write("Error: --emit-interface cannot be combined with --output or --jobs\n")
+        sys.exit(10)
+
+    if args.index is not None and (args.source is None or int(args.jobs) > 1):
+        sys.stderr.write("Error: --index requires --source and cannot be combined with --jobs\n")
+        sys.exit(10)
+
+    if (args.classes or args.reachable_from) and (int(args.jobs) > 1 or args.index is not None or args.emit_interface is not None):
+        sys.stderr.write("Error: --class and --reachable-from cannot be combined with --jobs, --index or --emit-interface\n")
+        sys.exit(10)
+
+    if (args.memo is not None or args.duplicates) and int(args.jobs) > 1:
+        sys.stderr.write("Error: --memo and --duplicates cannot be combined with --jobs\n")
+        sys.exit(10)
+
+    if args.metrics is not None and int(args.jobs) > 1:
+        sys.stderr.write("Error: --metrics cannot be combined with --jobs\n")
+        sys.exit(10)
+
+    if args.diff_against is not None and (args.format not in ("xml", "xml-compact") or int(args.jobs) > 1 or args.emit_interface is not None):
+        sys.stderr.write("Error: --diff-against requires --format xml or xml-compact and cannot be combined with --jobs or --emit-interface\n")
+        sys.exit(10)
+
+    limit_values = {}
+    for option in ("max_bytes", "max_tokens", "max_depth", "max_classes", "time_limit"):
+        value = getattr(args, option)
+        if value is None:
+            continue
+        try:
+            limit_values[option] = float(value) if option == "time_limit" else int(value)
+        except ValueError:
+            limit_values[option] = 0
+        if not 0 < limit_values[option] < float("inf"):
+            sys.stderr.write(f"Error: Invalid value '{value}' for --{option.replace('_', '-')}.\n")
+            sys.exit(10)
+
+    if limit_values and int(args.jobs) > 1:
+        sys.stderr.write("Error: --jobs cannot be combined with resource limits\n")
+        sys.exit(10)
+
+    help_count = sys.argv.count("--help") + sys.argv.count("-h")
+
+    if help_count > 1:
+        sys.stderr.write("Error: --help cannot be combined with itself or -h\n")
+        sys.exit(10)
+
+    if args.help or args.h:
+        if args.source or args.positions or args.all_errors or args.format != "xml" or args.engine != "lark" or args.jobs != "1" or args.output is not None or args.interface or args.emit_interface is not None or args.index is not None or limit_values or args.classes or args.reachable_from or args.memo is not None or args.duplicates or args.diff_against is not None or args.metrics is not None:
+            sys.stderr.write("Error: --help cannot be combined with other parameters\n")
+            sys.exit(10)
+        print_help()
+        sys.exit(0)
+
+        
+    limits = Limits(**limit_values) if limit_values else None
+    paths = args.source or [None]
+    try:
+        sources = [read_source(path, limits and limits.max_bytes) for path in paths]
+        library = [entry for path in args.interface for entry in load_interface(path)]
+        memo = Memo(args.memo) if args.memo is not None or args.duplicates else None
+        metrics = Metrics() if args.metrics is not None else None
+    except SOL25Error as e:
+        e.report()
+    source = sources if len(sources) > 1 else sources[0]
+    if int(args.jobs) > 1:
+        try:
+            output = analyze_parallel(source, args.engine, int(args.jobs), args.format, library)
+        except SOL25Error as e:
+            e.report()
+    else:
+        result = Analyzer(args.engine, args.positions, args.all_errors, library, args.emit_interface is None, limits,
+                          args.classes, args.reachable_from, memo, metrics).analyze(source)
+        if memo is not None:
+            try:
+                memo.save()
+            except SOL25Error as e:
+                e.report()
+        if args.duplicates and result.duplicates is not None:
+            sys.stderr.write(format_duplicates(result.duplicates) + "\n")
+        if result.error is not None:
+            result.error.report()
+        if result.diagnostics is not None and result.diagnostics.errors:
+            result.diagnostics.report()
+        if metrics is not None:
+            try:
+                write_metrics(metrics, args.metrics)
+            except SOL25Error as e:
+                e.report()
+        if args.index is not None:
+            try:
+                index_analysis(args.index, paths, sources, result)
+            except SOL25Error as e:
+                e.report()
+        if args.emit_interface is not None:
+            interface = build_interface(result.tree, [(path, buffer) for path, buffer in zip(paths, sources) if path is not None], args.emit_interface)
+            try:
+                with output_sink(args.emit_interface) as stream:
+                    stream.write(json.dumps(interface, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            except SOL25Error as e:
+                e.report()
+            sys.exit(0)
+        output = result.ast
+        if args.diff_against is not None:
+            try:
+                output = diff_analysis(args.diff_against, output)
+            except SOL25Error as e:
+                e.report()
+        if args.output is None:
+            output = format_output(output, args.format)
+
+    if args.output is not None:
+        try:
+            with output_sink(args.output) as stream:
+                write_output(output, args.format, stream)
+        except SOL25Error as e:
+            e.report()
+    elif isinstance(output, bytes):
+        sys.stdout.buffer.write(output)
+    else:
+        print(output)
     sys.exit(0)
       
 if __name__ == "__main__":
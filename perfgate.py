@@ -0,0 +1,391 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Performance regression gate: times every phase of the parse.py pipeline on fixed, seeded
+# workloads and compares the best times and peak memory with a committed baseline.
+import sys
+import os
+import re
+import gc
+import json
+import time
+import random
+import hashlib
+import argparse
+import platform
+import statistics
+import collections
+import tracemalloc
+
+import parse
+from differential import ProgramGenerator
+
+
+# @brief Format name and version of the baseline file.
+BASELINE_FORMAT = "sol25-perf-baseline"
+BASELINE_VERSION = 2
+
+# @brief Baseline committed next to this script.
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baseline.json")
+
+# @brief Workloads: seed of the program generator, number of generated programs, and whether
+# they are joined into one large program (with renamed classes) instead of analyzed one by one.
+WORKLOADS = {
+    "small": (1, 100, False),
+    "large": (2, 100, True),
+}
+
+# @brief Class names of generated programs, renamed when programs are joined.
+CLASS_NAME_REGEX = re.compile(r"\b(Main|C\d+)\b")
+
+# @brief Phases of the pipeline of `parse.main()`, each run on the products of the previous ones.
+# `pipeline` is the whole analysis and the default XML output, as the command line runs them.
+PHASES = {
+    "lex": lambda program: collections.deque(parse.iter_tokens(program["buffer"]), maxlen=0),
+    "parse": lambda program: parse.parse_code(program["code"], comments=[]),
+    "rd": lambda program: parse.SOL25RecursiveDescent(program["code"]).parse(),
+    "semantic": lambda program: parse.check_semantics(program["tree"]),
+    "transform": lambda program: parse.SOL25Transformer(program["comments"]).transform(program["tree"]),
+    "serialize": lambda program: parse.format_output(program["root"], "xml"),
+    "pipeline": lambda program: parse.format_output(parse.Analyzer().analyze(program["buffer"]).ast, "xml"),
+}
+
+# @brief Default regression thresholds: relative slack of the best time of a phase against the
+# others, of the speed of all phases against the calibration loop, and relative and absolute slack
+# of the peak memory. On a noisy single-CPU machine, clean runs stay within +30 % and +27 %.
+TIME_TOLERANCE = 0.4
+DRIFT_TOLERANCE = 0.4
+MEMORY_TOLERANCE = 0.05
+MEMORY_SLACK = 64 * 1024
+
+# @brief Fewest phases whose common drift stands for the speed of the machine; with fewer, the
+# calibration loop is used instead.
+MIN_DRIFT_PHASES = 5
+
+
+def build_workload(seed, programs, joined):
+    """
+    @brief Generates the sources of a workload.
+
+    @param seed Seed of the program generator.
+    @param programs Number of generated programs.
+    @param joined True to join the programs into one.
+    @return A list of source codes.
+
+    @details
+    In a joined program, the classes of every program after the first get the index of
+    their program appended to their names, so only the first `Main` remains.
+    """
+    generator = ProgramGenerator(random.Random(seed))
+    sources = [generator.render(generator.program()) for _ in range(programs)]
+    if not joined:
+        return sources
+    parts = [sources[0]]
+    for index, source in enumerate(sources[1:], 1):
+        body = source.split("\n", 1)[1]
+        parts.append(CLASS_NAME_REGEX.sub(lambda match: f"{match.group(1)}_{index}", body))
+    return ["".join(parts)]
+
+
+def prepare(sources):
+    """
+    @brief Runs the pipeline once, keeping the input of every phase.
+
+    @param sources The source codes of a workload.
+    @return A list of dictionaries with the `buffer`, `code`, parse `tree`, `comments` and XML `root` of each program.
+
+    @throws ValueError if a program does not pass the analysis.
+    """
+    programs = []
+    for source in sources:
+        comments = []
+        tree = parse.parse_code(source, comments=comments)
+        try:
+            parse.check_semantics(tree)
+        except parse.SOL25Error as e:
+            raise ValueError(f"Workload program fails with exit code {e.exit_code}: {e.message}")
+        transformer = parse.SOL25Transformer(comments)
+        transformer.transform(tree)
+        programs.append({"buffer": source.encode("utf-8"), "code": source, "tree": tree, "comments": comments,
+                         "root": transformer.root})
+    return programs
+
+
+def calibrate():
+    """
+    @brief Times a fixed loop of plain Python, whose best time is the speed unit of a gate run.
+
+    @return The duration in seconds.
+    """
+    start = time.perf_counter()
+    counts = collections.Counter()
+    for index in range(50000):
+        counts[index % 97] += len(str(index))
+    return time.perf_counter() - start
+
+
+def run_phase(function, programs):
+    """
+    @brief Runs a phase on every program of a workload.
+
+    @param function The phase from PHASES.
+    @param programs The prepared programs.
+    """
+    for program in programs:
+        function(program)
+
+
+def peak_memory(function, programs):
+    """
+    @brief Measures the peak of the memory a phase allocates from Python.
+
+    @param function The phase from PHASES.
+    @param programs The prepared programs.
+    @return The peak in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run_phase(function, programs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_gate(keys, repeat, baseline=None, log=sys.stderr):
+    """
+    @brief Measures phases on workloads.
+
+    @param keys List of (workload, phase) pairs of names of WORKLOADS and PHASES.
+    @param repeat Number of timed runs of each phase.
+    @param baseline Optional baseline dictionary the workloads must match.
+    @param log Stream receiving a progress line per round.
+    @return A baseline dictionary with the SHA-256 of the sources of each workload, the
+            best `unit` time of `calibrate()`, and for every `workload/phase` the `best` and the
+            `median` of its times in seconds and its `peak` memory in bytes.
+
+    @details
+    - Every phase first runs once untimed, to fill the caches.
+    - The timed runs go in rounds, each running every phase once. A burst of load from
+      other processes then slows down one run of each phase instead of all runs of one phase.
+    - Load from other processes only adds time, so the best time of a phase is the least
+      noisy measure of its own cost; the median is kept for the report.
+    - `calibrate()` runs before every timed run; its best time measures the speed of the
+      machine during the gate.
+    - The memory is traced in an extra run at the end, because tracing slows down the allocations.
+
+    @throws parse.SOL25Error (exit code 11) if the baseline was measured on other workloads.
+    """
+    fingerprints = {}
+    prepared = {}
+    for workload in dict.fromkeys(workload for workload, _ in keys):
+        sources = build_workload(*WORKLOADS[workload])
+        fingerprints[workload] = hashlib.sha256("\0".join(sources).encode("utf-8")).hexdigest()
+        if baseline is not None and baseline["workloads"].get(workload) != fingerprints[workload]:
+            raise parse.SOL25Error(11, f"The baseline was measured on another '{workload}' workload; refresh it with --update.")
+        prepared[workload] = prepare(sources)
+    for workload, phase in keys:
+        run_phase(PHASES[phase], prepared[workload])
+
+    times = {key: [] for key in keys}
+    units = []
+    for round_number in range(1, repeat + 1):
+        log.write(f"round {round_number} of {repeat}...\n")
+        for workload, phase in keys:
+            gc.collect()
+            units.append(calibrate())
+            start = time.perf_counter()
+            run_phase(PHASES[phase], prepared[workload])
+            times[workload, phase].append(time.perf_counter() - start)
+
+    measured = {}
+    for workload, phase in keys:
+        measured[f"{workload}/{phase}"] = {"best": min(times[workload, phase]), "median": statistics.median(times[workload, phase]),
+                                           "peak": peak_memory(PHASES[phase], prepared[workload])}
+    return {
+        "format": BASELINE_FORMAT,
+        "version": BASELINE_VERSION,
+        "workloads": fingerprints,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "unit": min(units),
+        "phases": measured,
+    }
+
+
+def load_baseline(path):
+    """
+    @brief Reads a baseline file.
+
+    @param path Path to the JSON file.
+    @return The baseline dictionary.
+
+    @throws parse.SOL25Error (exit code 11) if the file cannot be read or has another format.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        raise parse.SOL25Error(11, f"Baseline '{path}' does not exist; create it with --update.")
+    except (OSError, ValueError) as e:
+        raise parse.SOL25Error(11, f"Cannot read baseline '{path}': {e}.")
+    if not isinstance(baseline, dict) or baseline.get("format") != BASELINE_FORMAT or baseline.get("version") != BASELINE_VERSION:
+        raise parse.SOL25Error(11, f"'{path}' is not a version {BASELINE_VERSION} performance baseline.")
+    return baseline
+
+
+def compare(baseline, current, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE, missing=()):
+    """
+    @brief Compares measurements with a baseline.
+
+    @param baseline The baseline dictionary.
+    @param current The dictionary of `run_gate()`.
+    @param time_tolerance Relative slack of the best time of a phase.
+    @param memory_tolerance Relative slack of the peak memory.
+    @param missing Keys of the baseline that should have been measured but were not.
+    @return A tuple of the report lines and the list of regressed `workload/phase` keys.
+
+    @details
+    - The drift is the median ratio of the best times of all phases to the baseline: how
+      much faster or slower the machine runs the pipeline now. A phase regresses in time if
+      its ratio exceeds the drift by more than `time_tolerance`, so a slower machine does not
+      change the verdicts, but a phase that got slower than the others does.
+    - A slowdown of every phase by the same factor does not change their ratios; it is
+      reported as `all` if the drift exceeds the ratio of the `calibrate()` units by more than
+      DRIFT_TOLERANCE.
+    - With fewer than MIN_DRIFT_PHASES phases, the ratio of the units is the drift.
+    - A phase regresses in memory if its peak exceeds the baseline by `memory_tolerance` and MEMORY_SLACK.
+    - Phases missing from the baseline are reported as new and do not fail; `missing` phases fail.
+    """
+    speed = current["unit"] / baseline["unit"]
+    common = [key for key in current["phases"] if key in baseline["phases"]]
+    ratios = {key: current["phases"][key]["best"] / baseline["phases"][key]["best"] for key in common}
+    drift = statistics.median(ratios.values()) if len(common) >= MIN_DRIFT_PHASES else speed
+    lines = [
+        f"baseline: Python {baseline['python']} on {baseline['machine']}, {baseline['repeat']} runs, unit {baseline['unit'] * 1000:.1f} ms",
+        f"current:  Python {current['python']} on {current['machine']}, {current['repeat']} runs, unit {current['unit'] * 1000:.1f} ms",
+        f"drift:    phases run at {drift:.2f}x, calibration loop at {speed:.2f}x the baseline times"
+        + ("" if len(common) >= MIN_DRIFT_PHASES else " (too few phases, drift of the calibration loop)"),
+        "",
+    ]
+    rows = [["phase", "baseline", "current", "median", "change", "peak", "peak now", "verdict"]]
+    regressed = []
+    if drift > speed * (1 + DRIFT_TOLERANCE):
+        rows.append(["all", "-", "-", "-", f"{100 * (drift / speed - 1):+.1f} %", "-", "-", "SLOWER"])
+        regressed.append("all")
+    for key, measured in current["phases"].items():
+        reference = baseline["phases"].get(key)
+        if reference is None:
+            rows.append([key, "-", f"{measured['best'] * 1000:.1f} ms", f"{measured['median'] * 1000:.1f} ms", "-", "-",
+                         format_bytes(measured["peak"]), "new"])
+            continue
+        expected = reference["best"] * drift
+        verdicts = []
+        if measured["best"] > expected * (1 + time_tolerance):
+            verdicts.append("SLOWER")
+        if measured["peak"] > reference["peak"] * (1 + memory_tolerance) + MEMORY_SLACK:
+            verdicts.append("MEMORY")
+        if verdicts:
+            regressed.append(key)
+        rows.append([key, f"{expected * 1000:.1f} ms", f"{measured['best'] * 1000:.1f} ms", f"{measured['median'] * 1000:.1f} ms",
+                     f"{100 * (measured['best'] / expected - 1):+.1f} %", format_bytes(reference["peak"]),
+                     format_bytes(measured["peak"]), " ".join(verdicts) or "ok"])
+    for key in missing:
+        rows.append([key, f"{baseline['phases'][key]['best'] * drift * 1000:.1f} ms", "-", "-", "-",
+                     format_bytes(baseline["phases"][key]["peak"]), "-", "MISSING"])
+        regressed.append(key)
+    widths = [max(len(row[index]) for row in rows) for index in range(len(rows[0]))]
+    lines += [" ".join(value.ljust(width) if index == 0 else value.rjust(width)
+                       for index, (value, width) in enumerate(zip(row, widths))) for row in rows]
+    lines.append(f"(baseline: best time scaled by the drift; limit {100 * time_tolerance:+.0f} %)")
+    return lines, regressed
+
+
+def format_bytes(size):
+    """
+    @brief Formats a memory size in KiB or MiB.
+
+    @param size The size in bytes.
+    @return The formatted size.
+    """
+    return f"{size / 1024:.0f} KiB" if size < 1 << 20 else f"{size / (1 << 20):.1f} MiB"
+
+
+def selected(key, workloads, phases):
+    """
+    @brief Tells whether a phase of the baseline belongs to the selection of a gate run.
+
+    @param key The `workload/phase` key.
+    @param workloads The `--workload` names, or None for all.
+    @param phases The `--phase` names, or None for all.
+    @return True unless the key names a known workload or phase that was not selected.
+    """
+    workload, _, phase = key.partition("/")
+    return (not workloads or workload not in WORKLOADS or workload in workloads) and \
+        (not phases or phase not in PHASES or phase in phases)
+
+
+def main():
+    """
+    @brief Entry point: measures the phases and checks them against the baseline, or refreshes it.
+
+    @details
+    - Prints a report with a line per `workload/phase` and exits with 1 if any regressed.
+    - `--update` writes the measurements over the baseline instead; it measures every
+      workload and phase, so a refreshed baseline is complete.
+    - If anything regresses, every selected phase is measured again, so the drift is known,
+      and only what regresses in both measurements fails; a single slow period of the
+      machine does not fail the gate.
+    - Phases of the baseline that were selected but are no longer measured fail as missing.
+    - The baseline records a hash of the generated workloads; when the generator changes,
+      the baseline has to be refreshed.
+    """
+    parser = argparse.ArgumentParser(description="Performance regression gate of the SOL25 pipeline.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file (default: perf_baseline.json next to this script)")
+    parser.add_argument("--update", action="store_true", help="Measure everything and write the results as the new baseline")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs of each phase, at least 3 (default: 5)")
+    parser.add_argument("--workload", action="append", choices=list(WORKLOADS), help="Workload to run, repeatable (default: all)")
+    parser.add_argument("--phase", action="append", choices=list(PHASES), help="Phase to run, repeatable (default: all)")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE,
+                        help=f"Allowed relative slowdown of a phase against the others (default: {TIME_TOLERANCE})")
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE,
+                        help=f"Allowed relative growth of the peak memory (default: {MEMORY_TOLERANCE})")
+    args = parser.parse_args()
+
+    if args.repeat < 3:
+        sys.stderr.write("Error: --repeat must be at least 3.\n")
+        sys.exit(10)
+    if args.time_tolerance < 0 or args.memory_tolerance < 0:
+        sys.stderr.write("Error: --time-tolerance and --memory-tolerance cannot be negative.\n")
+        sys.exit(10)
+    if args.update and (args.workload or args.phase):
+        sys.stderr.write("Error: --update measures every workload and phase; it cannot be combined with --workload or --phase\n")
+        sys.exit(10)
+
+    keys = [(workload, phase) for workload in args.workload or WORKLOADS for phase in args.phase or PHASES]
+    try:
+        baseline = None if args.update else load_baseline(args.baseline)
+        current = run_gate(keys, args.repeat, baseline)
+        if args.update:
+            with parse.output_sink(args.baseline) as stream:
+                stream.write((json.dumps(current, indent=2) + "\n").encode("utf-8"))
+            print(f"Baseline '{args.baseline}' updated with {len(current['phases'])} phases.")
+            sys.exit(0)
+        missing = [key for key in baseline["phases"] if key not in current["phases"] and selected(key, args.workload, args.phase)]
+        lines, regressed = compare(baseline, current, args.time_tolerance, args.memory_tolerance, missing)
+        print("\n".join(lines))
+        if any(key not in missing for key in regressed):
+            print(f"\n{len(regressed)} regression(s); measuring again to confirm them...", flush=True)
+            lines, confirmed = compare(baseline, run_gate(keys, args.repeat, baseline), args.time_tolerance, args.memory_tolerance, missing)
+            print("\n".join(lines[1:]))
+            regressed = [key for key in regressed if key in confirmed]
+    except parse.SOL25Error as e:
+        e.report()
+
+    if regressed:
+        print(f"\n{len(regressed)} phase(s) failed: {', '.join(regressed)}")
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Lexer configurations: times the Lark parse of identifier-heavy programs with the stock
+# contextual lexer and with the whitespace-skipping one of parse.py, interleaved, after checking
+# that both produce the same tree.
+import os
+import sys
+import gc
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lark import Lark
+
+import parse
+from perfgate import build_workload
+
+# @brief Lexer configurations by name: the options added to the Lark parser of the grammar.
+CONFIGURATIONS = {
+    "contextual": {},
+    "whitespace-skipping": {"_plugins": parse.LEXER_PLUGINS},
+}
+
+
+def identifier_program(classes, seed):
+    """
+    @brief Generates an indented program made almost only of identifiers and keyword messages.
+
+    @param classes Number of classes.
+    @param seed Seed of the name choices.
+    @return The source code.
+    """
+    rng = random.Random(seed)
+    names = [f"{prefix}{suffix}" for prefix in ("value", "item", "count", "total", "next") for suffix in ("", "A", "_b", "9")]
+    lines = ["class Main : Object {", "    run [ |", "        x := self.", "    ]", "}"]
+    for index in range(classes):
+        lines.append(f"class Node{index} : Object {{")
+        for method in range(4):
+            lines.append(f"    {rng.choice(names)}{method}:with: [ :first :second |")
+            for _ in range(6):
+                arguments = " ".join(f"{rng.choice(names)}: {rng.choice(names)}" for _ in range(rng.randint(1, 3)))
+                lines.append(f"        {rng.choice(names)} := {rng.choice(names)} {arguments}.")
+            lines.append("    ]")
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """
+    @brief Parses the arguments, builds the workloads and prints the parse times per configuration.
+    """
+    parser = argparse.ArgumentParser(description="Parse times of the SOL25 grammar with different Lark lexers.")
+    parser.add_argument("--classes", type=int, default=300, help="classes of the identifier-heavy program")
+    parser.add_argument("--programs", type=int, default=200,
+                        help="generated programs joined into the second workload")
+    parser.add_argument("--repeat", type=int, default=25, help="interleaved runs of every configuration")
+    args = parser.parse_args()
+
+    workloads = {
+        "identifiers": identifier_program(args.classes, 1),
+        "generated": build_workload(1, args.programs, True)[0],
+    }
+    parsers = {name: Lark(parse.GRAMMAR, start="program", parser="lalr", lexer="contextual",
+                          lexer_callbacks=parse.LEXER_CALLBACKS, **options) for name, options in CONFIGURATIONS.items()}
+    print(f"Python {sys.version.split()[0]}, CPU time of Lark.parse(), {args.repeat} interleaved runs")
+    for workload, code in workloads.items():
+        trees = {name: lark_parser.parse(code) for name, lark_parser in parsers.items()}
+        if len({repr(tree) for tree in trees.values()}) != 1:
+            raise SystemExit(f"The lexers split the {workload} workload differently")
+        times = {name: [] for name in parsers}
+        for _ in range(args.repeat):
+            for name, lark_parser in parsers.items():
+                # @brief The collector is paused, so its runs over the growing tree do not blur the lexer.
+                gc.collect()
+                gc.disable()
+                start = time.process_time()
+                lark_parser.parse(code)
+                times[name].append(time.process_time() - start)
+                gc.enable()
+        print(f"{workload}: {len(code)} bytes")
+        for name, values in times.items():
+            values.sort()
+            print(f"  {name:<22} min {values[0]:.3f} s  median {values[len(values) // 2]:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Throughput scaling: analyses per second of one `Analyzer` shared by thread pools of
+# growing size, and the time of `--jobs N` on one large program. Results are checked against
+# the serial run, so a scaling number never comes from a wrong answer.
+import os
+import sys
+import time
+import random
+import argparse
+import concurrent.futures
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parse
+from perfgate import build_workload
+from differential import ProgramGenerator, TARGET_CODES
+
+
+def best_time(function, repeat):
+    """
+    @brief Runs a function several times.
+
+    @param function The function, called without arguments.
+    @param repeat Number of runs.
+    @return A tuple of the best time in seconds and the result of the last run.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_threads(cases, engines, workers, repeat):
+    """
+    @brief Prints the throughput of a shared analyzer for every thread pool size.
+
+    @param cases Source codes to analyze.
+    @param engines Engines to measure.
+    @param workers Thread pool sizes.
+    @param repeat Number of runs of every measurement.
+    """
+    print(f"threads: analyses/s over {len(cases)} generated programs")
+    print(f"  {'engine':<10}{'serial':>8}" + "".join(f"{f'{count}t':>8}" for count in workers))
+    for engine in engines:
+        analyzer = parse.Analyzer(engine)
+
+        def outcome(source):
+            result = analyzer.analyze(source)
+            return result.exit_code, tuple(result.errors), result.xml if result.ast is not None else None
+
+        def threaded(count):
+            with concurrent.futures.ThreadPoolExecutor(count) as pool:
+                return list(pool.map(outcome, cases))
+
+        elapsed, serial = best_time(lambda: [outcome(source) for source in cases], repeat)
+        line = f"  {engine:<10}{len(cases) / elapsed:>8.0f}"
+        for count in workers:
+            elapsed, results = best_time(lambda: threaded(count), repeat)
+            if results != serial:
+                raise SystemExit(f"{engine} with {count} threads differs from the serial run")
+            line += f"{len(cases) / elapsed:>8.0f}"
+        print(line)
+
+
+def bench_jobs(source, engines, jobs, repeat):
+    """
+    @brief Prints the time of `analyze_parallel()` for every number of worker processes.
+
+    @param source The source code of one large program.
+    @param engines Engines to measure.
+    @param jobs Numbers of worker processes; 1 is the serial pipeline.
+    @param repeat Number of runs of every measurement.
+    """
+    print(f"jobs: seconds for one program with {source.count('class ')} classes (XML output)")
+    print(f"  {'engine':<10}" + "".join(f"{f'jobs={count}':>10}" for count in jobs))
+    for engine in engines:
+        line = f"  {engine:<10}"
+        expected = None
+        for count in jobs:
+            elapsed, output = best_time(lambda: parse.analyze_parallel(source, engine, count, "xml"), repeat)
+            if expected is None:
+                expected = output
+            elif output != expected:
+                raise SystemExit(f"{engine} with --jobs {count} differs from --jobs {jobs[0]}")
+            line += f"{elapsed:>10.2f}"
+        print(line)
+
+
+def main():
+    """
+    @brief Parses the arguments and runs both benchmarks.
+    """
+    parser = argparse.ArgumentParser(description="Thread and --jobs scaling of the SOL25 analyzer.")
+    parser.add_argument("--cases", type=int, default=600, help="generated programs of the thread benchmark")
+    parser.add_argument("--programs", type=int, default=1000,
+                        help="generated programs joined into the program of the --jobs benchmark")
+    parser.add_argument("--threads", type=int, nargs="+", default=[2, 4, 8, 16], help="thread pool sizes")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4], help="numbers of worker processes")
+    parser.add_argument("--engine", action="append", choices=parse.PARSER_ENGINES,
+                        help="engine to measure (repeatable, default all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of every measurement; the best is printed")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the program generator")
+    args = parser.parse_args()
+
+    engines = args.engine or list(parse.PARSER_ENGINES)
+    print(f"{os.cpu_count()} CPU(s), Python {sys.version.split()[0]}")
+    generator = ProgramGenerator(random.Random(args.seed))
+    cases = [generator.case(TARGET_CODES[index % len(TARGET_CODES)]) for index in range(args.cases)]
+    bench_threads(cases, engines, args.threads, args.repeat)
+    bench_jobs(build_workload(args.seed, args.programs, True)[0], engines, args.jobs, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
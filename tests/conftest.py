@@ -0,0 +1,28 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Shared setup of the tests: the repository root on the import path and the sample corpus.
+import os
+import sys
+import glob
+
+# @brief Repository root, where parse.py and the tools live.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# @brief Sample programs: valid ones, generated ones (`g*.sol`) and one per exit code (`e<code>*.sol`).
+CORPUS = sorted(glob.glob(os.path.join(ROOT, "tests", "corpus", "*.sol")))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def read_corpus():
+    """
+    @brief Reads the sample corpus.
+
+    @return A list of (file name, source bytes) pairs, sorted by name.
+    """
+    sources = []
+    for path in CORPUS:
+        with open(path, "rb") as file:
+            sources.append((os.path.basename(path), file.read()))
+    return sources
@@ -0,0 +1,19 @@
+"Sample program with description"
+class Main : Object {
+  run [|
+    x := 42.
+    y := 'hello\n'.
+    z := x plus: 1.
+    w := [:a :b | c := a plus: b. ].
+    v := Foo new.
+    u := (x plus: 2) minus: 3.
+    t := self foo: nil bar: true.
+    s := String read.
+    r := super value.
+  ]
+  foo:bar: [:p :q | k := p. ]
+}
+class Foo : Main {
+  "comment"
+  value [| a := false. ]
+}
@@ -0,0 +1 @@
+class Main : Object { run [| x := 1 # 2. ] }
\ No newline at end of file
@@ -0,0 +1 @@
+class Main : Object { run [| x := 42abc. ] }
\ No newline at end of file
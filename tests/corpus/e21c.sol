@@ -0,0 +1 @@
+"unclosed class Main : Object { run [| ] }
\ No newline at end of file
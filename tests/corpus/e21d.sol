@@ -0,0 +1 @@
+class Main : Object { run [| x := . ] }
\ No newline at end of file
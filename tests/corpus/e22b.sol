@@ -0,0 +1 @@
+class Main : Object { run [| x := 1 ] }
\ No newline at end of file
@@ -0,0 +1 @@
+class Main : Object { run [| x := class. ] }
\ No newline at end of file
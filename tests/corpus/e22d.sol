@@ -0,0 +1 @@
+class Main : Object { run [| self := 1. ] }
\ No newline at end of file
@@ -0,0 +1 @@
+class Main : Object { run [| x := y foo: 1 bar. ] }
\ No newline at end of file
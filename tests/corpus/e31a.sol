@@ -0,0 +1 @@
+class Foo : Object { run [| ] }
\ No newline at end of file
@@ -0,0 +1 @@
+class Main : Object { foo [| ] }
\ No newline at end of file
@@ -0,0 +1 @@
+class Main : Bar { run [| ] }
\ No newline at end of file
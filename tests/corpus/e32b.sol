@@ -0,0 +1 @@
+class Main : Object { run [| x := Bar new. ] }
\ No newline at end of file
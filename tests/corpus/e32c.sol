@@ -0,0 +1 @@
+class Main : Object { run [| x := Integer read. ] }
\ No newline at end of file
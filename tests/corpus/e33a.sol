@@ -0,0 +1 @@
+class Main : Object { run [:a | ] }
\ No newline at end of file
@@ -0,0 +1 @@
+class Main : Object { run [| ] } class Main : Object { }
\ No newline at end of file
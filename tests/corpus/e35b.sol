@@ -0,0 +1 @@
+class Main : Object { run [| ] run [| ] }
\ No newline at end of file
@@ -0,0 +1 @@
+class A : B { } class B : A { } class Main : Object { run [| ] }
\ No newline at end of file
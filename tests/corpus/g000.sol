@@ -0,0 +1,17 @@
+"desc 0 'q'"
+class Main : Object {
+  run [| v := true. res := [:p | ] value: [:z | res := Integer.] and: String. w := ('s\'t\n r') foo: ((String) foo) plus: ((self new) and: ('s\'t\n r') plus: ('s\'t\n r')). ]
+  with:and: [:p :q |  ]
+  value [ | w := String value: foo plus: false and: x. v := [:p :z | res := (String value). y := [:p | v := nil foo.]. v := String.] value: [:z :p | ] foo: true plus: String. ]
+}
+class C1 : Object {
+  bar: [:p |  ]
+}
+class C2 : Main {
+  foo [ |  ]
+}
+class C3 : C1 {
+  foo [ | v := [:q | v := [ | ].]. ]
+  bar: [:p | w := p. w := (false value: (true from) plus: ('s\'t\n r')) and: (false). res := [:q :p | y := ([:q :p | w := true.] with: tmp) foo. v := Integer.]. ]
+  value [ |  ]
+}
@@ -0,0 +1,10 @@
+"desc 1 'q'"
+class Main : Object {
+  run [|  ]
+  foo [ | y := (true value) foo. res := -37 value. v := [ | w := ((true value) and: ('s\'t\n r') plus: Integer with: super) with: String and: (Integer and: ('s\'t\n r') foo: b) foo: [:q | v := tmp. w := true. res := super.]. v := ((nil new) value: nil and: false plus: Integer). w := -48 plus: (String new) with: (Integer) value: (('s\'t\n r') plus: true value: super and: String).]. ]
+  bar: [:p | v := x. y := ([ | w := [ | res := super. w := 's\'t\n r'. v := true.]. res := String. w := self foo: String and: super plus: String.] foo) from. v := true. ]
+}
+class C1 : String {
+  foo [ | y := [ | ] value. w := super. ]
+  bar: [:p | res := ((String)). v := (((String and: nil))). ]
+}
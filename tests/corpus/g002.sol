@@ -0,0 +1,4 @@
+"desc 2 'q'"
+class Main : Object {
+  run [|  ]
+}
@@ -0,0 +1,10 @@
+"desc 3 'q'"
+class Main : Object {
+  run [| res := [:q | w := (-21) value: super foo: true.] value: (self and: x plus: String) with: ([:p :q | ]). ]
+  bar: [:p | v := ('s\'t\n r') value. y := (48 and: [ | res := -15. res := self. y := -17.] with: (Integer plus: true value: true)) with: ((String new) plus: nil value: -5 with: super) plus: [:z | w := (true). v := Integer new.]. ]
+  with:and: [:p :q | w := ([ | ] from). res := q new. ]
+}
+class C1 : Main {
+  bar: [:p |  ]
+  foo [ | res := (false with: (3) plus: (Integer and: 41) foo: (Integer from)) and: ((true and: ('s\'t\n r')) value: x) plus: 18 value: (19 with: Integer plus: self value: false). ]
+}
@@ -0,0 +1,9 @@
+"desc 4 'q'"
+class Main : Object {
+  run [| v := (Integer) from. v := super. ]
+  foo [ | w := (([:q :p | y := super. v := super.]) and: [:z | y := tmp.]) plus: ('s\'t\n r'). v := ((super with: x) value: [:p | ] foo: (('s\'t\n r') from) plus: (super foo: nil with: String)). ]
+}
+class C1 : Object {
+  bar: [:p | w := String. v := (((('s\'t\n r') value: String with: 12))). ]
+  value [ |  ]
+}
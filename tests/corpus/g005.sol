@@ -0,0 +1,12 @@
+"desc 5 'q'"
+class Main : Object {
+  run [| v := ((String) plus: true) with: tmp. v := cnt. ]
+  foo [ |  ]
+}
+class C1 : String {
+  bar: [:p | res := (self). ]
+}
+class C2 : Main {
+  foo [ | w := ([ | v := (val). y := (nil).]) with: ((false value) value: ('s\'t\n r')) plus: ((('s\'t\n r') plus: super value: nil) from). w := ((super) with: (26 with: super) plus: (false) foo: (x)). y := val. ]
+  bar: [:p |  ]
+}
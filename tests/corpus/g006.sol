@@ -0,0 +1,7 @@
+"desc 6 'q'"
+class Main : Object {
+  run [| res := nil. res := Integer value. w := [:z :q | ]. ]
+  with:and: [:p :q | res := (-25). w := [:z :p | w := [:q | ]. v := [:z :p | ].] foo: [:q | y := (a).] and: true. y := cnt. ]
+  foo [ | y := 's\'t\n r'. y := (((x)) value: 12). v := [:z | w := true. y := [:z | y := (nil new). y := tmp from. v := [ | v := [:p :q | y := super. v := false.].].].]. ]
+  bar: [:p | v := (35 and: [:z | ] plus: [:z :p | ] with: false). ]
+}
@@ -0,0 +1,14 @@
+"desc 7 'q'"
+class Main : Object {
+  run [| y := nil value. ]
+  foo [ |  ]
+}
+class C1 : Main {
+  foo [ | v := [:p :q | ] and: ((Integer foo: String and: ('s\'t\n r')) value: String). w := ([:q | res := String. res := [:z | res := [ | ]. y := true. v := String value: super.]. y := super foo.]). res := val. ]
+  value [ |  ]
+  with:and: [:p :q | v := true. y := ([ | res := self new. v := -21. y := Integer plus: val.]) with: ([:z :p | y := p. y := foo. v := String.] new) and: [:z | ]. v := ('s\'t\n r') foo: false and: (false) plus: (Integer value: super). ]
+}
+class C2 : C1 {
+  bar: [:p | res := [:p :z | w := 13. res := (nil). res := self.]. ]
+  value [ | w := (([:p :q | y := true.]) with: (x) foo: (String and: val) plus: [ | ]). v := (true new) new. ]
+}
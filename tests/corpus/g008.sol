@@ -0,0 +1,9 @@
+"desc 8 'q'"
+class Main : Object {
+  run [| y := 's\'t\n r'. w := true. ]
+}
+class C1 : Main {
+  value [ | y := super. ]
+  bar: [:p | y := ('s\'t\n r') with: ((String) value) plus: [ | w := String. y := tmp. w := nil foo.]. w := ((nil)). w := super plus: (a and: tmp foo: String) and: (('s\'t\n r')). ]
+  with:and: [:p :q |  ]
+}
@@ -0,0 +1,15 @@
+"desc 9 'q'"
+class Main : Object {
+  run [| res := nil. y := [:z :p | w := (-30) value. w := [:p :q | ]. res := super.] plus: ((false with: ('s\'t\n r')) plus: String value: -25). ]
+}
+class C1 : String {
+  
+}
+class C2 : C1 {
+  
+}
+class C3 : C1 {
+  bar: [:p | w := [ | w := [:p :q | ] with: self value: nil and: (false value: true with: true and: super).]. res := [ | ] plus: ([:q | w := 's\'t\n r'. y := q.]) with: 38. w := -29. ]
+  value [ |  ]
+  foo [ |  ]
+}
@@ -0,0 +1,5 @@
+"desc 10 'q'"
+class Main : Object {
+  run [| y := [ | y := (45) and: (true) with: false plus: val. y := (foo value: self foo: true) foo. v := ([ | w := String. v := true. res := 's\'t\n r'.]) foo.]. w := ((String)) plus: [ | y := (false). res := (nil).]. res := true. ]
+  value [ | w := ([ | y := Integer from.] value: [:z | y := false.] foo: [ | v := false. w := nil.]) from. y := ([:p :z | v := [:z :q | ] value. res := (b plus: self with: true foo: Integer).]). y := (('s\'t\n r') value). ]
+}
@@ -0,0 +1,17 @@
+"desc 11 'q'"
+class Main : Object {
+  run [| y := [:p :z | w := Integer. v := [:q | v := nil with: false.]. v := (nil) new.]. res := true. v := (true and: (nil foo: true with: self)) with: (cnt new) value: (true). ]
+  foo [ | v := 25. ]
+  bar: [:p | w := ((true foo: -39) value: [:z | w := x. w := foo. w := true.] with: self foo: (Integer new)). ]
+  with:and: [:p :q |  ]
+}
+class C1 : String {
+  value [ |  ]
+}
+class C2 : Integer {
+  bar: [:p |  ]
+}
+class C3 : Object {
+  value [ | v := Integer. ]
+  bar: [:p | v := ([ | res := false value. res := (Integer). res := nil from.] value: 10 and: (('s\'t\n r') with: true foo: false and: String)). ]
+}
@@ -0,0 +1,14 @@
+"desc 12 'q'"
+class Main : Object {
+  run [| res := false. res := [:z | v := nil new.]. ]
+}
+class C1 : String {
+  
+}
+class C2 : C1 {
+  value [ |  ]
+  foo [ |  ]
+}
+class C3 : C2 {
+  foo [ | y := Integer. res := String and: ([:z | v := nil. res := super. w := true.]) with: (true with: Integer value: -41) plus: ((Integer)). y := (((false from))). ]
+}
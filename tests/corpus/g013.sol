@@ -0,0 +1,14 @@
+"desc 13 'q'"
+class Main : Object {
+  run [| w := (([ | v := super. w := true.] and: self value: x with: x) value) from. res := [:p :q | w := nil. y := String. y := [:p :z | w := 33. y := cnt and: self.].] from. ]
+  bar: [:p | w := (super new) value: b. v := ([:z :p | res := [:p :z | v := (Integer). res := self with: Integer.]. w := true new. res := [:p | y := 's\'t\n r'. v := false.] foo.]). y := (5). ]
+}
+class C1 : Object {
+  bar: [:p | res := [:p | w := 12. res := [ | ].]. res := self. ]
+  foo [ | v := (((Integer with: self))). ]
+}
+class C2 : C1 {
+  foo [ |  ]
+  with:and: [:p :q | res := [:p | res := -44. v := [:p | y := 's\'t\n r'. v := (-31 foo: nil plus: val).].]. ]
+  value [ | y := self. y := ((super value: self and: 33) value: (x and: super)) new. y := nil. ]
+}
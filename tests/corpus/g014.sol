@@ -0,0 +1,7 @@
+"desc 14 'q'"
+class Main : Object {
+  run [| res := super foo. ]
+  value [ | res := (x). ]
+  foo [ | w := String. res := true. ]
+  bar: [:p | y := [:z :q | v := (false) from.] with: [ | ]. v := true. v := [:q | y := ((false)).] foo. ]
+}
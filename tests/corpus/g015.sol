@@ -0,0 +1,7 @@
+"desc 15 'q'"
+class Main : Object {
+  run [|  ]
+}
+class C1 : String {
+  foo [ |  ]
+}
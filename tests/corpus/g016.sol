@@ -0,0 +1,14 @@
+"desc 16 'q'"
+class Main : Object {
+  run [| y := -21. y := nil plus: ((a plus: false with: self foo: true) value) and: ((String)) value: Integer. res := super. ]
+  value [ |  ]
+  bar: [:p | y := ('s\'t\n r') foo. ]
+}
+class C1 : Object {
+  foo [ | res := String. res := ((self with: ('s\'t\n r') and: tmp foo: self) new). v := 's\'t\n r'. ]
+  value [ | res := (false). ]
+  with:and: [:p :q | v := q. res := ('s\'t\n r') foo: (foo) with: ((self) value: String and: false) value: String. ]
+}
+class C2 : Main {
+  value [ |  ]
+}
@@ -0,0 +1,19 @@
+"desc 17 'q'"
+class Main : Object {
+  run [| res := 's\'t\n r'. v := super. ]
+  value [ |  ]
+  foo [ | w := nil. ]
+}
+class C1 : Object {
+  
+}
+class C2 : Integer {
+  foo [ | y := (46) with: ((-19 with: self) value: super with: val) foo: (false plus: self value: -41 with: true). ]
+  with:and: [:p :q | y := self. v := super plus: ((Integer) from) value: [:p | y := false value: self. res := [:z :q | ]. res := self value: Integer.] and: false. y := ([:z :q | v := nil. res := -16. v := (true and: self with: nil foo: 24).]). ]
+  bar: [:p | v := ((super) plus: (p)) new. y := ('s\'t\n r'). ]
+}
+class C3 : Main {
+  value [ | w := [:q | y := self. y := [:q :p | w := ([:p | ]). res := (('s\'t\n r')).].]. ]
+  with:and: [:p :q | v := cnt. w := (self value: super and: nil foo: q) foo. ]
+  foo [ | y := [:q :z | y := self.]. y := nil. w := self foo: ((nil) foo) with: (x foo: -27). ]
+}
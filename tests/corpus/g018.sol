@@ -0,0 +1,10 @@
+"desc 18 'q'"
+class Main : Object {
+  run [|  ]
+  with:and: [:p :q | y := self. res := [ | w := String.] plus: [:q :p | res := Integer. res := [:q :z | v := z. w := true.].]. y := [:p :q | y := false. v := p.]. ]
+  foo [ | v := ((val) foo: bar_1) with: (tmp new). y := Integer. v := true. ]
+  value [ | y := [:q | w := q.]. res := (Integer new). w := String. ]
+}
+class C1 : String {
+  with:and: [:p :q |  ]
+}
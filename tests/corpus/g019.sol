@@ -0,0 +1,5 @@
+"desc 19 'q'"
+class Main : Object {
+  run [|  ]
+  value [ | res := [:q :p | y := (-37). w := [:z | ] with: (p with: self value: true).]. w := 's\'t\n r'. ]
+}
@@ -0,0 +1,9 @@
+"desc 20 'q'"
+class Main : Object {
+  run [| v := (false) and: (nil foo: true and: 23) with: super value: (bar_1 value). v := String. ]
+  foo [ |  ]
+}
+class C1 : Integer {
+  bar: [:p | y := String plus: (true) foo: super with: false. v := ([ | ] plus: (34) with: 15 foo: (true value: ('s\'t\n r') and: p foo: self)) with: ((super and: true plus: String) foo: -49 with: -13). ]
+  with:and: [:p :q | w := [:z | ]. ]
+}
@@ -0,0 +1,10 @@
+"desc 21 'q'"
+class Main : Object {
+  run [| y := [:p | w := [ | ]. v := ([ | w := 2 with: ('s\'t\n r') foo: a plus: -39.]). y := false.]. w := self. v := ('s\'t\n r') foo. ]
+  bar: [:p | res := (((false plus: Integer with: p))). res := true plus: (foo value) value: ((false foo) value: 11 foo: true). w := val. ]
+  value [ | v := 33. w := [:q | res := 25. y := (super plus: x) value. y := 's\'t\n r'.] and: ([:q | w := self. v := true. y := super.] plus: 27 and: super foo: String) plus: Integer. res := nil plus: ('s\'t\n r') and: ([ | y := 's\'t\n r'. w := 34. w := true.] with: true foo: -21 plus: String). ]
+  foo [ | y := [:z :q | y := (Integer with: false and: z foo: ('s\'t\n r')) plus: (String value: true plus: q) foo: self.]. ]
+}
+class C1 : String {
+  
+}
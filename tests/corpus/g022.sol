@@ -0,0 +1,11 @@
+"desc 22 'q'"
+class Main : Object {
+  run [| v := [:p | ]. ]
+  foo [ | v := ([:z :q | ]). v := [:q | w := ((super)) value: (Integer and: super foo: String with: ('s\'t\n r')) with: true plus: (-25 value).]. ]
+  value [ | w := nil. w := ((Integer)). w := [ | ] value. ]
+}
+class C1 : String {
+  foo [ |  ]
+  value [ |  ]
+  bar: [:p | w := [:z :q | v := [:p | v := nil. v := tmp.]. v := self. res := (String).]. y := [:q | ]. w := self. ]
+}
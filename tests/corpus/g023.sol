@@ -0,0 +1,12 @@
+"desc 23 'q'"
+class Main : Object {
+  run [|  ]
+}
+class C1 : Integer {
+  value [ | w := String. ]
+  with:and: [:p :q | v := 40. y := (q). w := [:q :z | res := [:p | y := String value. v := String. res := Integer.]. w := self.]. ]
+  bar: [:p | w := (30) with: -22 foo: [:z | ] value: (false foo: Integer and: ('s\'t\n r')). y := p. ]
+}
+class C2 : Main {
+  value [ |  ]
+}
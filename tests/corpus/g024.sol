@@ -0,0 +1,20 @@
+"desc 24 'q'"
+class Main : Object {
+  run [| w := (super value) and: (x with: String value: ('s\'t\n r') plus: self). ]
+  with:and: [:p :q |  ]
+  value [ | v := false. res := self. ]
+}
+class C1 : Object {
+  bar: [:p | y := Integer. res := (p new) value: (super new). ]
+  with:and: [:p :q | res := false plus: (true foo). y := (super) plus: ((true) foo: true). v := (false new). ]
+  foo [ | v := self. ]
+}
+class C2 : Object {
+  foo [ | v := (([:q :z | y := nil. v := false.] from) from) and: (x value: false). v := String. ]
+  value [ | y := x new. w := false. ]
+  bar: [:p | res := -13. ]
+}
+class C3 : String {
+  with:and: [:p :q | w := (false foo: (Integer) plus: String with: (foo value)) new. res := [:q :p | y := true. v := (cnt) and: (p and: nil plus: false with: Integer).]. ]
+  foo [ | res := x. w := [ | w := [:z :p | res := [ | ]. res := [:z | ]. w := (true) from.]. w := (tmp).]. ]
+}
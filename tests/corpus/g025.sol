@@ -0,0 +1,14 @@
+"desc 25 'q'"
+class Main : Object {
+  run [|  ]
+  with:and: [:p :q | v := [ | ] with: [:p :q | res := [:p :z | y := 's\'t\n r'. v := Integer.].] plus: Integer. y := (([:q | ])). y := q. ]
+}
+class C1 : Main {
+  
+}
+class C2 : Main {
+  value [ | v := self with: ([:z :q | res := q. y := true.] and: String value: Integer). v := 50 new. ]
+}
+class C3 : C2 {
+  
+}
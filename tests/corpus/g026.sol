@@ -0,0 +1,12 @@
+"desc 26 'q'"
+class Main : Object {
+  run [| y := [ | y := x.]. ]
+  bar: [:p | v := (self and: (p with: p)) foo. ]
+  with:and: [:p :q | w := true. w := -41. y := 's\'t\n r'. ]
+  value [ | v := ((nil foo) from) foo: [:q :p | ] with: String value: (28 foo: true with: ('s\'t\n r') plus: x). y := [:q | y := self. res := String.]. res := [:p :z | ] value. ]
+}
+class C1 : String {
+  bar: [:p | res := ((17 new)). ]
+  value [ | v := 43. ]
+  foo [ | w := ([:z | res := super.]) with: (nil from). ]
+}
@@ -0,0 +1,18 @@
+"desc 27 'q'"
+class Main : Object {
+  run [| res := Integer. res := self. ]
+  value [ |  ]
+}
+class C1 : Object {
+  value [ | res := super. w := [:z | w := z.]. v := super. ]
+  with:and: [:p :q |  ]
+  foo [ | v := ('s\'t\n r'). ]
+}
+class C2 : Integer {
+  value [ | w := Integer new. w := Integer. ]
+  bar: [:p |  ]
+  foo [ | res := ([:q | ]) from. y := ([:p :q | y := [:p :z | ].]). ]
+}
+class C3 : Integer {
+  with:and: [:p :q |  ]
+}
@@ -0,0 +1,5 @@
+"desc 28 'q'"
+class Main : Object {
+  run [| w := true. ]
+  bar: [:p | y := -34. ]
+}
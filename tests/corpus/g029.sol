@@ -0,0 +1,5 @@
+"desc 29 'q'"
+class Main : Object {
+  run [| res := true. v := (((false) foo: true) new) foo: [:q | w := true value: b and: Integer. y := super.]. ]
+  with:and: [:p :q | res := true. ]
+}
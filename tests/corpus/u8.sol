@@ -0,0 +1 @@
+"é desc" class Main : Object { run [| x := 'é'. ] }
\ No newline at end of file
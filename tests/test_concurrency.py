@@ -0,0 +1,116 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Concurrency: one `Analyzer` shared by a thread pool, and `--jobs N` worker processes,
+# must give the same results as the serial pipeline.
+import gc
+import os
+import sys
+import random
+import subprocess
+import concurrent.futures
+
+import pytest
+
+import parse
+from perfgate import build_workload
+from differential import ProgramGenerator, TARGET_CODES
+from conftest import ROOT, read_corpus
+
+# @brief Analyzer options covered by the thread-pool test, by test id.
+ANALYZER_OPTIONS = {
+    "lark": ("lark", {}),
+    "rd": ("rd", {}),
+    "positions": ("lark", {"positions": True}),
+    "all-errors": ("lark", {"all_errors": True}),
+}
+
+
+def generated_cases(seed, count):
+    """
+    @brief Generates programs aimed at every exit code.
+
+    @param seed Seed of the program generator.
+    @param count Number of programs.
+    @return A list of source codes.
+    """
+    generator = ProgramGenerator(random.Random(seed))
+    return [generator.case(TARGET_CODES[index % len(TARGET_CODES)]) for index in range(count)]
+
+
+def outcome(analyzer, source):
+    """
+    @brief Analyzes a source and keeps everything the command line would print.
+
+    @param analyzer The `parse.Analyzer` to use.
+    @param source The source code.
+    @return A tuple of the exit code, all errors and the compact XML output.
+    """
+    result = analyzer.analyze(source)
+    return result.exit_code, tuple(result.errors), result.serialize("xml-compact") if result.ast is not None else None
+
+
+def parallel(source, engine, jobs, output_format):
+    """
+    @brief Runs `analyze_parallel()` and turns its error into a value.
+
+    @return The output, or a tuple of the exit code and the message of the error.
+    """
+    try:
+        return parse.analyze_parallel(source, engine, jobs, output_format)
+    except parse.SOL25Error as e:
+        return e.exit_code, e.message
+
+
+@pytest.mark.parametrize("engine, options", ANALYZER_OPTIONS.values(), ids=ANALYZER_OPTIONS.keys())
+def test_shared_analyzer(engine, options):
+    analyzer = parse.Analyzer(engine, **options)
+    sources = [source for _, source in read_corpus()] + generated_cases(5, 200)
+    serial = [outcome(analyzer, source) for source in sources]
+    for workers in (2, 8):
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            threaded = list(pool.map(lambda source: outcome(analyzer, source), sources * 2))
+        assert threaded == serial * 2
+    # @brief The rd engine pauses the collector during a parse; overlapping pauses must not leave it off.
+    assert gc.isenabled()
+
+
+@pytest.mark.parametrize("engine", parse.PARSER_ENGINES)
+def test_jobs_corpus(engine):
+    for name, source in read_corpus():
+        expected = parallel(source, engine, 1, "xml")
+        for jobs in (2, 3):
+            assert parallel(source, engine, jobs, "xml") == expected, (name, jobs)
+
+
+@pytest.mark.parametrize("output_format", parse.OUTPUT_FORMATS)
+def test_jobs_large_program(output_format):
+    # @brief 60 generated programs joined into one with about 150 classes, and the same program
+    # with an error in the last class, so that the batches of the workers report it.
+    source = build_workload(3, 60, True)[0]
+    broken = source + "class Late : Object { value [| x := Undefined new. ] }\n"
+    for program in (source, broken):
+        for engine in parse.PARSER_ENGINES:
+            expected = parallel(program, engine, 1, output_format)
+            for jobs in (2, 4):
+                assert parallel(program, engine, jobs, output_format) == expected, (engine, jobs)
+
+
+def test_jobs_command_line(tmp_path):
+    # @brief One large program split into three --source files, through the command line.
+    lines = build_workload(4, 30, True)[0].splitlines(keepends=True)
+    starts = [index for index, line in enumerate(lines) if line.startswith("class ")]
+    cuts = [0, starts[len(starts) // 3], starts[2 * len(starts) // 3], len(lines)]
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"part{index}.sol"
+        path.write_text("".join(lines[cuts[index]:cuts[index + 1]]), encoding="utf-8")
+        paths.append(str(path))
+    runs = []
+    for jobs in ("1", "3"):
+        arguments = [sys.executable, os.path.join(ROOT, "parse.py"), "--jobs", jobs]
+        for path in paths:
+            arguments += ["--source", path]
+        process = subprocess.run(arguments, capture_output=True)
+        runs.append((process.returncode, process.stdout, process.stderr))
+    assert runs[0][0] == 0
+    assert runs[0] == runs[1]
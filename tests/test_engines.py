@@ -0,0 +1,48 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Cross-engine equivalence: `--engine rd` must end with the same exit code, message and
+# output bytes as the reference `--engine lark` on the sample corpus and on generated programs.
+import random
+
+import pytest
+
+import parse
+from conftest import read_corpus
+
+# @brief Analyzers of both engines, shared by all tests.
+LARK = parse.Analyzer("lark")
+RD = parse.Analyzer("rd")
+
+
+def outputs(result):
+    """
+    @brief Reduces a result to everything the command line would print.
+
+    @param result A `parse.Result`.
+    @return A tuple of the exit code, the first error and the output in every format.
+    """
+    if result.exit_code:
+        return result.exit_code, result.errors[0], None
+    return 0, None, [result.serialize(output_format) for output_format in parse.OUTPUT_FORMATS]
+
+
+@pytest.mark.parametrize("name, source", read_corpus(), ids=lambda value: value if isinstance(value, str) else "")
+def test_corpus(name, source):
+    assert outputs(RD.analyze(source)) == outputs(LARK.analyze(source))
+
+
+def test_corpus_exit_codes():
+    # @brief The corpus exercises every exit code of the analysis, so the comparison covers each error path.
+    codes = {LARK.analyze(source).exit_code for _, source in read_corpus()}
+    assert codes == {0, 21, 22, 31, 32, 33, 34, 35}
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_generated(seed):
+    # @brief Imported here, so the corpus tests do not depend on the differential harness.
+    from differential import ProgramGenerator, TARGET_CODES
+
+    generator = ProgramGenerator(random.Random(seed))
+    for case in range(100):
+        code = generator.case(TARGET_CODES[case % len(TARGET_CODES)])
+        assert outputs(RD.analyze(code)) == outputs(LARK.analyze(code)), code
@@ -0,0 +1,80 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Library interfaces: `load_interface()` accepts what `--emit-interface` writes and rejects
+# malformed entries with exit code 11 instead of passing them to the semantic checks.
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+import parse
+from conftest import ROOT
+
+# @brief A library class with a unary and a keyword method.
+LIBRARY = "class Shape : Object { area [ | x := 1. ] scale:by: [ :a :b | x := a. ] }\n"
+
+# @brief Application using the library class.
+APPLICATION = "class Main : Shape { run [ | x := self area. ] }\n"
+
+# @brief Malformed `classes` entries, each replacing the valid one.
+MALFORMED = {
+    "boolean-arity": ["Shape", "Object", {"area": True}],
+    "negative-arity": ["Shape", "Object", {"area": -1}],
+    "float-arity": ["Shape", "Object", {"area": 0.0}],
+    "lowercase-class": ["shape", "Object", {"area": 0}],
+    "lowercase-parent": ["Shape", "object", {"area": 0}],
+    "empty-class": ["", "Object", {}],
+    "class-with-space": ["Sha pe", "Object", {}],
+    "keyword-selector": ["Shape", "Object", {"self": 0}],
+    "uppercase-selector": ["Shape", "Object", {"Area": 0}],
+    "unfinished-keyword-selector": ["Shape", "Object", {"scale:by": 2}],
+    "selector-with-space": ["Shape", "Object", {"scale: by:": 2}],
+    "methods-list": ["Shape", "Object", [["area", 0]]],
+    "short-entry": ["Shape", "Object"],
+}
+
+
+def emit(tmp_path):
+    """
+    @brief Writes the library and its interface with the command line.
+
+    @return The path of the interface.
+    """
+    library = tmp_path / "shapes.sol"
+    library.write_text(LIBRARY, encoding="utf-8")
+    interface = tmp_path / "shapes.iface"
+    subprocess.run([sys.executable, os.path.join(ROOT, "parse.py"), "--source", str(library),
+                    "--emit-interface", str(interface)], check=True, capture_output=True)
+    return interface
+
+
+def test_emitted_interface(tmp_path):
+    classes = parse.load_interface(str(emit(tmp_path)))
+    assert classes == [("Shape", "Object", {"area": 0, "scale:by:": 2})]
+    assert parse.Analyzer(library=classes).analyze(APPLICATION).exit_code == 0
+
+
+@pytest.mark.parametrize("name", MALFORMED)
+def test_malformed_entry(tmp_path, name):
+    path = emit(tmp_path)
+    interface = json.loads(path.read_text(encoding="utf-8"))
+    interface["classes"] = [MALFORMED[name]]
+    path.write_text(json.dumps(interface), encoding="utf-8")
+    with pytest.raises(parse.SOL25Error) as error:
+        parse.load_interface(str(path))
+    assert error.value.exit_code == 11
+
+
+def test_malformed_entry_command_line(tmp_path):
+    path = emit(tmp_path)
+    interface = json.loads(path.read_text(encoding="utf-8"))
+    interface["classes"][0][2]["area"] = False
+    path.write_text(json.dumps(interface), encoding="utf-8")
+    application = tmp_path / "app.sol"
+    application.write_text(APPLICATION, encoding="utf-8")
+    process = subprocess.run([sys.executable, os.path.join(ROOT, "parse.py"), "--interface", str(path),
+                              "--source", str(application)], capture_output=True)
+    assert process.returncode == 11
+    assert process.stdout == b""
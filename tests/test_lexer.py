@@ -0,0 +1,86 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Lexer: the contextual lexer with whitespace prefixes must split every input exactly like
+# the stock contextual lexer of Lark, with the same token spans, comments and errors.
+import random
+
+import pytest
+from lark import Lark, Tree, UnexpectedInput
+
+import parse
+from differential import ProgramGenerator, TARGET_CODES
+from conftest import read_corpus
+
+# @brief Parsers of the stock Lark contextual lexer, the reference of the comparison.
+STOCK = {
+    False: Lark(parse.GRAMMAR, start="program", parser="lalr", lexer="contextual", lexer_callbacks=parse.LEXER_CALLBACKS),
+    True: Lark(parse.GRAMMAR, start="program", parser="lalr", lexer="contextual", propagate_positions=True,
+               lexer_callbacks=parse.LEXER_CALLBACKS),
+}
+
+# @brief Inputs around whitespace: none, only whitespace, every whitespace character, a vertical
+# tab (not whitespace in SOL25), comments between whitespace and errors right after it.
+EDGE_CASES = [
+    "",
+    "   ",
+    "\n\n\t",
+    "class Main:Object{run[|x:=self foo:1.]}",
+    "class Main : Object {\r\n\trun [ | x := 1. ]\r\n}\r\n  \f ",
+    "  \"first\"  \n \"second\"\nclass Main : Object { run [ | ] }  \"last\"  ",
+    "class Main : Object { run [ | x := 1 @ ] }",
+    "class Main : Object {\n  run [ |\n    x := 'unterminated.\n  ]\n}",
+    "class Main : Object { run [ | x := 1.\v] }",
+    "class Main : Object { run [ | x := 1. ] }\n\n\n   @",
+    "class Main : Object { run [ | self := 1. ] }",
+]
+
+
+def spans(parser, code):
+    """
+    @brief Parses a source and lists everything the lexer decided.
+
+    @param parser The Lark parser.
+    @param code The source code.
+    @return A tuple of the tokens with their types and spans, the comments, and the rule spans
+            of a positions parser; or of the error type and its position.
+    """
+    comments = []
+    reset = parse.comment_sink.set(comments)
+    try:
+        tree = parser.parse(code)
+    except UnexpectedInput as e:
+        return type(e).__name__, e.line, e.column, getattr(e, "pos_in_stream", None)
+    finally:
+        parse.comment_sink.reset(reset)
+    tokens = [(token.type, str(token), token.line, token.column, token.end_line, token.end_column, token.start_pos,
+               token.end_pos) for token in tree.scan_values(lambda value: not isinstance(value, Tree))]
+    comments = [(str(token), token.line, token.column, token.start_pos) for token in comments]
+    rules = [(subtree.data, subtree.meta.line, subtree.meta.column, subtree.meta.end_line, subtree.meta.end_column)
+             for subtree in tree.iter_subtrees() if not subtree.meta.empty]
+    return tokens, comments, rules
+
+
+def sources():
+    """
+    @brief Collects the inputs of the comparison.
+
+    @return The edge cases, the corpus and 200 generated programs aimed at every exit code.
+    """
+    generator = ProgramGenerator(random.Random(7))
+    return (EDGE_CASES + [source.decode("utf-8", "replace") for _, source in read_corpus()]
+            + [generator.case(TARGET_CODES[index % len(TARGET_CODES)]) for index in range(200)])
+
+
+@pytest.mark.parametrize("positions", (False, True), ids=("plain", "positions"))
+def test_same_tokens(positions):
+    parser = parse.get_parser(positions)
+    for code in sources():
+        assert spans(parser, code) == spans(STOCK[positions], code), code
+
+
+def test_fresh_parser():
+    # @brief Without `prepare_lexers()`, the state lexers build their scanners on first use.
+    parser = Lark(parse.GRAMMAR, start="program", parser="lalr", lexer="contextual",
+                  lexer_callbacks=parse.LEXER_CALLBACKS, _plugins=parse.LEXER_PLUGINS)
+    for code in EDGE_CASES:
+        assert spans(parser, code) == spans(STOCK[False], code), code
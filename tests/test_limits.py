@@ -0,0 +1,100 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Resource limits: adversarial sources must end with exit code 13, and long before the
+# analysis they guard against would have finished.
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+import parse
+from conftest import ROOT
+
+# @brief Upper bound of the wall-clock time of one rejected run, process start included. Without
+# the limits, every input below takes from several seconds to minutes or runs out of memory.
+REJECT_SECONDS = 10
+
+
+def program(body):
+    """
+    @brief Wraps an expression into a complete program.
+
+    @param body The expression assigned in `Main.run`.
+    @return The source code.
+    """
+    return "class Main : Object { run [ | x := " + body + ". ] }\n"
+
+
+# @brief Adversarial sources with the command-line limit that rejects each of them.
+ADVERSARIAL = {
+    "huge-string": ('"' + "x" * 50_000_000 + '"' + program("1"), ["--max-bytes", "100000"]),
+    "many-tokens": ("class Main : Object { run [ | " + "x := 1. " * 1_000_000 + "] }\n", ["--max-tokens", "10000"]),
+    "deep-parentheses": (program("(" * 100_000 + "1" + ")" * 100_000), ["--max-depth", "100"]),
+    "deep-blocks": (program("[ | y := " * 100_000 + "1" + ". ]" * 100_000), ["--max-depth", "100"]),
+    "many-classes": ("".join(f"class C{index} : Object {{ }}\n" for index in range(200_000)) + program("1"),
+                     ["--max-classes", "1000"]),
+    "slow-nesting": (program("(" * 24 + "1" + ")" * 24), ["--time-limit", "0.5"]),
+}
+
+
+def run(source, arguments):
+    """
+    @brief Runs parse.py on a source given on standard input.
+
+    @param source The source code.
+    @param arguments Further command-line arguments.
+    @return A tuple of the exit code, the standard error and the wall-clock time in seconds.
+    """
+    start = time.monotonic()
+    process = subprocess.run([sys.executable, os.path.join(ROOT, "parse.py")] + arguments,
+                             input=source.encode("utf-8"), capture_output=True)
+    return process.returncode, process.stderr.decode("utf-8"), time.monotonic() - start
+
+
+@pytest.mark.parametrize("engine", parse.PARSER_ENGINES)
+@pytest.mark.parametrize("name", ADVERSARIAL)
+def test_command_line_limit(name, engine):
+    source, arguments = ADVERSARIAL[name]
+    exit_code, stderr, elapsed = run(source, arguments + ["--engine", engine])
+    assert exit_code == 13, stderr
+    assert elapsed < REJECT_SECONDS
+
+
+def test_nesting_without_limits():
+    # @brief With rd, nesting beyond the recursion limit of Python is reported, not a traceback.
+    # The semantic check of lark walks the levels bottom-up without deep recursion, so there it
+    # only grows slow and needs --max-depth or --time-limit.
+    result = parse.Analyzer("rd").analyze(program("(" * 100_000 + "1" + ")" * 100_000))
+    assert result.exit_code == 13
+
+
+# @brief Sources for the time limit: expensive without being large, one huge token, many statements.
+TIMED = {
+    "slow-nesting": program("(" * 24 + "1" + ")" * 24),
+    "huge-string": '"' + "x" * 20_000_000 + '"' + program("1"),
+    "long-statement": program("1" + " plus: 1" * 200_000),
+    "many-statements": "class Main : Object { run [ | " + "x := (((((1))))). " * 200_000 + "] }\n",
+}
+
+
+@pytest.mark.parametrize("engine", parse.PARSER_ENGINES)
+@pytest.mark.parametrize("name", TIMED)
+def test_time_limit(name, engine):
+    analyzer = parse.Analyzer(engine, limits=parse.Limits(time_limit=0.05))
+    start = time.monotonic()
+    result = analyzer.analyze(TIMED[name])
+    elapsed = time.monotonic() - start
+    assert result.exit_code == 13
+    assert elapsed < REJECT_SECONDS / 2
+
+
+@pytest.mark.parametrize("engine", parse.PARSER_ENGINES)
+def test_time_limit_short_input(engine):
+    # @brief A program too short to reach Limits.CLOCK_INTERVAL steps is still stopped at the end
+    # of a phase once its deadline has passed.
+    with open(os.path.join(ROOT, "tests", "corpus", "a.sol"), "rb") as file:
+        source = file.read()
+    assert parse.Analyzer(engine, limits=parse.Limits(time_limit=1e-6)).analyze(source).exit_code == 13
+    assert parse.Analyzer(engine, limits=parse.Limits(time_limit=60)).analyze(source).exit_code == 0
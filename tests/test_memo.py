@@ -0,0 +1,114 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Memo files: the memo is kept across runs, and SQLite files that are not a memo are refused
+# with exit code 11 instead of having their tables dropped.
+import os
+import sys
+import sqlite3
+import subprocess
+
+import pytest
+
+import parse
+import xref
+from conftest import ROOT, read_corpus
+
+# @brief Valid programs of the corpus, analyzed through the memo.
+PROGRAMS = [source for name, source in read_corpus() if name.startswith("g")][:10]
+
+
+def analyze(path):
+    """
+    @brief Analyzes the programs with a memo file and saves it.
+
+    @param path Path of the memo file.
+    @return The XML outputs.
+    """
+    memo = parse.Memo(str(path))
+    analyzer = parse.Analyzer(memo=memo)
+    outputs = [analyzer.analyze(source).xml for source in PROGRAMS]
+    memo.save()
+    memo.connection.close()
+    return outputs
+
+
+def count(path, table):
+    """
+    @brief Counts the rows of a table of a memo file.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_memo_across_runs(tmp_path):
+    path = tmp_path / "memo.db"
+    expected = [parse.Analyzer().analyze(source).xml for source in PROGRAMS]
+    assert analyze(path) == expected
+    fragments = count(path, "fragments")
+    assert fragments > 0
+    assert analyze(path) == expected
+    assert count(path, "fragments") == fragments
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "memo.db"
+    path.write_bytes(b"")
+    analyze(path)
+    assert count(path, "fragments") > 0
+
+
+def test_other_version_is_cleared(tmp_path):
+    path = tmp_path / "memo.db"
+    analyze(path)
+    connection = sqlite3.connect(path)
+    connection.execute(f"PRAGMA user_version = {parse.MEMO_VERSION + 1}")
+    connection.close()
+    parse.Memo(str(path)).connection.close()
+    assert count(path, "fragments") == 0
+
+
+def foreign_database(path):
+    """
+    @brief Creates a SQLite database of another application with the table names of a memo.
+
+    @return The bytes of the file.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE fragments (text TEXT)")
+    connection.execute("INSERT INTO fragments VALUES ('keep me')")
+    connection.commit()
+    connection.close()
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def test_foreign_database(tmp_path):
+    path = tmp_path / "other.db"
+    before = foreign_database(path)
+    with pytest.raises(parse.SOL25Error) as error:
+        parse.Memo(str(path))
+    assert error.value.exit_code == 11
+    assert path.read_bytes() == before
+
+
+def test_index_is_not_a_memo(tmp_path):
+    path = tmp_path / "xref.db"
+    xref.open_index(str(path)).close()
+    before = path.read_bytes()
+    with pytest.raises(parse.SOL25Error) as error:
+        parse.Memo(str(path))
+    assert error.value.exit_code == 11
+    assert path.read_bytes() == before
+
+
+def test_foreign_database_command_line(tmp_path):
+    path = tmp_path / "other.db"
+    before = foreign_database(path)
+    process = subprocess.run([sys.executable, os.path.join(ROOT, "parse.py"), "--memo", str(path)],
+                             input=PROGRAMS[0], capture_output=True)
+    assert process.returncode == 11
+    assert process.stdout == b""
+    assert path.read_bytes() == before
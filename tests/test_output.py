@@ -0,0 +1,87 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Output files: `--output` replaces the file atomically, keeps its permission bits and
+# writes through symbolic links instead of replacing them.
+import os
+import sys
+import gzip
+import subprocess
+
+import pytest
+
+import parse
+from conftest import ROOT
+
+# @brief Small valid program.
+PROGRAM = b"class Main : Object { run [ | x := 1. ] }\n"
+
+
+def write(path, data):
+    """
+    @brief Writes data through `output_sink()`.
+
+    @param path The output path.
+    @param data The bytes to write.
+    """
+    with parse.output_sink(str(path)) as stream:
+        stream.write(data)
+
+
+def test_new_file_mode(tmp_path):
+    umask = os.umask(0o027)
+    try:
+        write(tmp_path / "out.xml", b"new")
+    finally:
+        os.umask(umask)
+    assert (tmp_path / "out.xml").read_bytes() == b"new"
+    assert os.stat(tmp_path / "out.xml").st_mode & 0o7777 == 0o640
+
+
+@pytest.mark.parametrize("mode", (0o600, 0o644, 0o755, 0o2750))
+def test_existing_file_mode(tmp_path, mode):
+    path = tmp_path / "out.xml"
+    path.write_bytes(b"old")
+    os.chmod(path, mode)
+    write(path, b"new")
+    assert path.read_bytes() == b"new"
+    assert os.stat(path).st_mode & 0o7777 == mode
+
+
+def test_symlink_is_kept(tmp_path):
+    target = tmp_path / "data" / "out.xml"
+    target.parent.mkdir()
+    target.write_bytes(b"old")
+    os.chmod(target, 0o604)
+    link = tmp_path / "link.xml"
+    link.symlink_to(os.path.join("data", "out.xml"))
+    write(link, b"new")
+    assert link.is_symlink()
+    assert os.readlink(link) == os.path.join("data", "out.xml")
+    assert target.read_bytes() == b"new"
+    assert os.stat(target).st_mode & 0o7777 == 0o604
+    # @brief The temporary file was created next to the target, not next to the link.
+    assert sorted(os.listdir(tmp_path)) == ["data", "link.xml"]
+    assert os.listdir(target.parent) == ["out.xml"]
+
+
+def test_dangling_symlink(tmp_path):
+    link = tmp_path / "link.xml"
+    link.symlink_to(tmp_path / "missing.xml")
+    write(link, b"new")
+    assert link.is_symlink()
+    assert (tmp_path / "missing.xml").read_bytes() == b"new"
+
+
+def test_command_line_symlink(tmp_path):
+    target = tmp_path / "out.xml.gz"
+    target.write_bytes(b"old")
+    os.chmod(target, 0o640)
+    link = tmp_path / "link.xml.gz"
+    link.symlink_to(target)
+    process = subprocess.run([sys.executable, os.path.join(ROOT, "parse.py"), "--output", str(link)],
+                             input=PROGRAM, capture_output=True)
+    assert process.returncode == 0, process.stderr
+    expected = subprocess.run([sys.executable, os.path.join(ROOT, "parse.py")], input=PROGRAM, capture_output=True)
+    assert link.is_symlink()
+    assert gzip.decompress(target.read_bytes()) == expected.stdout
+    assert os.stat(target).st_mode & 0o7777 == 0o640
@@ -0,0 +1,39 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Invalid tokens of the bytes lexer: the quoted remaining code is cut after decoding, so it
+# holds 20 whole characters, and the diagnostic dump goes to standard error, not standard output.
+import os
+import sys
+import subprocess
+
+import pytest
+
+import parse
+from conftest import ROOT
+
+# @brief Program with an invalid token followed by two-, three- and four-byte characters.
+PROGRAM = "class Main : Object { run [ | x := 1 @ " + "é" * 5 + "€" * 5 + "😀" * 20 + " ] }\n"
+
+# @brief The 20 characters quoted from the invalid token on.
+REMAINING = "@ " + "é" * 5 + "€" * 5 + "😀" * 8
+
+
+@pytest.mark.parametrize("engine", ("rd", "lark"))
+def test_multibyte_remaining_code(engine):
+    result = parse.Analyzer(engine=engine).analyze(PROGRAM.encode("utf-8"))
+    assert result.errors == [(21, f"Invalid token near '{REMAINING}'")]
+
+
+def test_all_errors_remaining_code():
+    result = parse.Analyzer(all_errors=True).analyze(PROGRAM.encode("utf-8"))
+    assert result.errors[0] == (21, f"Invalid token near '{REMAINING}' (line 1, column 38)")
+
+
+def test_dump_goes_to_stderr():
+    process = subprocess.run([sys.executable, os.path.join(ROOT, "parse.py")],
+                             input=PROGRAM.encode("utf-8"), capture_output=True)
+    assert process.returncode == 21
+    assert process.stdout == b""
+    stderr = process.stderr.decode("utf-8")
+    assert "Invalid token detected!" in stderr
+    assert stderr.endswith(f"Error: Invalid token near '{REMAINING}'\n")
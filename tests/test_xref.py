@@ -0,0 +1,108 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Cross-reference index: queries read the database without writing it, and databases that
+# are not an index of the current version are refused with exit code 11, untouched.
+import os
+import sys
+import sqlite3
+import subprocess
+
+import pytest
+
+import xref
+from conftest import ROOT, CORPUS
+
+
+def run(*arguments):
+    """
+    @brief Runs xref.py.
+
+    @param arguments The command-line arguments.
+    @return A tuple of the exit code, the standard output and the standard error.
+    """
+    process = subprocess.run([sys.executable, os.path.join(ROOT, "xref.py")] + [str(argument) for argument in arguments],
+                             capture_output=True, text=True)
+    return process.returncode, process.stdout, process.stderr
+
+
+def foreign_database(path):
+    """
+    @brief Creates a SQLite database of another application.
+
+    @param path Path of the file.
+    @return The bytes of the file.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE notes (text TEXT)")
+    connection.execute("INSERT INTO notes VALUES ('keep me')")
+    connection.commit()
+    connection.close()
+    with open(path, "rb") as file:
+        return file.read()
+
+
+@pytest.fixture
+def index(tmp_path):
+    # @brief An index of ten corpus programs, closed, so the database file holds all of it.
+    database = tmp_path / "xref.db"
+    sources = [path for path in CORPUS if os.path.basename(path).startswith("g")][:10]
+    exit_code, stdout, stderr = run("index", database, *sources)
+    assert exit_code == 0, stderr
+    return database
+
+
+def test_query_does_not_write(index):
+    before = index.read_bytes()
+    exit_code, stdout, _ = run("definitions", index, "Main")
+    assert exit_code == 0
+    assert len(stdout.splitlines()) == 10
+    assert index.read_bytes() == before
+
+
+def test_query_read_only_connection(index):
+    connection = xref.open_index(str(index), read_only=True)
+    with pytest.raises(sqlite3.OperationalError):
+        connection.execute("DELETE FROM files")
+    connection.close()
+
+
+@pytest.mark.parametrize("command", ("index", "senders"))
+def test_foreign_database(tmp_path, command):
+    database = tmp_path / "other.db"
+    before = foreign_database(database)
+    arguments = [CORPUS[0]] if command == "index" else ["value"]
+    exit_code, _, stderr = run(command, database, *arguments)
+    assert exit_code == 11
+    assert "not a cross-reference index" in stderr
+    assert database.read_bytes() == before
+    assert sorted(os.listdir(tmp_path)) == ["other.db"]
+
+
+def test_foreign_database_parse_index(tmp_path):
+    database = tmp_path / "other.db"
+    before = foreign_database(database)
+    process = subprocess.run([sys.executable, os.path.join(ROOT, "parse.py"), "--index", str(database), "--source", CORPUS[0]],
+                             capture_output=True)
+    assert process.returncode == 11
+    assert database.read_bytes() == before
+
+
+@pytest.mark.parametrize("command", ("index", "senders"))
+def test_other_version(index, command):
+    connection = sqlite3.connect(index)
+    connection.execute(f"PRAGMA user_version = {xref.SCHEMA_VERSION + 1}")
+    connection.close()
+    arguments = [CORPUS[0]] if command == "index" else ["value"]
+    exit_code, _, stderr = run(command, index, *arguments)
+    assert exit_code == 11
+    assert "version" in stderr
+
+
+def test_empty_file(tmp_path):
+    # @brief A query never turns an empty file into an index; `index` does.
+    database = tmp_path / "empty.db"
+    database.write_bytes(b"")
+    assert run("senders", database, "value")[0] == 11
+    assert database.read_bytes() == b""
+    assert run("index", database, CORPUS[0])[0] == 0
+    assert run("definitions", database, "Main")[0] == 0
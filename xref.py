@@ -0,0 +1,413 @@
+#Kachan Rostyslav xkacha02
+# IPP 2024 1.part
+# @brief Persistent cross-reference index of SOL25 programs: class definitions, inheritance,
+# methods, message sends and class references, kept in SQLite and updated file by file.
+import sys
+import os
+import hashlib
+import argparse
+import sqlite3
+import urllib.parse
+
+
+# @brief Tables and indexes of the cross-reference database.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    exit_code INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS classes (file_id INTEGER NOT NULL, name TEXT NOT NULL, parent TEXT NOT NULL, external INTEGER NOT NULL, line INTEGER);
+CREATE TABLE IF NOT EXISTS methods (file_id INTEGER NOT NULL, class TEXT NOT NULL, selector TEXT NOT NULL, arity INTEGER NOT NULL, line INTEGER);
+CREATE TABLE IF NOT EXISTS sends (
+    file_id INTEGER NOT NULL, class TEXT NOT NULL, method TEXT NOT NULL, selector TEXT NOT NULL,
+    arity INTEGER NOT NULL, receiver_kind TEXT NOT NULL, receiver TEXT, line INTEGER
+);
+CREATE TABLE IF NOT EXISTS class_refs (file_id INTEGER NOT NULL, class TEXT NOT NULL, method TEXT NOT NULL, name TEXT NOT NULL, line INTEGER);
+CREATE INDEX IF NOT EXISTS classes_name ON classes (name);
+CREATE INDEX IF NOT EXISTS classes_parent ON classes (parent, external);
+CREATE INDEX IF NOT EXISTS classes_file ON classes (file_id, name);
+CREATE INDEX IF NOT EXISTS classes_file_parent ON classes (file_id, parent);
+CREATE INDEX IF NOT EXISTS methods_selector ON methods (selector);
+CREATE INDEX IF NOT EXISTS methods_file ON methods (file_id);
+CREATE INDEX IF NOT EXISTS sends_selector ON sends (selector);
+CREATE INDEX IF NOT EXISTS sends_receiver ON sends (receiver_kind, receiver);
+CREATE INDEX IF NOT EXISTS sends_file ON sends (file_id);
+CREATE INDEX IF NOT EXISTS class_refs_name ON class_refs (name);
+CREATE INDEX IF NOT EXISTS class_refs_file ON class_refs (file_id);
+"""
+
+# @brief Marks of a cross-reference database in its header: `PRAGMA application_id` ("SOLX") tells it
+# from other SQLite files, `PRAGMA user_version` is the version of SCHEMA.
+APPLICATION_ID = 0x534F4C58
+SCHEMA_VERSION = 1
+
+# @brief Tables holding the facts of one file, cleared before the file is indexed again.
+FACT_TABLES = ("classes", "methods", "sends", "class_refs")
+
+# @brief Selectors that create an instance when sent to a class literal.
+INSTANTIATING_SELECTORS = ("new", "from:")
+
+# @brief Extensions of the source files collected from directories by `index`.
+SOURCE_EXTENSIONS = (".sol", ".sol25")
+
+# @brief Number of files indexed in one transaction by `index`.
+COMMIT_INTERVAL = 500
+
+
+def open_index(path, read_only=False):
+    """
+    @brief Opens the cross-reference database; for writing, an empty or new file becomes an index.
+
+    @param path Path to the SQLite file.
+    @param read_only True for queries: the file is opened read-only and never written.
+    @return A sqlite3 connection.
+
+    @throws sqlite3.DatabaseError if the file is not a SQLite database, or is a database other
+            than a cross-reference index of SCHEMA_VERSION.
+
+    @note WAL journaling with `synchronous=NORMAL` keeps queries readable while a file is re-indexed.
+    """
+    if read_only:
+        connection = sqlite3.connect(f"file:{urllib.parse.quote(os.path.abspath(path))}?mode=ro", uri=True)
+    else:
+        connection = sqlite3.connect(path)
+    try:
+        application_id = connection.execute("PRAGMA application_id").fetchone()[0]
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if not read_only and (application_id, version) == (0, 0) \
+                and connection.execute("SELECT count(*) FROM sqlite_master").fetchone()[0] == 0:
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA application_id = {APPLICATION_ID}")
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        elif application_id != APPLICATION_ID:
+            raise sqlite3.DatabaseError("not a cross-reference index")
+        elif version != SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(f"index version {version}, expected {SCHEMA_VERSION}; index the files into a new database")
+        if not read_only:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+    except BaseException:
+        connection.close()
+        raise
+    return connection
+
+
+def receiver_of(send):
+    """
+    @brief Classifies the receiver of a message send.
+
+    @param send A `send` element of the XML AST.
+    @return A (kind, name) tuple; kind is `class`, `literal`, `self`, `super`, `variable`,
+            `block` or `send`, and name is the class or variable name where there is one.
+    """
+    receiver = send[0][0]
+    if receiver.tag == "literal":
+        if receiver.get("class") == "class":
+            return "class", receiver.get("value")
+        return "literal", receiver.get("class")
+    if receiver.tag == "var":
+        name = receiver.get("name")
+        if name in ("self", "super"):
+            return name, None
+        return "variable", name
+    return receiver.tag, None
+
+
+def class_facts(class_elements):
+    """
+    @brief Extracts the cross-reference rows of classes of the XML AST.
+
+    @param class_elements The `class` elements of one file.
+    @return A dictionary mapping each table of FACT_TABLES to its rows (without `file_id`).
+
+    @details
+    - Line numbers are taken from the `line` attributes that `--positions` writes on
+      `class`, `method`, `assign` and `send` elements. A send gets its own line, a class
+      reference the line of the innermost of these elements enclosing it. Without
+      positions, the lines are NULL.
+    - A class is `external` if its parent is not defined in the same file: a built-in
+      class, or a class of a library.
+    - The tree is walked with an explicit stack, so deeply nested expressions cannot
+      exhaust the recursion limit.
+    """
+    facts = {table: [] for table in FACT_TABLES}
+    names = {class_elem.get("name") for class_elem in class_elements}
+    for class_elem in class_elements:
+        class_name = class_elem.get("name")
+        parent = class_elem.get("parent")
+        facts["classes"].append((class_name, parent, parent not in names, line_of(class_elem, None)))
+        for method in class_elem.findall("method"):
+            selector = method.get("selector")
+            block = method.find("block")
+            method_line = line_of(method, None)
+            facts["methods"].append((class_name, selector, int(block.get("arity")), method_line))
+            stack = [(block, method_line)]
+            while stack:
+                elem, line = stack.pop()
+                line = line_of(elem, line)
+                if elem.tag == "send":
+                    kind, receiver = receiver_of(elem)
+                    facts["sends"].append((class_name, selector, elem.get("selector"), len(elem) - 1, kind, receiver, line))
+                elif elem.tag == "literal" and elem.get("class") == "class":
+                    facts["class_refs"].append((class_name, selector, elem.get("value"), line))
+                stack.extend((child, line) for child in reversed(elem))
+    return facts
+
+
+def line_of(elem, default):
+    """
+    @brief Reads the start line recorded by `--positions`.
+
+    @param elem An element of the XML AST.
+    @param default Line to use when the element has none.
+    @return The line number, or `default`.
+    """
+    line = elem.get("line")
+    return int(line) if line is not None else default
+
+
+def update_file(connection, path, digest, stat, exit_code, class_elements=()):
+    """
+    @brief Replaces everything the index knows about one source file.
+
+    @param connection Connection from `open_index()`.
+    @param path Absolute path of the source file.
+    @param digest SHA-256 of the file contents.
+    @param stat `os.stat_result` of the file, used to skip unchanged files later.
+    @param exit_code Exit code of the analysis; only files ending with 0 contribute facts.
+    @param class_elements The `class` elements defined in the file.
+
+    @note The caller decides when to commit, so many files can share one transaction.
+    """
+    connection.execute(
+        "INSERT INTO files (path, sha256, size, mtime_ns, exit_code) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (path) DO UPDATE SET sha256 = excluded.sha256, size = excluded.size, "
+        "mtime_ns = excluded.mtime_ns, exit_code = excluded.exit_code",
+        (path, digest, stat.st_size, stat.st_mtime_ns, exit_code),
+    )
+    file_id = connection.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()[0]
+    for table in FACT_TABLES:
+        connection.execute(f"DELETE FROM {table} WHERE file_id = ?", (file_id,))
+
+    facts = class_facts(class_elements)
+    connection.executemany("INSERT INTO classes VALUES (?, ?, ?, ?, ?)", [(file_id,) + row for row in facts["classes"]])
+    connection.executemany("INSERT INTO methods VALUES (?, ?, ?, ?, ?)", [(file_id,) + row for row in facts["methods"]])
+    connection.executemany("INSERT INTO sends VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [(file_id,) + row for row in facts["sends"]])
+    connection.executemany("INSERT INTO class_refs VALUES (?, ?, ?, ?, ?)", [(file_id,) + row for row in facts["class_refs"]])
+
+
+def remove_file(connection, file_id):
+    """
+    @brief Drops a source file and its facts from the index.
+
+    @param connection Connection from `open_index()`.
+    @param file_id Row id of the file in `files`.
+    """
+    for table in FACT_TABLES:
+        connection.execute(f"DELETE FROM {table} WHERE file_id = ?", (file_id,))
+    connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+
+def collect_sources(paths):
+    """
+    @brief Expands the paths given to `index` into source files.
+
+    @param paths Files and directories.
+    @return A tuple of the sorted absolute file paths and the absolute directories that were walked.
+    """
+    files = set()
+    directories = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            directories.append(path)
+            for directory, _, names in os.walk(path):
+                files.update(os.path.join(directory, name) for name in names if name.endswith(SOURCE_EXTENSIONS))
+        else:
+            files.add(path)
+    return sorted(files), directories
+
+
+def index_sources(connection, paths, analyzer, log=sys.stderr):
+    """
+    @brief Brings the index up to date with a set of source files.
+
+    @param connection Connection from `open_index()`.
+    @param paths Files and directories; directories are searched for SOURCE_EXTENSIONS files.
+    @param analyzer A `parse.Analyzer` used for files that changed.
+    @param log Stream receiving one line per file that fails to analyze.
+    @return A dictionary counting the `analyzed`, `unchanged`, `failed` and `removed` files.
+
+    @details
+    - A file whose size and modification time match its `files` row is skipped without
+      being read; a file whose contents hash to the recorded SHA-256 is only re-stamped.
+    - Files that fail the analysis are recorded with their exit code and no facts, so they
+      are not analyzed again until they change.
+    - Indexed files below a walked directory that no longer exist are removed.
+    """
+    files, directories = collect_sources(paths)
+    counts = {"analyzed": 0, "unchanged": 0, "failed": 0, "removed": 0}
+    known = {path: (file_id, digest, size, mtime_ns) for file_id, path, digest, size, mtime_ns in
+             connection.execute("SELECT id, path, sha256, size, mtime_ns FROM files")}
+
+    for number, path in enumerate(files, 1):
+        try:
+            stat = os.stat(path)
+            row = known.get(path)
+            if row is not None and (row[2], row[3]) == (stat.st_size, stat.st_mtime_ns):
+                counts["unchanged"] += 1
+                continue
+            with open(path, "rb") as file:
+                buffer = file.read()
+        except OSError as e:
+            log.write(f"{path}: {e.strerror}\n")
+            counts["failed"] += 1
+            continue
+
+        digest = hashlib.sha256(buffer).hexdigest()
+        if row is not None and row[1] == digest:
+            connection.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?", (stat.st_size, stat.st_mtime_ns, row[0]))
+            counts["unchanged"] += 1
+            continue
+
+        result = analyzer.analyze(buffer)
+        if result.exit_code:
+            exit_code, message = result.errors[0]
+            log.write(f"{path}: exit {exit_code}: {message}\n")
+            update_file(connection, path, digest, stat, exit_code)
+            counts["failed"] += 1
+        else:
+            update_file(connection, path, digest, stat, 0, list(result.ast))
+            counts["analyzed"] += 1
+        if number % COMMIT_INTERVAL == 0:
+            connection.commit()
+
+    present = set(files)
+    for path, (file_id, _, _, _) in known.items():
+        if path not in present and any(path.startswith(directory + os.sep) for directory in directories) and not os.path.exists(path):
+            remove_file(connection, file_id)
+            counts["removed"] += 1
+    connection.commit()
+    return counts
+
+
+# @brief Query subcommands: SQL with one `?` parameter, and a description for `--help`.
+# Every file is its own program, so a parent class is looked up in the file of the subclass
+# first, and in other files (a library) only if that file does not define it (`external`).
+QUERIES = {
+    "senders": (
+        "SELECT f.path, s.line, s.class, s.method, s.receiver_kind, s.receiver FROM sends s "
+        "JOIN files f ON f.id = s.file_id WHERE s.selector = ? ORDER BY f.path, s.line",
+        "Send sites of a selector",
+    ),
+    "implementors": (
+        "SELECT f.path, m.line, m.class, m.selector, m.arity FROM methods m "
+        "JOIN files f ON f.id = m.file_id WHERE m.selector = ? ORDER BY f.path, m.line",
+        "Classes defining a method with a selector",
+    ),
+    "subclasses": (
+        "WITH RECURSIVE sub (file_id, name) AS (SELECT file_id, name FROM classes WHERE parent = ? "
+        "UNION SELECT c.file_id, c.name FROM sub JOIN classes c ON c.file_id = sub.file_id AND c.parent = sub.name "
+        "UNION SELECT c.file_id, c.name FROM sub JOIN classes c ON c.parent = sub.name AND c.external = 1 AND c.file_id != sub.file_id) "
+        "SELECT f.path, c.line, c.name, c.parent FROM sub JOIN classes c ON c.file_id = sub.file_id AND c.name = sub.name "
+        "JOIN files f ON f.id = c.file_id ORDER BY f.path, c.line",
+        "Direct and indirect subclasses of a class",
+    ),
+    "definitions": (
+        "SELECT f.path, c.line, c.name, c.parent FROM classes c "
+        "JOIN files f ON f.id = c.file_id WHERE c.name = ? ORDER BY f.path, c.line",
+        "Definitions of a class",
+    ),
+    "instantiations": (
+        "SELECT f.path, s.line, s.class, s.method, s.selector FROM sends s "
+        "JOIN files f ON f.id = s.file_id WHERE s.receiver_kind = 'class' AND s.receiver = ? "
+        f"AND s.selector IN ({', '.join(repr(selector) for selector in INSTANTIATING_SELECTORS)}) ORDER BY f.path, s.line",
+        "Sends of " + ", ".join(INSTANTIATING_SELECTORS) + " to a class",
+    ),
+    "references": (
+        "SELECT f.path, r.line, r.class, r.method FROM class_refs r "
+        "JOIN files f ON f.id = r.file_id WHERE r.name = ? ORDER BY f.path, r.line",
+        "Class literals naming a class",
+    ),
+}
+
+
+def format_row(query, row):
+    """
+    @brief Formats one query result as `path:line: description`.
+
+    @param query Name of the query in QUERIES.
+    @param row The result row; the path and the line come first.
+    @return The output line; the line number is left out when the index has none.
+    """
+    path, line = row[0], row[1]
+    location = f"{path}:{line}" if line is not None else path
+    if query == "senders":
+        receiver = row[4] if row[5] is None else f"{row[4]} {row[5]}"
+        return f"{location}: {row[2]}>>{row[3]} sends to {receiver}"
+    if query == "implementors":
+        return f"{location}: {row[2]}>>{row[3]} (arity {row[4]})"
+    if query in ("subclasses", "definitions"):
+        return f"{location}: {row[2]} : {row[3]}"
+    if query == "instantiations":
+        return f"{location}: {row[2]}>>{row[3]} sends {row[4]}"
+    return f"{location}: {row[2]}>>{row[3]}"
+
+
+def main():
+    """
+    @brief Entry point: `index` updates the database, the other subcommands query it.
+
+    @details
+    - `index DB PATH...` analyzes new and changed files with parse.py and prints a summary;
+      files are checked as libraries, so class libraries without `Main` are indexed too.
+      parse.py is only imported by this subcommand, so queries start without building the parser.
+    - A query prints one `path:line: ...` line per hit and exits with 1 if there is none.
+    - Queries open the database read-only. A database that is not an index, or is damaged,
+      ends with exit code 11; an index that cannot be written by `index` with exit code 12.
+    """
+    parser = argparse.ArgumentParser(description="Cross-reference index of SOL25 programs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    index = commands.add_parser("index", help="Add new and changed source files to the index")
+    index.add_argument("database", help="SQLite database file")
+    index.add_argument("paths", nargs="+", help="Source files and directories")
+    index.add_argument("--interface", action="append", default=[], help="Library interface known to every file; repeatable")
+    index.add_argument("--engine", default="lark", choices=("lark", "rd"),
+                       help="Parser engine; `rd` is faster but records no line numbers (default: lark)")
+    for name, (_, description) in QUERIES.items():
+        query = commands.add_parser(name, help=description)
+        query.add_argument("database", help="SQLite database file")
+        query.add_argument("name", help="Selector or class name")
+    args = parser.parse_args()
+
+    if args.command != "index" and not os.path.exists(args.database):
+        sys.stderr.write(f"Error: Index '{args.database}' does not exist.\n")
+        sys.exit(11)
+    try:
+        connection = open_index(args.database, read_only=args.command != "index")
+        if args.command == "index":
+            import parse
+            try:
+                library = [entry for path in args.interface for entry in parse.load_interface(path)]
+            except parse.SOL25Error as e:
+                e.report()
+            analyzer = parse.Analyzer(args.engine, positions=args.engine == "lark", library=library, require_main=False)
+            counts = index_sources(connection, args.paths, analyzer)
+            print(", ".join(f"{count} {name}" for name, count in counts.items()))
+            sys.exit(0)
+        rows = connection.execute(QUERIES[args.command][0], (args.name,)).fetchall()
+    except sqlite3.DatabaseError as e:
+        sys.stderr.write(f"Error: Cannot use index '{args.database}': {e}.\n")
+        sys.exit(12 if args.command == "index" and isinstance(e, sqlite3.OperationalError) else 11)
+
+    for row in rows:
+        print(format_row(args.command, row))
+    sys.exit(0 if rows else 1)
+
+
+if __name__ == "__main__":
+    main()